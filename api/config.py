@@ -0,0 +1,163 @@
+# api/config.py
+
+import os
+
+# "full" serves everything; "logs" serves log reads and writes, search and stats
+# only, and never imports the LLM libraries.
+API_PROFILE = os.getenv("API_PROFILE", "full")
+
+# python -m api.serve: address, number of worker processes, and how long a
+# stopping worker may spend finishing in-flight requests before it is killed.
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+API_GRACEFUL_TIMEOUT_SECONDS = float(os.getenv("API_GRACEFUL_TIMEOUT_SECONDS", "30"))
+
+NOTION_TOKEN = os.getenv("NOTION_TOKEN")
+NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
+
+# Size of the keep-alive connection pool shared by every request to Notion.
+NOTION_POOL_SIZE = int(os.getenv("NOTION_POOL_SIZE", "10"))
+NOTION_TIMEOUT_SECONDS = float(os.getenv("NOTION_TIMEOUT_SECONDS", "30"))
+# Override to point the Notion client at another host, e.g. the stand-in in scripts/bench.
+NOTION_BASE_URL = os.getenv("NOTION_BASE_URL", "https://api.notion.com")
+
+# Multi-tenant mode: a JSON file mapping tenant ids to {"token", "database_id"}
+# (optionally "rate_limit_per_second"). Requests select a tenant with the
+# TENANT_HEADER header or a /tenants/{tenant_id}/ path prefix; requests without
+# one use NOTION_TOKEN and NOTION_DATABASE_ID above. Each tenant gets its own
+# Notion connection pool and rate limiter, and at most TENANT_MAX_ACTIVE are
+# kept open, least recently used first out.
+TENANTS_PATH = os.getenv("TENANTS_PATH")
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Tenant-ID")
+TENANT_MAX_ACTIVE = int(os.getenv("TENANT_MAX_ACTIVE", "100"))
+TENANT_POOL_SIZE = int(os.getenv("TENANT_POOL_SIZE", "2"))
+
+# Local state (SQLite mirror, caches) lives under this directory.
+DATA_DIR = os.getenv("DATA_DIR", "data")
+
+MIRROR_ENABLED = os.getenv("MIRROR_ENABLED", "true").lower() == "true"
+MIRROR_PATH = os.getenv("MIRROR_PATH", os.path.join(DATA_DIR, "notion_mirror.db"))
+# Each sync asks Notion only for pages edited since the last one, so a short
+# interval is cheap; it bounds how late edits made in Notion reach /logs/changes.
+MIRROR_SYNC_INTERVAL_SECONDS = float(os.getenv("MIRROR_SYNC_INTERVAL_SECONDS", "10"))
+# Pages deleted or archived in Notion never show up in the incremental sync, so
+# every so often the sync lists every page id and drops the ones that are gone.
+# This reads the whole database; 0 disables it.
+MIRROR_RECONCILE_INTERVAL_SECONDS = float(os.getenv("MIRROR_RECONCILE_INTERVAL_SECONDS", "3600"))
+# GET /logs/changes: how often each worker checks the mirror for changes made
+# by other workers, how long an idle stream waits before a keep-alive comment,
+# and how many undelivered changes a subscriber may have before it is cut off.
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "1"))
+CHANGE_FEED_KEEPALIVE_SECONDS = float(os.getenv("CHANGE_FEED_KEEPALIVE_SECONDS", "15"))
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "1000"))
+
+# Worker processes sharing DATA_DIR elect one of them, by file lock, to run the
+# mirror sync, backfills and scheduled feedback; the others retry this often.
+LEADER_LOCK_PATH = os.getenv("LEADER_LOCK_PATH", os.path.join(DATA_DIR, "leader.lock"))
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "5"))
+
+# Cache shared by all worker processes for Notion query results, with leases so
+# only one worker makes a given Notion query or model call at a time.
+SHARED_CACHE_ENABLED = os.getenv("SHARED_CACHE_ENABLED", "true").lower() == "true"
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", os.path.join(DATA_DIR, "shared_cache.db"))
+NOTION_QUERY_CACHE_TTL_SECONDS = float(os.getenv("NOTION_QUERY_CACHE_TTL_SECONDS", "30"))
+# Upper bound on how long one worker may hold a lease before others stop waiting for it.
+SHARED_CACHE_LEASE_SECONDS = float(os.getenv("SHARED_CACHE_LEASE_SECONDS", "120"))
+
+# Large and fast model tiers; FEEDBACK_CHAIN_TIERS maps prompt chains to a tier
+# as chain=tier pairs, and chains not listed use the large tier.
+FEEDBACK_MODEL = os.getenv("FEEDBACK_MODEL", "gpt-4o")
+FEEDBACK_FAST_MODEL = os.getenv("FEEDBACK_FAST_MODEL", "gpt-4o-mini")
+def _parse_chain_tiers(value: str) -> dict:
+    tiers = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        chain, separator, tier = (part.strip() for part in pair.partition("="))
+        if not separator or not chain:
+            raise ValueError(f"FEEDBACK_CHAIN_TIERS entry {pair.strip()!r} is not chain=tier.")
+        if tier not in ("fast", "large"):
+            raise ValueError(f"FEEDBACK_CHAIN_TIERS entry {pair.strip()!r} names unknown tier {tier!r}; use fast or large.")
+        tiers[chain] = tier
+    return tiers
+
+FEEDBACK_CHAIN_TIERS = _parse_chain_tiers(os.getenv("FEEDBACK_CHAIN_TIERS", "feedback=fast,daily_feedback=fast"))
+# When a large-tier call has produced no token after this long, the fast tier is
+# started as well ("hedge": first to answer wins) or instead ("fallback"). 0 disables.
+FEEDBACK_FIRST_TOKEN_BUDGET_SECONDS = float(os.getenv("FEEDBACK_FIRST_TOKEN_BUDGET_SECONDS", "5"))
+FEEDBACK_HEDGE_MODE = os.getenv("FEEDBACK_HEDGE_MODE", "hedge").strip()
+if FEEDBACK_HEDGE_MODE not in ("hedge", "fallback"):
+    raise ValueError(f"FEEDBACK_HEDGE_MODE {FEEDBACK_HEDGE_MODE!r} is unknown; use hedge or fallback.")
+# Import LangChain and the OpenAI SDK in the background once the server is up,
+# instead of on the first feedback request.
+FEEDBACK_PRELOAD = os.getenv("FEEDBACK_PRELOAD", "true").lower() == "true"
+FEEDBACK_TEMPERATURE = float(os.getenv("FEEDBACK_TEMPERATURE", "0"))
+# Unset means the OpenAI default endpoint.
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+
+FEEDBACK_CACHE_ENABLED = os.getenv("FEEDBACK_CACHE_ENABLED", "true").lower() == "true"
+FEEDBACK_CACHE_PATH = os.getenv("FEEDBACK_CACHE_PATH", os.path.join(DATA_DIR, "feedback_cache.db"))
+FEEDBACK_CACHE_MEMORY_ENTRIES = int(os.getenv("FEEDBACK_CACHE_MEMORY_ENTRIES", "256"))
+FEEDBACK_CACHE_TTL_SECONDS = float(os.getenv("FEEDBACK_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+FEEDBACK_CACHE_MAX_BYTES = int(os.getenv("FEEDBACK_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Notion allows an average of three requests per second per integration. The
+# limit is shared by all worker processes through the shared cache; with
+# SHARED_CACHE_ENABLED=false each worker gets the full rate on its own.
+NOTION_RATE_LIMIT_PER_SECOND = float(os.getenv("NOTION_RATE_LIMIT_PER_SECOND", "3"))
+NOTION_RATE_LIMIT_BURST = float(os.getenv("NOTION_RATE_LIMIT_BURST", "3"))
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+NOTION_WRITE_CONCURRENCY = int(os.getenv("NOTION_WRITE_CONCURRENCY", "3"))
+LOG_BATCH_MAX_ENTRIES = int(os.getenv("LOG_BATCH_MAX_ENTRIES", "5000"))
+
+SUMMARY_STORE_PATH = os.getenv("SUMMARY_STORE_PATH", os.path.join(DATA_DIR, "summaries.db"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+# Ranges up to this many days get final feedback from day summaries, then week
+# summaries, and month summaries beyond that.
+SUMMARY_DAY_LEVEL_MAX_DAYS = int(os.getenv("SUMMARY_DAY_LEVEL_MAX_DAYS", "7"))
+SUMMARY_WEEK_LEVEL_MAX_DAYS = int(os.getenv("SUMMARY_WEEK_LEVEL_MAX_DAYS", "62"))
+
+# POST /feedback/batch: items per request, items generated at once per worker,
+# and the per-minute token budget batch model calls are metered against (each
+# call is charged its estimated prompt plus FEEDBACK_BATCH_COMPLETION_TOKENS).
+FEEDBACK_BATCH_MAX_ITEMS = int(os.getenv("FEEDBACK_BATCH_MAX_ITEMS", "100"))
+FEEDBACK_BATCH_CONCURRENCY = int(os.getenv("FEEDBACK_BATCH_CONCURRENCY", "4"))
+FEEDBACK_BATCH_TOKENS_PER_MINUTE = float(os.getenv("FEEDBACK_BATCH_TOKENS_PER_MINUTE", "30000"))
+FEEDBACK_BATCH_COMPLETION_TOKENS = int(os.getenv("FEEDBACK_BATCH_COMPLETION_TOKENS", "400"))
+# How long a batch job's results can be polled after it was started.
+FEEDBACK_BATCH_JOB_TTL_SECONDS = float(os.getenv("FEEDBACK_BATCH_JOB_TTL_SECONDS", "3600"))
+
+# Upper bound on prompt tokens spent on formatted logs; older entries are dropped first.
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+
+FEEDBACK_SCHEDULER_ENABLED = os.getenv("FEEDBACK_SCHEDULER_ENABLED", "true").lower() == "true"
+PRECOMPUTED_FEEDBACK_PATH = os.getenv("PRECOMPUTED_FEEDBACK_PATH", os.path.join(DATA_DIR, "precomputed_feedback.db"))
+# Results for periods older than this many days are deleted as new ones are stored.
+PRECOMPUTED_FEEDBACK_RETENTION_DAYS = int(os.getenv("PRECOMPUTED_FEEDBACK_RETENTION_DAYS", "14"))
+# Local time (HH:MM) at which the day's feedback is generated.
+DAILY_FEEDBACK_CUTOFF = os.getenv("DAILY_FEEDBACK_CUTOFF", "21:00")
+# 0 = Monday ... 6 = Sunday; weekly feedback is generated at the cutoff on this day.
+WEEKLY_FEEDBACK_WEEKDAY = int(os.getenv("WEEKLY_FEEDBACK_WEEKDAY", "6"))
+FEEDBACK_REGENERATE_DEBOUNCE_SECONDS = float(os.getenv("FEEDBACK_REGENERATE_DEBOUNCE_SECONDS", "30"))
+
+STATS_STORE_PATH = os.getenv("STATS_STORE_PATH", os.path.join(DATA_DIR, "stats.db"))
+# Days with at least one log in this status count towards completion streaks.
+COMPLETED_GOAL_STATUS = os.getenv("COMPLETED_GOAL_STATUS", "completed")
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(DATA_DIR, "search.db"))
+# Queries matching more logs than this are ranked among the most recent ones only.
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "2000"))
+
+IDEMPOTENCY_STORE_PATH = os.getenv("IDEMPOTENCY_STORE_PATH", os.path.join(DATA_DIR, "idempotency.db"))
+# A write retried with the same idempotency key within this window returns the original page.
+IDEMPOTENCY_KEY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Prometheus metrics at /metrics. When off, instrumentation is reduced to a flag check.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Each worker process writes its metrics here this often, so /metrics, whichever
+# worker serves it, reports all of them.
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(DATA_DIR, "metrics"))
+METRICS_SNAPSHOT_SECONDS = float(os.getenv("METRICS_SNAPSHOT_SECONDS", "5"))
+# Adds a Server-Timing header with per-request time spent in Notion, formatting and the model.
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
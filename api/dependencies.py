@@ -0,0 +1,84 @@
+# api/dependencies.py
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+
+from api import config
+from api.services.change_feed import ChangeFeed
+from api.services.feedback_batch import FeedbackBatchRunner
+from api.services.feedback_service import FeedbackService, load_llm_stack
+from api.services.notion_service import NotionService
+from api.services.precomputed_store import PrecomputedStore
+from api.services.search_index import SearchIndex
+from api.services.stats_store import StatsStore
+from api.services.summary_service import SummaryService
+from api.services.tenant_registry import Tenant
+
+async def get_tenant(request: Request) -> AsyncIterator[Optional[Tenant]]:
+    """
+    The tenant named by the tenant header, held for the whole request including
+    a streamed response; None for the database configured in the environment.
+    """
+    tenant_id = request.headers.get(config.TENANT_HEADER)
+    if tenant_id is None:
+        yield None
+        return
+    registry = request.app.state.tenant_registry
+    if registry is None:
+        raise HTTPException(status_code=400, detail="This server is not configured for tenants.")
+    async with registry.lease(tenant_id) as tenant:
+        yield tenant
+
+def default_tenant_only(tenant: Optional[Tenant] = Depends(get_tenant)):
+    # Stats, search and precomputed feedback are built from the default database's mirror.
+    if tenant is not None:
+        raise HTTPException(status_code=400, detail="Not available for tenants; only for the default database.")
+
+def get_notion_service(request: Request, tenant: Optional[Tenant] = Depends(get_tenant)) -> NotionService:
+    return tenant.notion_service if tenant is not None else request.app.state.notion_service
+
+def feedback_service_for(app: FastAPI) -> FeedbackService:
+    # Built on first use so a missing OPENAI_API_KEY only fails feedback routes.
+    if app.state.feedback_service is None:
+        app.state.feedback_service = FeedbackService(
+            cache=app.state.feedback_cache,
+            shared_cache=app.state.shared_cache
+        )
+    return app.state.feedback_service
+
+async def get_feedback_service(request: Request) -> FeedbackService:
+    if request.app.state.feedback_service is None:
+        # Import the LLM stack off the event loop unless the background preload already has.
+        await asyncio.to_thread(load_llm_stack)
+    return feedback_service_for(request.app)
+
+def get_feedback_batch_runner(request: Request) -> FeedbackBatchRunner:
+    return request.app.state.feedback_batch_runner
+
+def get_precomputed_store(request: Request, tenant: Optional[Tenant] = Depends(get_tenant)) -> Optional[PrecomputedStore]:
+    # Results are precomputed for the default database only.
+    return request.app.state.precomputed_store if tenant is None else None
+
+def get_search_index(request: Request, _=Depends(default_tenant_only)) -> SearchIndex:
+    return request.app.state.search_index
+
+def get_stats_store(request: Request, _=Depends(default_tenant_only)) -> StatsStore:
+    return request.app.state.stats_store
+
+def get_change_feed(request: Request, _=Depends(default_tenant_only)) -> ChangeFeed:
+    if request.app.state.change_feed is None:
+        raise HTTPException(status_code=503, detail="The change feed needs the local mirror (MIRROR_ENABLED=true).")
+    return request.app.state.change_feed
+
+async def get_summary_service(
+    request: Request,
+    tenant: Optional[Tenant] = Depends(get_tenant),
+    notion_service: NotionService = Depends(get_notion_service),
+    feedback_service: FeedbackService = Depends(get_feedback_service)
+) -> SummaryService:
+    owner = tenant if tenant is not None else request.app.state
+    if owner.summary_service is None:
+        owner.summary_service = SummaryService(notion_service, feedback_service, request.app.state.summary_store)
+    return owner.summary_service
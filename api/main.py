@@ -1,19 +1,211 @@
 # api/main.py
 
+import asyncio
+import datetime
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 import uvicorn
 
-from api.routers import notion_router
+from api import config
+from api.dependencies import feedback_service_for
+from api.routers import feedback_router, metrics_router, notion_router, ops_router
+from api.services.backfill import backfill
+from api.services.change_feed import ChangeFeed
+from api.services.feedback_batch import FeedbackBatchRunner
+from api.services.feedback_cache import FeedbackCache
+from api.services.feedback_scheduler import FeedbackScheduler
+from api.services.feedback_service import preload_llm_stack
+from api.services.idempotency_store import IdempotencyStore
+from api.services.leader import LeaderLock
+from api.services.log_mirror import LogMirror, MirrorSync
+from api.services.notion_service import NotionService, create_notion_client
+from api.services.precomputed_store import PrecomputedStore
+from api.services.search_index import SearchIndex
+from api.services.shared_cache import SharedCache
+from api.services.stats_store import StatsStore
+from api.services.summary_store import SummaryStore
+from api.services.tenant_registry import TenantRegistry, load_tenants
 from api.utils.helpers import logger
+from api.utils import metrics
+from api.utils.metrics import MetricsMiddleware
+from api.utils.tenant_path import TenantPathMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mirror = LogMirror(config.MIRROR_PATH) if config.MIRROR_ENABLED else None
+    idempotency_store = IdempotencyStore(config.IDEMPOTENCY_STORE_PATH, config.IDEMPOTENCY_KEY_TTL_SECONDS)
+    app.state.shared_cache = SharedCache(config.SHARED_CACHE_PATH) if config.SHARED_CACHE_ENABLED else None
+    app.state.notion_service = NotionService(
+        create_notion_client(),
+        mirror=mirror,
+        idempotency_store=idempotency_store,
+        shared_cache=app.state.shared_cache
+    )
+    logger.info("Notion client initialized.")
+    app.state.tenant_registry = None
+    if config.TENANTS_PATH:
+        app.state.tenant_registry = TenantRegistry(
+            load_tenants(config.TENANTS_PATH),
+            config.TENANT_MAX_ACTIVE,
+            config.TENANT_POOL_SIZE,
+            idempotency_store=idempotency_store,
+            shared_cache=app.state.shared_cache
+        )
+        logger.info("Loaded %s tenants from %s.", len(app.state.tenant_registry.tenants), config.TENANTS_PATH)
+
+    feedback_enabled = config.API_PROFILE != "logs"
+    app.state.feedback_cache = (
+        FeedbackCache(
+            config.FEEDBACK_CACHE_PATH,
+            memory_entries=config.FEEDBACK_CACHE_MEMORY_ENTRIES,
+            ttl_seconds=config.FEEDBACK_CACHE_TTL_SECONDS,
+            max_disk_bytes=config.FEEDBACK_CACHE_MAX_BYTES
+        ) if feedback_enabled and config.FEEDBACK_CACHE_ENABLED else None
+    )
+    app.state.feedback_service = None
+    app.state.summary_store = SummaryStore(config.SUMMARY_STORE_PATH) if feedback_enabled else None
+    app.state.summary_service = None
+    app.state.precomputed_store = (
+        PrecomputedStore(config.PRECOMPUTED_FEEDBACK_PATH, config.PRECOMPUTED_FEEDBACK_RETENTION_DAYS)
+        if feedback_enabled else None
+    )
+    app.state.feedback_batch_runner = (
+        FeedbackBatchRunner(
+            config.FEEDBACK_BATCH_CONCURRENCY,
+            config.FEEDBACK_BATCH_TOKENS_PER_MINUTE,
+            config.FEEDBACK_BATCH_JOB_TTL_SECONDS,
+            shared_cache=app.state.shared_cache
+        ) if feedback_enabled else None
+    )
+    app.state.stats_store = StatsStore(config.STATS_STORE_PATH, config.COMPLETED_GOAL_STATUS)
+    app.state.notion_service.add_listener(app.state.stats_store.apply)
+    app.state.notion_service.add_removal_listener(app.state.stats_store.remove)
+    app.state.search_index = SearchIndex(config.SEARCH_INDEX_PATH, config.SEARCH_MAX_CANDIDATES)
+    app.state.notion_service.add_listener(app.state.search_index.apply)
+    app.state.notion_service.add_removal_listener(app.state.search_index.remove)
+
+    mirror_sync = None
+    app.state.change_feed = None
+    if mirror is not None:
+        mirror_sync = MirrorSync(
+            app.state.notion_service,
+            mirror,
+            config.MIRROR_SYNC_INTERVAL_SECONDS,
+            config.MIRROR_RECONCILE_INTERVAL_SECONDS
+        )
+        # Runs in every worker: it only reads the mirror, which the leader keeps synced.
+        app.state.change_feed = ChangeFeed(
+            mirror,
+            config.CHANGE_FEED_POLL_SECONDS,
+            config.CHANGE_FEED_KEEPALIVE_SECONDS,
+            config.CHANGE_FEED_QUEUE_SIZE
+        )
+        app.state.notion_service.add_listener(app.state.change_feed.on_logs)
+        app.state.change_feed.start()
+
+    scheduler = None
+    if feedback_enabled and config.FEEDBACK_SCHEDULER_ENABLED:
+        scheduler = FeedbackScheduler(
+            app.state.notion_service,
+            lambda: feedback_service_for(app),
+            app.state.precomputed_store,
+            daily_cutoff=datetime.time.fromisoformat(config.DAILY_FEEDBACK_CUTOFF),
+            weekly_weekday=config.WEEKLY_FEEDBACK_WEEKDAY,
+            debounce_seconds=config.FEEDBACK_REGENERATE_DEBOUNCE_SECONDS
+        )
+        # Every worker regenerates results its own writes affect; the leader runs the cutoff loop.
+        scheduler.start(schedule=False)
+
+    # With several worker processes (python -m api.serve), only one of them
+    # syncs the mirror, backfills and runs the schedule; the rest take over if it exits.
+    app.state.leader_lock = LeaderLock(config.LEADER_LOCK_PATH, config.LEADER_RETRY_SECONDS)
+    backfills = []
+
+    async def lead():
+        await app.state.leader_lock.wait()
+        logger.info("Worker %s runs background jobs.", os.getpid())
+        backfills.extend(
+            asyncio.create_task(backfill(store, app.state.notion_service, mirror))
+            for store in (app.state.stats_store, app.state.search_index)
+        )
+        if mirror_sync is not None:
+            mirror_sync.start()
+            logger.info("Notion mirror sync started (%s).", config.MIRROR_PATH)
+        if scheduler is not None:
+            scheduler.schedule()
+            logger.info("Feedback scheduler started (daily at %s).", config.DAILY_FEEDBACK_CUTOFF)
+
+    leader = asyncio.create_task(lead())
+
+    async def publish_metrics():
+        # Lets whichever worker serves /metrics report the others too.
+        while True:
+            try:
+                await asyncio.to_thread(metrics.write_snapshot, config.METRICS_DIR)
+            except OSError as e:
+                logger.error("Error writing metrics snapshot: %s", e)
+            await asyncio.sleep(config.METRICS_SNAPSHOT_SECONDS)
+
+    metrics_publisher = asyncio.create_task(publish_metrics()) if config.METRICS_ENABLED else None
+
+    preload = asyncio.create_task(preload_llm_stack()) if feedback_enabled and config.FEEDBACK_PRELOAD else None
+    logger.info("API profile: %s.", config.API_PROFILE)
+    try:
+        yield
+    finally:
+        if preload is not None:
+            preload.cancel()
+        leader.cancel()
+        if metrics_publisher is not None:
+            metrics_publisher.cancel()
+            metrics.remove_snapshot(config.METRICS_DIR)
+        for task in backfills:
+            task.cancel()
+        if scheduler is not None:
+            await scheduler.stop()
+        if mirror_sync is not None:
+            await app.state.change_feed.stop()
+            await mirror_sync.stop()
+            mirror.close()
+        if feedback_enabled:
+            await app.state.feedback_batch_runner.aclose()
+            app.state.summary_store.close()
+            app.state.precomputed_store.close()
+        app.state.stats_store.close()
+        app.state.search_index.close()
+        idempotency_store.close()
+        if app.state.shared_cache is not None:
+            app.state.shared_cache.close()
+        app.state.leader_lock.release()
+        if app.state.feedback_cache is not None:
+            app.state.feedback_cache.close()
+        if app.state.tenant_registry is not None:
+            await app.state.tenant_registry.aclose()
+        await app.state.notion_service.aclose()
+        logger.info("Notion client closed.")
 
 app = FastAPI(
     title="AI Life Coach API",
     version="1.0",
-    description="An API server for AI life coach interactions"
+    description="An API server for AI life coach interactions",
+    lifespan=lifespan
 )
 
 app.include_router(notion_router)
+if config.API_PROFILE != "logs":
+    app.include_router(feedback_router)
+app.include_router(ops_router)
+if config.METRICS_ENABLED:
+    app.include_router(metrics_router)
+if config.METRICS_ENABLED or config.TRACING_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if config.TENANTS_PATH:
+    # Added last so it runs first and metrics see the route without the tenant prefix.
+    app.add_middleware(TenantPathMiddleware, header=config.TENANT_HEADER)
 
 if __name__ == "__main__":
+    # Development server with auto-reload; run python -m api.serve in production.
     logger.info("Starting AI Life Coach API server...")
     uvicorn.run("api.main:app", host="0.0.0.0", port=8000, reload=True)
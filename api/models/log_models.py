@@ -1,6 +1,27 @@
 # api/models/log_models.py
 
-from pydantic import BaseModel
+import datetime
+from dataclasses import dataclass
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from api import config
+
+# "eventual" reads may be served from the local mirror; "strong" always goes to Notion.
+Consistency = Literal["eventual", "strong"]
+
+@dataclass(slots=True)
+class LogRecord:
+    """
+    Compact, read-side representation of one log, as decoded from a Notion
+    page or a mirror row. Serializes to the same JSON shape as LogEntry.
+    """
+    date: str
+    thoughts: str
+    goals: str
+    reflections: str
+    goal_status: str
 
 class LogEntry(BaseModel):
     date: str
@@ -8,8 +29,21 @@ class LogEntry(BaseModel):
     goals: str
     reflections: str
     goal_status: str
+    # Client-generated; a retry carrying the same key does not create a second page.
+    idempotency_key: Optional[str] = Field(None, max_length=200)
+
+class LogBatch(BaseModel):
+    entries: List[LogEntry] = Field(..., min_length=1, max_length=config.LOG_BATCH_MAX_ENTRIES)
 
 class FeedbackRequest(BaseModel):
     thoughts: str
     goals: str
     reflections: str
+
+class DateRange(BaseModel):
+    start: datetime.date
+    end: datetime.date
+
+class FeedbackBatch(BaseModel):
+    # Each item is answered like POST /feedback (FeedbackRequest) or POST /feedback/range (DateRange).
+    items: List[Union[FeedbackRequest, DateRange]] = Field(..., min_length=1, max_length=config.FEEDBACK_BATCH_MAX_ITEMS)
@@ -1,5 +1,8 @@
 # api/routers/__init__.py
 
+from .feedback import router as feedback_router
+from .metrics import router as metrics_router
 from .notion_logic import router as notion_router
+from .ops import router as ops_router
 
-__all__ = ["notion_router"]
\ No newline at end of file
+__all__ = ["feedback_router", "metrics_router", "notion_router", "ops_router"]
@@ -0,0 +1,153 @@
+# api/routers/feedback.py
+
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from api.dependencies import (
+    get_feedback_batch_runner,
+    get_feedback_service,
+    get_notion_service,
+    get_precomputed_store,
+    get_summary_service,
+    get_tenant
+)
+from api.models.log_models import Consistency, FeedbackBatch, FeedbackRequest
+from api.services.feedback_batch import FeedbackBatchRunner
+from api.services.feedback_service import FeedbackService
+from api.services.notion_service import NotionService
+from api.services.precomputed_store import PrecomputedStore
+from api.services.summary_service import SummaryService
+from api.services.tenant_registry import Tenant
+from api.utils.helpers import dumps_json, format_sse, logger
+
+router = APIRouter()
+
+# Optional per-request budget in milliseconds: the answer must be complete
+# within it, or for streams must have started.
+Deadline = Query(None, ge=1)
+
+def deadline_seconds(deadline_ms: Optional[int]) -> Optional[float]:
+    return deadline_ms / 1000 if deadline_ms else None
+
+async def stream_sse(events):
+    try:
+        async for event in events:
+            if event.get("done"):
+                yield format_sse(event, event="done")
+            else:
+                yield format_sse(event)
+    except Exception as e:
+        logger.error("Error streaming feedback: %s", e)
+        yield format_sse({"detail": str(e)}, event="error")
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        stream_sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def precomputed_events(result: dict):
+    yield {"token": result["feedback"]}
+    yield {"done": True, **{key: value for key, value in result.items() if key != "feedback"}}
+
+@router.post("/feedback")
+async def generate_feedback(
+    request: FeedbackRequest,
+    stream: bool = False,
+    deadline_ms: Optional[int] = Deadline,
+    feedback_service: FeedbackService = Depends(get_feedback_service)
+):
+    deadline = deadline_seconds(deadline_ms)
+    if stream:
+        return sse_response(feedback_service.stream_feedback(request, deadline))
+    return await feedback_service.generate_feedback(request, deadline)
+
+@router.post("/daily_feedback")
+async def generate_daily_feedback(
+    stream: bool = False,
+    consistency: Consistency = "eventual",
+    deadline_ms: Optional[int] = Deadline,
+    service: NotionService = Depends(get_notion_service),
+    feedback_service: FeedbackService = Depends(get_feedback_service),
+    precomputed_store: Optional[PrecomputedStore] = Depends(get_precomputed_store)
+):
+    today_str = datetime.date.today().isoformat()
+    use_precomputed = precomputed_store is not None and consistency != "strong"
+    precomputed = await precomputed_store.get("daily", today_str) if use_precomputed else None
+    if precomputed is not None:
+        return sse_response(precomputed_events(precomputed)) if stream else precomputed
+    logs = await service.fetch_logs_for_date_range(today_str, today_str, consistency)
+    if stream:
+        return sse_response(feedback_service.stream_daily_feedback(logs, deadline_seconds(deadline_ms)))
+    return await feedback_service.generate_daily_feedback(logs, deadline_seconds(deadline_ms))
+
+@router.post("/weekly_feedback")
+async def generate_weekly_feedback(
+    stream: bool = False,
+    consistency: Consistency = "eventual",
+    deadline_ms: Optional[int] = Deadline,
+    service: NotionService = Depends(get_notion_service),
+    feedback_service: FeedbackService = Depends(get_feedback_service),
+    precomputed_store: Optional[PrecomputedStore] = Depends(get_precomputed_store)
+):
+    today = datetime.date.today()
+    one_week_ago_str = (today - datetime.timedelta(days=6)).isoformat()
+    today_str = today.isoformat()
+    use_precomputed = precomputed_store is not None and consistency != "strong"
+    precomputed = await precomputed_store.get("weekly", today_str) if use_precomputed else None
+    if precomputed is not None:
+        return sse_response(precomputed_events(precomputed)) if stream else precomputed
+    logs = await service.fetch_logs_for_date_range(one_week_ago_str, today_str, consistency)
+    if stream:
+        return sse_response(feedback_service.stream_weekly_feedback(logs, deadline_seconds(deadline_ms)))
+    return await feedback_service.generate_weekly_feedback(logs, deadline_seconds(deadline_ms))
+
+@router.post("/feedback/range")
+async def generate_range_feedback(
+    start: datetime.date,
+    end: datetime.date,
+    consistency: Consistency = "eventual",
+    summary_service: SummaryService = Depends(get_summary_service)
+):
+    return await summary_service.generate_range_feedback(start, end, consistency)
+
+async def stream_batch_ndjson(results):
+    async for result in results:
+        yield dumps_json(result) + b"\n"
+
+# Streams one NDJSON line per item as it finishes, then a summary line; with
+# job=true, answers 202 with a job id to poll at GET /feedback/batch/{job_id}.
+@router.post("/feedback/batch")
+async def generate_feedback_batch(
+    batch: FeedbackBatch,
+    job: bool = False,
+    consistency: Consistency = "eventual",
+    runner: FeedbackBatchRunner = Depends(get_feedback_batch_runner),
+    feedback_service: FeedbackService = Depends(get_feedback_service),
+    summary_service: SummaryService = Depends(get_summary_service),
+    tenant: Optional[Tenant] = Depends(get_tenant)
+):
+    # A job outlives the request, and with it the tenant's lease on its Notion client.
+    if job and tenant is not None:
+        raise HTTPException(status_code=400, detail="Batch jobs are only available for the default database.")
+
+    async def handle(item) -> dict:
+        if isinstance(item, FeedbackRequest):
+            return await feedback_service.generate_feedback(item)
+        return await summary_service.generate_range_feedback(item.start, item.end, consistency)
+
+    if job:
+        job_id = await runner.start_job(batch.items, handle)
+        return JSONResponse({"job_id": job_id, "total": len(batch.items)}, status_code=202)
+    return StreamingResponse(stream_batch_ndjson(runner.run(batch.items, handle)), media_type="application/x-ndjson")
+
+@router.get("/feedback/batch/{job_id}")
+async def get_feedback_batch(job_id: str, runner: FeedbackBatchRunner = Depends(get_feedback_batch_runner)):
+    result = await runner.get_job(job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Batch job not found or expired.")
+    return result
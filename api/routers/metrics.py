@@ -0,0 +1,19 @@
+# api/routers/metrics.py
+
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from api import config
+from api.utils import metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    # Snapshots older than a few missed writes belong to workers that have exited.
+    snapshots = await asyncio.to_thread(
+        metrics.read_snapshots, config.METRICS_DIR, 3 * config.METRICS_SNAPSHOT_SECONDS
+    )
+    return Response(metrics.render(snapshots), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,50 +1,135 @@
 # api/routers/notion_logic.py
 
 import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
 
-from api.models.log_models import LogEntry, FeedbackRequest
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from api.dependencies import get_change_feed, get_notion_service, get_search_index, get_stats_store
+from api.models.log_models import Consistency, LogBatch, LogEntry
+from api.services.change_feed import ChangeFeed
 from api.services.notion_service import NotionService
-from api.services.feedback_service import FeedbackService
+from api.services.search_index import SearchIndex
+from api.services.stats_store import StatsStore
+from api.utils.helpers import dumps_json, etag_json_response, format_sse, json_response, logger
 
 router = APIRouter()
 
+async def stream_ndjson(first, logs):
+    yield dumps_json(first) + b"\n"
+    try:
+        async for log in logs:
+            yield dumps_json(log) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so the failure is reported as a last line
+        # for clients to tell a cut-off stream from a complete one.
+        logger.error("Error streaming logs: %s", e)
+        yield dumps_json({"error": str(e)}) + b"\n"
+
 @router.get("/daily_logs")
-async def get_daily_logs(service: NotionService = Depends()):
+async def get_daily_logs(
+    request: Request,
+    consistency: Consistency = "eventual",
+    service: NotionService = Depends(get_notion_service)
+):
     today = datetime.date.today().isoformat()
-    logs = await service.fetch_logs_for_date_range(today, today)
-    return {"logs": logs}
+    logs = await service.fetch_logs_for_date_range(today, today, consistency)
+    return etag_json_response(request, {"logs": logs})
 
 @router.get("/weekly_logs")
-async def get_weekly_logs(service: NotionService = Depends()):
+async def get_weekly_logs(
+    request: Request,
+    consistency: Consistency = "eventual",
+    service: NotionService = Depends(get_notion_service)
+):
     today = datetime.date.today()
     one_week_ago = (today - datetime.timedelta(days=6)).isoformat()
     today_str = today.isoformat()
-    logs = await service.fetch_logs_for_date_range(one_week_ago, today_str)
-    return {"logs": logs}
+    logs = await service.fetch_logs_for_date_range(one_week_ago, today_str, consistency)
+    return etag_json_response(request, {"logs": logs})
 
 @router.get("/logs")
-async def fetch_logs(goal_status: str = None, service: NotionService = Depends()):
-    return await service.get_logs(goal_status)
+async def fetch_logs(
+    request: Request,
+    goal_status: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    consistency: Consistency = "eventual",
+    service: NotionService = Depends(get_notion_service)
+):
+    if stream:
+        logs = service.stream_logs(goal_status, consistency)
+        # Reading the first page before the response starts lets a failure
+        # there return an error status instead of an empty 200.
+        try:
+            first = await logs.__anext__()
+        except StopAsyncIteration:
+            return StreamingResponse(iter(()), media_type="application/x-ndjson")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error streaming logs: %s", e)
+            raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+        return StreamingResponse(stream_ndjson(first, logs), media_type="application/x-ndjson")
+    return etag_json_response(
+        request,
+        await service.get_logs(goal_status, limit=limit, cursor=cursor, consistency=consistency)
+    )
 
-@router.post("/logs")
-async def add_log(entry: LogEntry, service: NotionService = Depends()):
-    return await service.create_log(entry)
+@router.get("/logs/search")
+async def search_logs(
+    q: str = Query(..., min_length=1),
+    goal_status: str = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    search_index: SearchIndex = Depends(get_search_index)
+):
+    results, capped = await search_index.search(q, goal_status, start, end, limit)
+    return json_response({"query": q, "results": results, "capped": capped})
 
-@router.post("/feedback")
-async def generate_feedback(request: FeedbackRequest, feedback_service: FeedbackService = Depends()):
-    return await feedback_service.generate_feedback(request)
+async def stream_changes(changes):
+    async for change in changes:
+        if change is None:
+            # Comment line; keeps idle connections open through proxies.
+            yield ": keep-alive\n\n"
+        elif change.get("overflow"):
+            yield format_sse({"detail": "Subscriber fell behind; reconnect with Last-Event-ID."}, event="overflow")
+        else:
+            yield format_sse(change, event=change["change"], event_id=str(change["seq"]))
 
-@router.post("/daily_feedback")
-async def generate_daily_feedback(service: NotionService = Depends(), feedback_service: FeedbackService = Depends()):
-    today_str = datetime.date.today().isoformat()
-    logs = await service.fetch_logs_for_date_range(today_str, today_str)
-    return await feedback_service.generate_daily_feedback(logs)
+# Server-Sent Events: one "created" or "updated" event per changed log, with
+# the change's seq as the event id. Reconnecting with Last-Event-ID (or since)
+# first replays what was missed.
+@router.get("/logs/changes")
+async def log_changes(
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[int] = Header(None),
+    feed: ChangeFeed = Depends(get_change_feed)
+):
+    return StreamingResponse(
+        stream_changes(feed.subscribe(since if since is not None else last_event_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-@router.post("/weekly_feedback")
-async def generate_weekly_feedback(service: NotionService = Depends(), feedback_service: FeedbackService = Depends()):
-    today = datetime.date.today()
-    one_week_ago_str = (today - datetime.timedelta(days=6)).isoformat()
-    today_str = today.isoformat()
-    logs = await service.fetch_logs_for_date_range(one_week_ago_str, today_str)
-    return await feedback_service.generate_weekly_feedback(logs)
+@router.get("/stats")
+async def get_stats(
+    granularity: Literal["day", "week", "month"] = "day",
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    stats_store: StatsStore = Depends(get_stats_store)
+):
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end.")
+    return await stats_store.get_stats(granularity, start, end)
+
+@router.post("/logs")
+async def add_log(entry: LogEntry, service: NotionService = Depends(get_notion_service)):
+    return await service.create_log(entry)
+
+@router.post("/logs/batch")
+async def add_logs(batch: LogBatch, service: NotionService = Depends(get_notion_service)):
+    return await service.create_logs(batch.entries)
@@ -0,0 +1,27 @@
+# api/routers/ops.py
+
+import os
+
+from fastapi import APIRouter, Request
+
+router = APIRouter(prefix="/ops")
+
+@router.get("/stats")
+async def get_stats(request: Request):
+    cache = request.app.state.feedback_cache
+    feedback_service = request.app.state.feedback_service
+    shared_cache = request.app.state.shared_cache
+    tenant_registry = request.app.state.tenant_registry
+    change_feed = request.app.state.change_feed
+    return {
+        "worker": {"pid": os.getpid(), "leader": request.app.state.leader_lock.held},
+        "feedback_cache": cache.stats() if cache is not None else None,
+        "shared_cache": shared_cache.stats() if shared_cache is not None else None,
+        "tenants": tenant_registry.stats() if tenant_registry is not None else None,
+        "change_feed": change_feed.stats() if change_feed is not None else None,
+        "coalescing": {
+            "notion_reads": request.app.state.notion_service.read_singleflight.stats(),
+            "notion_creates": request.app.state.notion_service.create_singleflight.stats(),
+            "feedback": feedback_service.singleflight.stats() if feedback_service is not None else None
+        }
+    }
@@ -0,0 +1,133 @@
+# api/serve.py
+#
+# Production entry point:
+#
+#   API_WORKERS=4 python -m api.serve
+#
+# The app (and, with FEEDBACK_PRELOAD, the LLM stack) is imported once in the
+# supervisor before forking, so workers start in milliseconds and share those
+# pages. Workers accept connections from one listening socket, are restarted
+# if they die, and on SIGTERM/SIGINT get API_GRACEFUL_TIMEOUT_SECONDS to finish
+# in-flight requests before they are killed. Settings come from api/config.py.
+
+import os
+import signal
+import socket
+import time
+from typing import Dict
+
+import uvicorn
+
+from api import config
+from api.main import app
+from api.utils.helpers import logger
+
+# A worker that exits sooner than this after starting is restarted with a delay,
+# so a worker that cannot start does not fork in a tight loop.
+MIN_WORKER_UPTIME_SECONDS = 1.0
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def create_server() -> uvicorn.Server:
+    return uvicorn.Server(uvicorn.Config(
+        app,
+        host=config.API_HOST,
+        port=config.API_PORT,
+        timeout_graceful_shutdown=config.API_GRACEFUL_TIMEOUT_SECONDS
+    ))
+
+class Supervisor:
+    """Pre-fork process manager: keeps `workers` uvicorn workers running on one socket."""
+
+    def __init__(self, sock: socket.socket, workers: int, graceful_timeout: float):
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.children: Dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                # uvicorn installs its own SIGTERM/SIGINT handlers for a graceful stop.
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                create_server().run(sockets=[self.sock])
+            except BaseException as e:
+                logger.error("Worker %s failed: %s", os.getpid(), e)
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %s.", pid)
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _reap(self) -> bool:
+        """Collects exited workers and restarts them unless stopping. True if any exited."""
+        reaped = False
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            reaped = True
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logger.error("Worker %s exited with status %s; restarting it.", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < MIN_WORKER_UPTIME_SECONDS:
+                time.sleep(MIN_WORKER_UPTIME_SECONDS)
+            self.spawn()
+        return reaped
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self.spawn()
+        while not self.stopping:
+            if not self._reap():
+                time.sleep(0.5)
+        self.shutdown()
+
+    def shutdown(self):
+        logger.info("Stopping %s workers.", len(self.children))
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+        # Workers stop accepting, finish in-flight requests and run the lifespan shutdown.
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            if not self._reap():
+                time.sleep(0.1)
+        for pid in self.children:
+            logger.error("Worker %s did not stop in time; killing it.", pid)
+            os.kill(pid, signal.SIGKILL)
+        while self.children:
+            pid, _ = os.waitpid(-1, 0)
+            self.children.pop(pid, None)
+        self.sock.close()
+
+def main():
+    if config.API_PROFILE != "logs" and config.FEEDBACK_PRELOAD:
+        from api.services.feedback_service import load_feedback_stack
+        load_feedback_stack()
+    workers = max(1, config.API_WORKERS)
+    if workers == 1 or not hasattr(os, "fork"):
+        create_server().run()
+        return
+    sock = bind_socket(config.API_HOST, config.API_PORT)
+    logger.info("Serving on %s:%s with %s workers.", config.API_HOST, config.API_PORT, workers)
+    Supervisor(sock, workers, config.API_GRACEFUL_TIMEOUT_SECONDS).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
 # api/services/__init__.py
 
-from .notion_service import NotionService
-from .feedback_service import FeedbackService
+# Resolved on first access, so importing any api.services module does not pull
+# in the LLM stack through FeedbackService.
+__all__ = ["NotionService", "FeedbackService"]
 
-__all__ = ["NotionService", "FeedbackService"]
\ No newline at end of file
+def __getattr__(name):
+    if name == "NotionService":
+        from .notion_service import NotionService
+        return NotionService
+    if name == "FeedbackService":
+        from .feedback_service import FeedbackService
+        return FeedbackService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
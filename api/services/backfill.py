@@ -0,0 +1,23 @@
+# api/services/backfill.py
+
+from api.utils.helpers import logger
+
+async def backfill(store, notion_service, mirror=None):
+    """
+    One-off backfill for a store fed by NotionService listeners (apply, is_seeded,
+    mark_seeded): reads the mirror when there is one, otherwise pages through
+    Notion. After this, the listener keeps the store current.
+    """
+    if await store.is_seeded():
+        return
+    name = type(store).__name__
+    try:
+        if mirror is not None:
+            await store.apply(await mirror.all_rows())
+        else:
+            async for pages in notion_service.iter_pages():
+                await store.apply([notion_service.to_row(page) for page in pages])
+        await store.mark_seeded()
+        logger.info("%s backfilled.", name)
+    except Exception as e:
+        logger.error("Error backfilling %s: %s", name, e)
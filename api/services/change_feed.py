@@ -0,0 +1,125 @@
+# api/services/change_feed.py
+
+import asyncio
+from typing import AsyncIterator, List, Optional, Set
+
+from api.services.log_mirror import LogMirror
+from api.utils.helpers import logger
+
+# Rows read from the mirror per query, both when publishing and when replaying.
+PAGE_SIZE = 500
+# Queued in place of a change when a subscriber falls too far behind.
+OVERFLOW = {"overflow": True}
+
+class ChangeFeed:
+    """
+    Pushes log changes to any number of subscribers from one watcher per
+    worker. The watcher reads the local mirror, never Notion: changes reach the
+    mirror through the leader's MirrorSync (pages edited in Notion) and through
+    every worker's write path, and each one carries a sequence number. The
+    watcher wakes on local writes and otherwise checks every poll_seconds, so
+    Notion sees the same traffic however many clients are watching.
+    """
+
+    def __init__(self, mirror: LogMirror, poll_seconds: float, keepalive_seconds: float, queue_size: int):
+        self.mirror = mirror
+        self.poll_seconds = poll_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.queue_size = queue_size
+        self.seq = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    async def on_logs(self, rows: List[dict]):
+        # Listener for writes made in this worker; they are already in the mirror.
+        self._wake.set()
+
+    async def _publish(self):
+        while True:
+            changes = await self.mirror.changes_since(self.seq, PAGE_SIZE)
+            if not changes:
+                return
+            self.seq = changes[-1]["seq"]
+            for queue in list(self._subscribers):
+                if queue.qsize() + len(changes) > self.queue_size:
+                    # A subscriber that cannot keep up is cut off rather than
+                    # buffered without bound; it reconnects from its last seq.
+                    self._subscribers.discard(queue)
+                    queue.put_nowait(OVERFLOW)
+                    self.dropped += 1
+                    continue
+                for change in changes:
+                    queue.put_nowait(change)
+
+    async def run(self):
+        # The initial sync inserts the whole history; starting after it keeps
+        # that from being pushed as one burst of "created" events.
+        while not await self.mirror.is_ready():
+            await asyncio.sleep(self.poll_seconds)
+        self.seq = await self.mirror.head()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._publish()
+            except Exception as e:
+                logger.error("Error reading log changes: %s", e)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def subscribe(self, since: Optional[int] = None) -> AsyncIterator[Optional[dict]]:
+        """
+        Yields changed rows as they happen, each with its seq and a "change" of
+        "created" or "updated". With since, first replays the changes after
+        that seq. Yields None after keepalive_seconds without a change, and
+        {"overflow": True} before ending if the subscriber fell behind.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        last = self.seq if since is None else since
+        try:
+            if since is not None:
+                # Rows published while replaying are also queued; the seq check skips them.
+                while changes := await self.mirror.changes_since(last, PAGE_SIZE):
+                    for change in changes:
+                        yield self._event(change)
+                    last = changes[-1]["seq"]
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if change is OVERFLOW:
+                    yield OVERFLOW
+                    return
+                if change["seq"] <= last:
+                    continue
+                last = change["seq"]
+                yield self._event(change)
+        finally:
+            self._subscribers.discard(queue)
+
+    @staticmethod
+    def _event(row: dict) -> dict:
+        # The same row dict is queued for every subscriber, so it is copied, not edited.
+        event = {key: value for key, value in row.items() if key != "created_seq"}
+        event["change"] = "created" if row["created_seq"] == row["seq"] else "updated"
+        return event
+
+    def stats(self) -> dict:
+        return {"seq": self.seq, "subscribers": len(self._subscribers), "dropped": self.dropped}
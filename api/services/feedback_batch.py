@@ -0,0 +1,110 @@
+# api/services/feedback_batch.py
+
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+
+from api.services.feedback_service import set_token_budget
+from api.services.shared_cache import SharedCache
+from api.utils.helpers import logger
+from api.utils.rate_limit import TokenBucket
+
+class FeedbackBatchRunner:
+    """
+    Generates feedback for many items at once. Items run concurrently, at most
+    `concurrency` at a time across all batches in this worker, and every model
+    call they make is metered against one per-minute token budget. Results are
+    produced as items finish, either streamed or kept as a pollable job.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        tokens_per_minute: float,
+        job_ttl_seconds: float,
+        shared_cache: Optional[SharedCache] = None
+    ):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.budget = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute > 0 else None
+        self.job_ttl_seconds = job_ttl_seconds
+        # Job state lives in the shared cache when there is one, so any worker can answer a poll.
+        self.shared_cache = shared_cache
+        self._jobs: Dict[str, Tuple[dict, float]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _run_item(self, index: int, item: Any, handle: Callable[[Any], Awaitable[dict]]) -> dict:
+        async with self._semaphore:
+            set_token_budget(self.budget)
+            try:
+                return {"index": index, "status": "ok", **await handle(item)}
+            except HTTPException as e:
+                return {"index": index, "status": "failed", "error": e.detail}
+            except Exception as e:
+                logger.error("Error generating batch item %s: %s", index, e)
+                return {"index": index, "status": "failed", "error": str(e)}
+
+    async def run(self, items: List[Any], handle: Callable[[Any], Awaitable[dict]]) -> AsyncIterator[dict]:
+        """
+        Yields one result per item, tagged with its index, in the order items
+        finish, then a summary {"done": True, "ok": n, "failed": n}.
+        """
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(self._run_item(i, item, handle)) for i, item in enumerate(items)]
+        counts = {"ok": 0, "failed": 0}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                counts[result["status"]] += 1
+                yield result
+        finally:
+            # Unfinished items are dropped if the consumer stops early (client disconnected).
+            for task in tasks:
+                task.cancel()
+        logger.info("Feedback batch of %s finished: %s ok, %s failed", len(items), counts["ok"], counts["failed"])
+        yield {"done": True, **counts, "latency_ms": round((time.perf_counter() - started) * 1000)}
+
+    async def start_job(self, items: List[Any], handle: Callable[[Any], Awaitable[dict]]) -> str:
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "status": "running", "total": len(items), "completed": 0, "results": []}
+        await self._save(job)
+        task = asyncio.create_task(self._run_job(job, items, handle))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    async def _run_job(self, job: dict, items: List[Any], handle: Callable[[Any], Awaitable[dict]]):
+        try:
+            async for result in self.run(items, handle):
+                if result.get("done"):
+                    job.update(status="done", summary=result)
+                else:
+                    job["results"].append(result)
+                    job["completed"] += 1
+                await self._save(job)
+        except Exception as e:
+            logger.error("Error running feedback batch job %s: %s", job["job_id"], e)
+            job.update(status="failed", error=str(e))
+            await self._save(job)
+
+    async def _save(self, job: dict):
+        if self.shared_cache is not None:
+            await self.shared_cache.set("feedback_job:" + job["job_id"], job, self.job_ttl_seconds)
+        else:
+            now = time.monotonic()
+            for job_id in [job_id for job_id, (_, expires_at) in self._jobs.items() if expires_at <= now]:
+                del self._jobs[job_id]
+            self._jobs[job["job_id"]] = ({**job, "results": list(job["results"])}, now + self.job_ttl_seconds)
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        if self.shared_cache is not None:
+            return await self.shared_cache.get("feedback_job:" + job_id)
+        job, expires_at = self._jobs.get(job_id, (None, 0.0))
+        return job if expires_at > time.monotonic() else None
+
+    async def aclose(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,159 @@
+# api/services/feedback_cache.py
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from api.utils.helpers import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_cache_last_access ON feedback_cache (last_access);
+"""
+
+class FeedbackCache:
+    """
+    Two-tier cache for generated feedback: an in-memory LRU in front of a
+    SQLite table that survives restarts. Entries expire after ttl_seconds and
+    the disk tier evicts least recently used entries beyond max_disk_bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        memory_entries: int = 256,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_disk_bytes: int = 50 * 1024 * 1024
+    ):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, temperature: float, template: str, inputs: dict) -> str:
+        payload = json.dumps([model, temperature, template, inputs], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM feedback_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.ttl_seconds <= now:
+                self._conn.execute("DELETE FROM feedback_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE feedback_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0], row[1] + self.ttl_seconds
+
+    def _disk_set(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO feedback_cache (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "created_at = excluded.created_at, last_access = excluded.last_access",
+                (key, value, size, now, now)
+            )
+            expired = self._conn.execute(
+                "DELETE FROM feedback_cache WHERE created_at <= ?", (now - self.ttl_seconds,)
+            ).rowcount
+            self.evictions += expired + self._evict_oversize()
+            self._conn.commit()
+
+    def _evict_oversize(self) -> int:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM feedback_cache").fetchone()[0]
+        evicted = 0
+        if total <= self.max_disk_bytes:
+            return evicted
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM feedback_cache ORDER BY last_access"
+        ).fetchall():
+            self._conn.execute("DELETE FROM feedback_cache WHERE key = ?", (key,))
+            evicted += 1
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+        return evicted
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None and entry[1] > time.time():
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry[0]
+
+        entry = await asyncio.to_thread(self._disk_get, key)
+        if entry is None:
+            self._memory.pop(key, None)
+            self.misses += 1
+            return None
+        self._remember(key, *entry)
+        self.disk_hits += 1
+        return entry[0]
+
+    async def set(self, key: str, value: str):
+        self._remember(key, value, time.time() + self.ttl_seconds)
+        try:
+            await asyncio.to_thread(self._disk_set, key, value)
+        except sqlite3.Error as e:
+            # The memory tier still serves this entry; losing persistence is not fatal.
+            logger.error("Error writing feedback cache entry: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            disk_entries, disk_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM feedback_cache"
+            ).fetchone()
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries,
+            "disk_bytes": disk_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,140 @@
+# api/services/feedback_scheduler.py
+
+import asyncio
+import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from api.services.feedback_service import FeedbackService
+from api.services.notion_service import NotionService
+from api.services.precomputed_store import PrecomputedStore
+from api.utils.helpers import logger
+
+class FeedbackScheduler:
+    """
+    Pre-generates daily feedback at the daily cutoff and weekly feedback at the
+    cutoff on the configured weekday, storing results in a PrecomputedStore.
+    New or edited logs inside a precomputed range trigger a debounced regeneration.
+    """
+
+    def __init__(
+        self,
+        notion_service: NotionService,
+        feedback_service_factory: Callable[[], FeedbackService],
+        store: PrecomputedStore,
+        daily_cutoff: datetime.time,
+        weekly_weekday: int,
+        debounce_seconds: float
+    ):
+        self.notion_service = notion_service
+        self.feedback_service_factory = feedback_service_factory
+        self.store = store
+        self.daily_cutoff = daily_cutoff
+        self.weekly_weekday = weekly_weekday
+        self.debounce_seconds = debounce_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    @staticmethod
+    def weekly_range(end: datetime.date) -> Tuple[str, str]:
+        return (end - datetime.timedelta(days=6)).isoformat(), end.isoformat()
+
+    async def generate_daily(self, day: datetime.date):
+        day_str = day.isoformat()
+        logs = await self.notion_service.fetch_logs_for_date_range(day_str, day_str)
+        if not logs:
+            logger.info("No logs for %s; skipping daily precompute.", day_str)
+            return
+        result = await self.feedback_service_factory().generate_daily_feedback(logs)
+        await self._store("daily", day_str, result)
+
+    async def generate_weekly(self, end: datetime.date):
+        start_str, end_str = self.weekly_range(end)
+        logs = await self.notion_service.fetch_logs_for_date_range(start_str, end_str)
+        if not logs:
+            logger.info("No logs for the week ending %s; skipping weekly precompute.", end_str)
+            return
+        result = await self.feedback_service_factory().generate_weekly_feedback(logs)
+        await self._store("weekly", end_str, result)
+
+    async def _store(self, kind: str, period: str, result: dict):
+        result = {**result, "precomputed": True, "generated_at": datetime.datetime.now().isoformat()}
+        await self.store.put(kind, period, result)
+        logger.info("Precomputed %s feedback for %s.", kind, period)
+
+    async def run_due(self, day: datetime.date):
+        try:
+            await self.generate_daily(day)
+            if day.weekday() == self.weekly_weekday:
+                await self.generate_weekly(day)
+        except Exception as e:
+            logger.error("Error precomputing feedback for %s: %s", day, e)
+
+    def _next_run(self, now: datetime.datetime) -> datetime.datetime:
+        run_at = datetime.datetime.combine(now.date(), self.daily_cutoff)
+        return run_at if run_at > now else run_at + datetime.timedelta(days=1)
+
+    async def run(self):
+        now = datetime.datetime.now()
+        # Catch up if the server starts after today's cutoff with nothing stored yet.
+        if now.time() >= self.daily_cutoff and await self.store.get("daily", now.date().isoformat()) is None:
+            await self.run_due(now.date())
+        while True:
+            now = datetime.datetime.now()
+            run_at = self._next_run(now)
+            await asyncio.sleep((run_at - now).total_seconds())
+            await self.run_due(run_at.date())
+
+    async def on_logs_written(self, rows: List[dict]):
+        """NotionService listener: regenerate any precomputed result covering these logs."""
+        for row in rows:
+            day = row['date'][:10]
+            if await self.store.get("daily", day) is not None:
+                self._schedule_regeneration("daily", day)
+            try:
+                date = datetime.date.fromisoformat(day)
+            except ValueError:
+                continue
+            for offset in range(7):
+                end = (date + datetime.timedelta(days=offset)).isoformat()
+                if await self.store.get("weekly", end) is not None:
+                    self._schedule_regeneration("weekly", end)
+
+    def _schedule_regeneration(self, kind: str, period: str):
+        # Debounced: a burst of writes to the same range regenerates it once.
+        pending = self._pending.get((kind, period))
+        if pending is not None and not pending.done():
+            pending.cancel()
+        self._pending[(kind, period)] = asyncio.create_task(self._regenerate(kind, period))
+
+    async def _regenerate(self, kind: str, period: str):
+        await asyncio.sleep(self.debounce_seconds)
+        try:
+            date = datetime.date.fromisoformat(period)
+            if kind == "daily":
+                await self.generate_daily(date)
+            else:
+                await self.generate_weekly(date)
+        except Exception as e:
+            logger.error("Error regenerating %s feedback for %s: %s", kind, period, e)
+        finally:
+            if self._pending.get((kind, period)) is asyncio.current_task():
+                del self._pending[(kind, period)]
+
+    def start(self, schedule: bool = True):
+        """
+        Starts regenerating results when logs are written; with schedule, also
+        runs the daily cutoff loop (only one worker process should).
+        """
+        self.notion_service.add_listener(self.on_logs_written)
+        if schedule:
+            self.schedule()
+
+    def schedule(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        tasks = [task for task in [self._task, *self._pending.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
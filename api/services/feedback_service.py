@@ -1,103 +1,481 @@
 # api/services/feedback_service.py
 
+import asyncio
+import contextlib
+import contextvars
 import os
-from typing import List
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 
-from api.models.log_models import FeedbackRequest
+from api import config
+from api.models.log_models import FeedbackRequest, LogRecord
+from api.services.feedback_cache import FeedbackCache
+from api.services.shared_cache import SharedCache
 from api.utils.helpers import logger
+from api.utils.metrics import (
+    LLM_CALL_SECONDS,
+    LLM_FIRST_TOKEN_SECONDS,
+    LLM_HEDGES,
+    LLM_TOKENS,
+    add_to_trace,
+    timed
+)
+from api.utils.prompt_packer import PackedPrompt, PromptPacker, estimate_tokens
+from api.utils.rate_limit import TokenBucket
+from api.utils.singleflight import SingleFlight
 
-from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from langchain_core.output_parsers import StrOutputParser
+FEEDBACK_TEMPLATE = (
+    "Here are my thoughts: {thoughts}. My goals: {goals}. My reflections: {reflections}. "
+    "Please provide feedback and suggestions to improve my productivity and help me achieve my goals."
+)
+
+DAILY_FEEDBACK_TEMPLATE = (
+    "Here are my logs for today:\n{logs}\n"
+    "Based on these entries, provide clear, direct steps I should take right now to improve my day and reach my goals. "
+    "Be specific: tell me exactly what actions to take, even if they're small or involve mindset changes. "
+    "Make it clear, like you’re walking me through every step of what a successful day would look like. "
+    "Include motivation that reminds me why these steps will help me achieve my best self."
+)
+
+WEEKLY_FEEDBACK_TEMPLATE = (
+    "Here are my logs for the past week:\n{logs}\n"
+    "Based on these entries, provide a detailed plan for me to follow next week. "
+    "Identify any recurring patterns, highlight what worked well, and point out areas where I struggled. "
+    "Give me a step-by-step roadmap with specific actions to take each day or across the week. "
+    "Make each action concrete, and explain why these steps will maximize my progress. "
+    "Think like a life coach focused on ensuring my success, guiding me toward a powerful, fulfilling week."
+)
+
+# Metric label per prompt template; other services register their own templates here.
+CHAIN_NAMES = {
+    FEEDBACK_TEMPLATE: "feedback",
+    DAILY_FEEDBACK_TEMPLATE: "daily_feedback",
+    WEEKLY_FEEDBACK_TEMPLATE: "weekly_feedback"
+}
+
+def chain_name(template: str) -> str:
+    return CHAIN_NAMES.get(template, "other")
+
+FAST_TIER = "fast"
+LARGE_TIER = "large"
+
+class DeadlineExceeded(Exception):
+    pass
+
+# Token budget that model calls made from the current task wait on, if any.
+_token_budget: contextvars.ContextVar[Optional[TokenBucket]] = contextvars.ContextVar("token_budget", default=None)
+
+def set_token_budget(budget: Optional[TokenBucket]):
+    """
+    Meters every model call made from the current task, and from tasks it
+    starts, against budget: each call first takes its estimated tokens.
+    """
+    _token_budget.set(budget)
+
+async def _read_to_first_token(stream) -> list:
+    """Reads chunks until one carries content; the stream can be resumed afterwards."""
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        if chunk.content:
+            break
+    return chunks
+
+def load_llm_stack():
+    """
+    Imports LangChain and the OpenAI SDK, which take seconds and tens of
+    megabytes, so nothing pays for them until feedback is first needed.
+    Later calls are dictionary lookups.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+    return ChatPromptTemplate, ChatOpenAI
+
+def load_feedback_stack():
+    """Everything feedback needs loaded: the LLM stack and the tokenizer."""
+    load_llm_stack()
+    # Reads the tokenizer tables the prompt packer counts with.
+    estimate_tokens("")
+
+async def preload_llm_stack():
+    """Loads the LLM stack in a worker thread so the event loop keeps serving."""
+    started = time.perf_counter()
+    await asyncio.to_thread(load_feedback_stack)
+    logger.info("LLM stack loaded in %.2fs.", time.perf_counter() - started)
 
 class FeedbackService:
-    def __init__(self):
+    def __init__(self, cache: Optional[FeedbackCache] = None, shared_cache: Optional[SharedCache] = None):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if not self.openai_api_key:
             logger.error("OPENAI_API_KEY is not set in environment variables.")
             raise ValueError("OPENAI_API_KEY is not configured.")
-        
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0, openai_api_key=self.openai_api_key)
-        logger.info("FeedbackService initialized with GPT-4 model.")
-    
-    async def generate_feedback(self, request: FeedbackRequest) -> dict:
+
+        self.tiers = {FAST_TIER: config.FEEDBACK_FAST_MODEL, LARGE_TIER: config.FEEDBACK_MODEL}
+        self.chain_tiers = config.FEEDBACK_CHAIN_TIERS
+        self.temperature = config.FEEDBACK_TEMPERATURE
+        self.first_token_budget = config.FEEDBACK_FIRST_TOKEN_BUDGET_SECONDS
+        self.hedge_mode = config.FEEDBACK_HEDGE_MODE
+        self.prompt_template, ChatOpenAI = load_llm_stack()
+        self.llms = {
+            model: ChatOpenAI(
+                model=model,
+                temperature=self.temperature,
+                openai_api_key=self.openai_api_key,
+                openai_api_base=config.OPENAI_BASE_URL,
+                # Every call streams so the first token can be timed; the final chunk carries usage.
+                stream_usage=True
+            )
+            for model in set(self.tiers.values())
+        }
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.packer = PromptPacker(config.PROMPT_TOKEN_BUDGET)
+        self.singleflight = SingleFlight("feedback")
+        logger.info("FeedbackService initialized with models %s.", self.tiers)
+
+    def models_for(self, template: str) -> Tuple[str, Optional[str]]:
+        """The chain's model and the faster model it may hedge to, if different."""
+        primary = self.tiers[self.chain_tiers.get(chain_name(template), LARGE_TIER)]
+        fast = self.tiers[FAST_TIER]
+        return primary, (fast if fast != primary else None)
+
+    async def run_chain(self, template: str, inputs: dict, deadline: Optional[float] = None) -> dict:
+        """
+        Runs a prompt through the chain's model, answering from the feedback cache
+        when the same model, temperature, template and inputs have been seen
+        before. With a deadline (seconds), DeadlineExceeded is raised if the
+        answer is not complete in time.
+        """
+        primary, _ = self.models_for(template)
+        key = FeedbackCache.make_key(primary, self.temperature, template, inputs)
+        started = time.perf_counter()
+        # Identical concurrent requests share a single cache lookup and model call.
+        # The deadline is part of the flight key: it shapes the call (hedging,
+        # giving up), so a caller must never inherit another caller's deadline.
+        call = self.singleflight.do(
+            (key, deadline),
+            lambda: self._run_chain_once(key, primary, template, inputs, deadline)
+        )
+        try:
+            result = await asyncio.wait_for(call, deadline)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"No complete answer within the {deadline:g}s deadline.")
+        return {**result, "latency_ms": round((time.perf_counter() - started) * 1000)}
+
+    async def _run_chain_once(
+        self,
+        key: str,
+        primary: str,
+        template: str,
+        inputs: dict,
+        deadline: Optional[float]
+    ) -> dict:
+        feedback = await self._cached(key)
+        if feedback is None:
+            async with self._generation_lease(key) as leased:
+                # Another worker may have generated it while this one waited.
+                feedback = await self._cached(key) if leased else None
+                if feedback is None:
+                    answer = await self._invoke(template, inputs, deadline)
+                    # Answers from the fallback model are not cached as the primary's.
+                    if self.cache is not None and answer["model"] == primary:
+                        await self.cache.set(key, answer["feedback"])
+                    return {**answer, "cached": False}
+        logger.info("Feedback served from cache.")
+        return {"feedback": feedback, "cached": True, "model": primary}
+
+    async def _cached(self, key: str) -> Optional[str]:
+        return await self.cache.get(key) if self.cache is not None else None
+
+    def _generation_lease(self, key: str):
+        """
+        Across worker processes, only the holder of a key's lease calls the
+        model; the others wait and then find its answer in the feedback cache.
+        Yields whether a lease was taken.
+        """
+        if self.cache is None or self.shared_cache is None:
+            return contextlib.nullcontext(False)
+        return self._lease(key)
+
+    @contextlib.asynccontextmanager
+    async def _lease(self, key: str):
+        async with self.shared_cache.lease("feedback:" + key, config.SHARED_CACHE_LEASE_SECONDS):
+            yield True
+
+    async def _stream_chain(
+        self,
+        template: str,
+        inputs: dict,
+        usage: Optional[dict] = None,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Streaming counterpart of run_chain. Yields {"token": ...} events as the
+        model produces them, then a final {"done": True, "cached": ...} event
+        naming the model that answered. Here the deadline bounds the wait for
+        the first token.
+        """
+        primary, _ = self.models_for(template)
+        key = FeedbackCache.make_key(primary, self.temperature, template, inputs)
+        started = time.perf_counter()
+        feedback = await self._cached(key)
+        if feedback is None:
+            async with self._generation_lease(key) as leased:
+                feedback = await self._cached(key) if leased else None
+                if feedback is None:
+                    answer = {}
+                    tokens = []
+                    async for token in self._stream_tokens(template, inputs, "stream", deadline, answer):
+                        tokens.append(token)
+                        yield {"token": token}
+                    if self.cache is not None and answer["model"] == primary:
+                        await self.cache.set(key, "".join(tokens))
+                    yield {
+                        "done": True,
+                        "cached": False,
+                        **answer,
+                        "latency_ms": round((time.perf_counter() - started) * 1000),
+                        **(usage or {})
+                    }
+                    return
+
+        logger.info("Feedback served from cache.")
+        yield {"token": feedback}
+        yield {
+            "done": True,
+            "cached": True,
+            "model": primary,
+            "latency_ms": round((time.perf_counter() - started) * 1000),
+            **(usage or {})
+        }
+
+    async def complete(self, template: str, inputs: dict) -> str:
+        """Runs a prompt through the model without consulting the feedback cache."""
+        return (await self._invoke(template, inputs))["feedback"]
+
+    async def _invoke(self, template: str, inputs: dict, deadline: Optional[float] = None) -> dict:
+        answer = {}
+        tokens = [token async for token in self._stream_tokens(template, inputs, "invoke", deadline, answer)]
+        return {"feedback": "".join(tokens), **answer}
+
+    async def _stream_tokens(
+        self,
+        template: str,
+        inputs: dict,
+        mode: str,
+        deadline: Optional[float],
+        answer: Dict
+    ) -> AsyncIterator[str]:
+        """
+        Yields content tokens from the chain's model, racing it against the fast
+        tier when it is slow to start (see _first_token). Fills answer with the
+        model that answered, whether a hedge fired and the time to first token.
+        """
+        chain = chain_name(template)
+        primary, fast = self.models_for(template)
+        budget = _token_budget.get()
+        if budget is not None:
+            await budget.acquire(self.estimate_call_tokens(template, inputs))
+        started = time.perf_counter()
+        model, outcome, stream, usage_metadata = primary, "error", None, None
+        try:
+            model, stream, head, hedged = await self._first_token(template, inputs, primary, fast, deadline)
+            first_token = time.perf_counter() - started
+            answer.update(model=model, hedged=hedged, first_token_ms=round(first_token * 1000))
+            LLM_FIRST_TOKEN_SECONDS.observe(first_token, chain, model)
+            if hedged:
+                LLM_HEDGES.inc(chain, "primary" if model == primary else "fallback")
+            for chunk in head:
+                usage_metadata = chunk.usage_metadata or usage_metadata
+                if chunk.content:
+                    yield chunk.content
+            async for chunk in stream:
+                usage_metadata = chunk.usage_metadata or usage_metadata
+                if chunk.content:
+                    yield chunk.content
+            outcome = "ok"
+        finally:
+            if stream is not None:
+                await stream.aclose()
+            elapsed = time.perf_counter() - started
+            LLM_CALL_SECONDS.observe(elapsed, chain, model, mode, outcome)
+            add_to_trace("llm", elapsed)
+            self._count_tokens(chain, model, usage_metadata)
+
+    async def _first_token(
+        self,
+        template: str,
+        inputs: dict,
+        primary: str,
+        fast: Optional[str],
+        deadline: Optional[float]
+    ) -> Tuple[str, object, list, bool]:
+        """
+        Starts the primary model and waits for its first token. If none arrives
+        within the first-token budget (at most half the deadline), the fast
+        model is started too: in "hedge" mode whichever produces a token first
+        wins, in "fallback" mode the primary is abandoned. A primary that fails
+        before its first token falls back at once. Losing streams are closed.
+        Returns (model, stream, chunks read so far, hedged).
+        """
+        loop = asyncio.get_running_loop()
+        budget = self.first_token_budget or None
+        if deadline is not None:
+            budget = min(budget or deadline, deadline / 2)
+        hedge_at = loop.time() + budget if fast is not None and budget else None
+        give_up_at = loop.time() + deadline if deadline is not None else None
+        streams: Dict[str, object] = {}
+        tasks: Dict[asyncio.Future, str] = {}
+        hedged = False
+        error = None
+
+        def start(model: str):
+            streams[model] = self._build_chain(template, model).astream(inputs)
+            tasks[asyncio.ensure_future(_read_to_first_token(streams[model]))] = model
+
+        async def abandon(task: asyncio.Future):
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await streams.pop(tasks.pop(task)).aclose()
+
+        start(primary)
+        try:
+            while tasks:
+                wake_at = min((t for t in (None if hedged else hedge_at, give_up_at) if t is not None), default=None)
+                timeout = max(wake_at - loop.time(), 0) if wake_at is not None else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if give_up_at is not None and loop.time() >= give_up_at:
+                        raise DeadlineExceeded(f"No answer started within the {deadline:g}s deadline.")
+                    logger.info("%s missed the %.1fs first-token budget; starting %s.", primary, budget, fast)
+                    hedged = True
+                    if self.hedge_mode == "fallback":
+                        for task in list(tasks):
+                            await abandon(task)
+                    start(fast)
+                    continue
+                for task in done:
+                    model = tasks.pop(task)
+                    if task.exception() is None:
+                        return model, streams.pop(model), task.result(), hedged
+                    error = task.exception()
+                    logger.warning("Model %s failed before its first token: %s", model, error)
+                    await streams.pop(model).aclose()
+                if not tasks and fast is not None and not hedged:
+                    hedged = True
+                    start(fast)
+            raise error
+        finally:
+            for task in list(tasks):
+                await abandon(task)
+
+    @staticmethod
+    def estimate_call_tokens(template: str, inputs: dict) -> int:
+        """Prompt tokens plus the completion allowance a batch budget charges per call."""
+        return estimate_tokens(template.format(**inputs)) + config.FEEDBACK_BATCH_COMPLETION_TOKENS
+
+    def _build_chain(self, template: str, model: str):
+        prompt = self.prompt_template.from_template(template)
+        return prompt | self.llms[model]
+
+    @staticmethod
+    def _count_tokens(chain: str, model: str, usage_metadata: Optional[dict]):
+        if usage_metadata:
+            LLM_TOKENS.inc(chain, model, "prompt", amount=usage_metadata["input_tokens"])
+            LLM_TOKENS.inc(chain, model, "completion", amount=usage_metadata["output_tokens"])
+
+    async def _stream_message(self, message: str) -> AsyncIterator[dict]:
+        yield {"token": message}
+        yield {"done": True, "cached": False}
+
+    async def generate_feedback(self, request: FeedbackRequest, deadline: Optional[float] = None) -> dict:
         try:
             logger.info("Generating feedback based on user request.")
-            prompt = ChatPromptTemplate.from_template(
-                "Here are my thoughts: {thoughts}. My goals: {goals}. My reflections: {reflections}. "
-                "Please provide feedback and suggestions to improve my productivity and help me achieve my goals."
-            )
-            chain = prompt | self.llm | StrOutputParser()
-            feedback = chain.invoke({
+            result = await self.run_chain(FEEDBACK_TEMPLATE, {
                 "thoughts": request.thoughts,
                 "goals": request.goals,
                 "reflections": request.reflections
-            })
-            logger.debug(f"Generated feedback: {feedback}")
-            return {"feedback": feedback}
+            }, deadline)
+            logger.debug("Generated feedback: %s", result['feedback'])
+            return result
+        except DeadlineExceeded as e:
+            logger.warning("Feedback missed its deadline: %s", e)
+            raise HTTPException(status_code=504, detail=str(e))
         except Exception as e:
-            logger.error(f"Error generating feedback: {e}")
+            logger.error("Error generating feedback: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
-    
-    def format_logs_for_prompt(self, logs: List[dict]) -> str:
-        formatted_logs = ""
-        for log in logs:
-            formatted_logs += (
-                f"Date: {log['date']}, "
-                f"Thoughts: {log['thoughts']}, "
-                f"Goals: {log['goals']} (Status: {log['goal_status']}), "
-                f"Reflections: {log['reflections']}\n"
-            )
-        logger.debug("Formatted logs for prompt.")
-        return formatted_logs
-    
-    async def generate_daily_feedback(self, logs: List[dict]) -> dict:
+
+    def stream_feedback(self, request: FeedbackRequest, deadline: Optional[float] = None) -> AsyncIterator[dict]:
+        logger.info("Streaming feedback based on user request.")
+        return self._stream_chain(FEEDBACK_TEMPLATE, {
+            "thoughts": request.thoughts,
+            "goals": request.goals,
+            "reflections": request.reflections
+        }, deadline=deadline)
+
+    def pack_logs(self, logs: List[LogRecord]) -> PackedPrompt:
+        with timed(None, phase="format"):
+            packed = self.packer.pack(logs)
+        logger.debug("Packed %s logs into %s tokens (%s dropped).", packed.entries, packed.tokens, packed.dropped)
+        return packed
+
+    def format_logs_for_prompt(self, logs: List[LogRecord]) -> str:
+        return self.pack_logs(logs).text
+
+    @staticmethod
+    def _prompt_usage(packed: PackedPrompt) -> dict:
+        return {
+            "prompt_tokens": packed.tokens,
+            "entries_included": packed.entries,
+            "entries_dropped": packed.dropped
+        }
+
+    async def generate_daily_feedback(self, logs: List[LogRecord], deadline: Optional[float] = None) -> dict:
         try:
             logger.info("Generating daily feedback.")
             if not logs:
-                return {"feedback": "No logs found for today."}
-    
-            formatted_logs = self.format_logs_for_prompt(logs)
-    
-            prompt = ChatPromptTemplate.from_template(
-                "Here are my logs for today:\n{logs}\n"
-                "Based on these entries, provide clear, direct steps I should take right now to improve my day and reach my goals. "
-                "Be specific: tell me exactly what actions to take, even if they're small or involve mindset changes. "
-                "Make it clear, like you’re walking me through every step of what a successful day would look like. "
-                "Include motivation that reminds me why these steps will help me achieve my best self."
-            )
-    
-            chain = prompt | self.llm | StrOutputParser()
-            feedback = chain.invoke({"logs": formatted_logs})
-            logger.debug(f"Generated daily feedback: {feedback}")
-            return {"feedback": feedback}
+                return {"feedback": "No logs found for today.", "cached": False}
+
+            packed = self.pack_logs(logs)
+            result = await self.run_chain(DAILY_FEEDBACK_TEMPLATE, {"logs": packed.text}, deadline)
+            logger.debug("Generated daily feedback: %s", result['feedback'])
+            return {**result, **self._prompt_usage(packed)}
+        except DeadlineExceeded as e:
+            logger.warning("Daily feedback missed its deadline: %s", e)
+            raise HTTPException(status_code=504, detail=str(e))
         except Exception as e:
-            logger.error(f"Error generating daily feedback: {e}")
+            logger.error("Error generating daily feedback: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
-    
-    async def generate_weekly_feedback(self, logs: List[dict]) -> dict:
+
+    def stream_daily_feedback(self, logs: List[LogRecord], deadline: Optional[float] = None) -> AsyncIterator[dict]:
+        logger.info("Streaming daily feedback.")
+        if not logs:
+            return self._stream_message("No logs found for today.")
+        packed = self.pack_logs(logs)
+        return self._stream_chain(DAILY_FEEDBACK_TEMPLATE, {"logs": packed.text}, self._prompt_usage(packed), deadline)
+
+    async def generate_weekly_feedback(self, logs: List[LogRecord], deadline: Optional[float] = None) -> dict:
         try:
             logger.info("Generating weekly feedback.")
             if not logs:
-                return {"feedback": "No logs found for the past week."}
-    
-            formatted_logs = self.format_logs_for_prompt(logs)
-    
-            prompt = ChatPromptTemplate.from_template(
-                "Here are my logs for the past week:\n{logs}\n"
-                "Based on these entries, provide a detailed plan for me to follow next week. "
-                "Identify any recurring patterns, highlight what worked well, and point out areas where I struggled. "
-                "Give me a step-by-step roadmap with specific actions to take each day or across the week. "
-                "Make each action concrete, and explain why these steps will maximize my progress. "
-                "Think like a life coach focused on ensuring my success, guiding me toward a powerful, fulfilling week."
-            )
-    
-            chain = prompt | self.llm | StrOutputParser()
-            feedback = chain.invoke({"logs": formatted_logs})
-            logger.debug(f"Generated weekly feedback: {feedback}")
-            return {"feedback": feedback}
+                return {"feedback": "No logs found for the past week.", "cached": False}
+
+            packed = self.pack_logs(logs)
+            result = await self.run_chain(WEEKLY_FEEDBACK_TEMPLATE, {"logs": packed.text}, deadline)
+            logger.debug("Generated weekly feedback: %s", result['feedback'])
+            return {**result, **self._prompt_usage(packed)}
+        except DeadlineExceeded as e:
+            logger.warning("Weekly feedback missed its deadline: %s", e)
+            raise HTTPException(status_code=504, detail=str(e))
         except Exception as e:
-            logger.error(f"Error generating weekly feedback: {e}")
+            logger.error("Error generating weekly feedback: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
+
+    def stream_weekly_feedback(self, logs: List[LogRecord], deadline: Optional[float] = None) -> AsyncIterator[dict]:
+        logger.info("Streaming weekly feedback.")
+        if not logs:
+            return self._stream_message("No logs found for the past week.")
+        packed = self.pack_logs(logs)
+        return self._stream_chain(WEEKLY_FEEDBACK_TEMPLATE, {"logs": packed.text}, self._prompt_usage(packed), deadline)
@@ -0,0 +1,69 @@
+# api/services/idempotency_store.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    page_id TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys (created_at);
+"""
+
+# Expired keys are swept at most this often, on the write path.
+PRUNE_INTERVAL_SECONDS = 3600
+
+class IdempotencyStore:
+    """
+    Maps client-supplied idempotency keys to the Notion page each one created,
+    so a retried write returns the earlier page instead of creating another.
+    Keys are kept for ttl_seconds, which bounds how late a retry may arrive.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_id FROM idempotency_keys WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, page_id: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO idempotency_keys (key, page_id, created_at) VALUES (?, ?, ?)",
+                (key, page_id, now)
+            )
+            if now - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                self._conn.execute("DELETE FROM idempotency_keys WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._last_prune = now
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, page_id: str):
+        await asyncio.to_thread(self._put, key, page_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
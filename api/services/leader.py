@@ -0,0 +1,54 @@
+# api/services/leader.py
+
+import asyncio
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, and api.serve runs a single process there.
+    fcntl = None
+
+class LeaderLock:
+    """
+    Picks one worker process among those sharing DATA_DIR to run background
+    jobs, by holding an exclusive flock on a lock file. The OS releases the
+    lock when its holder exits, so a waiting worker takes over after a crash.
+    """
+
+    def __init__(self, path: str, retry_seconds: float):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self.held = False
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if self.held:
+            return True
+        if fcntl is None:
+            self.held = True
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        self.held = True
+        return True
+
+    async def wait(self):
+        """Returns once this process holds the lock."""
+        while not self.try_acquire():
+            await asyncio.sleep(self.retry_seconds)
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self.held = False
@@ -0,0 +1,289 @@
+# api/services/log_mirror.py
+
+import asyncio
+import datetime
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Set
+
+from api.models.log_models import LogRecord
+from api.utils.helpers import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    thoughts TEXT NOT NULL,
+    goals TEXT NOT NULL,
+    reflections TEXT NOT NULL,
+    goal_status TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    created_seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_logs_date ON logs (date);
+CREATE INDEX IF NOT EXISTS idx_logs_goal_status ON logs (goal_status, date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+class LogMirror:
+    """
+    Local SQLite read replica of the Notion logs database.
+    Rows are the processed logs plus the page id and its last_edited_time.
+    Every insert or edit stamps the row with the next change sequence number
+    (seq); created_seq keeps the number it was first inserted with. The last
+    number handed out is kept in meta, so deleting rows never lowers it.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(logs)")}
+            # Mirrors created before the change feed existed.
+            for column in ("seq", "created_seq"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE logs ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_seq ON logs (seq)")
+            self._conn.commit()
+
+    def _execute(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _upsert(self, rows: List[dict]) -> List[dict]:
+        with self._lock:
+            # Write-locks the file before diffing, since every worker process shares it.
+            self._conn.execute("BEGIN IMMEDIATE")
+            with self._conn:
+                placeholders = ",".join("?" * len(rows))
+                known = dict(self._conn.execute(
+                    f"SELECT id, last_edited_time FROM logs WHERE id IN ({placeholders})",
+                    [row["id"] for row in rows]
+                ).fetchall())
+                changed = [row for row in rows if known.get(row["id"]) != row["last_edited_time"]]
+                head = self._head()
+                self._conn.executemany(
+                    """
+                    INSERT INTO logs (id, date, thoughts, goals, reflections, goal_status, last_edited_time, seq, created_seq)
+                    VALUES (:id, :date, :thoughts, :goals, :reflections, :goal_status, :last_edited_time, :seq, :seq)
+                    ON CONFLICT (id) DO UPDATE SET
+                        date = excluded.date,
+                        thoughts = excluded.thoughts,
+                        goals = excluded.goals,
+                        reflections = excluded.reflections,
+                        goal_status = excluded.goal_status,
+                        last_edited_time = excluded.last_edited_time,
+                        seq = excluded.seq
+                    """,
+                    [{**row, "seq": head + i} for i, row in enumerate(changed, start=1)]
+                )
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('change_seq', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    (str(head + len(changed)),)
+                )
+        return changed
+
+    def _head(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'change_seq'").fetchone()
+        if row is not None:
+            return int(row[0])
+        # Mirrors written before the counter existed.
+        return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM logs").fetchone()[0]
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+            self._conn.commit()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        rows = self._execute("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    @staticmethod
+    def _to_log(row: sqlite3.Row) -> LogRecord:
+        return LogRecord(row["date"], row["thoughts"], row["goals"], row["reflections"], row["goal_status"])
+
+    async def upsert(self, rows: List[dict]) -> List[dict]:
+        """Stores rows and returns the ones that were new or edited since last seen."""
+        if not rows:
+            return []
+        return await asyncio.to_thread(self._upsert, rows)
+
+    async def get_checkpoint(self) -> Optional[str]:
+        return await asyncio.to_thread(self._get_meta, "checkpoint")
+
+    async def set_checkpoint(self, last_edited_time: str):
+        await asyncio.to_thread(self._set_meta, "checkpoint", last_edited_time)
+
+    async def is_ready(self) -> bool:
+        """True once a full initial sync has completed."""
+        return await asyncio.to_thread(self._get_meta, "initial_sync_complete") == "1"
+
+    async def mark_ready(self):
+        await asyncio.to_thread(self._set_meta, "initial_sync_complete", "1")
+
+    async def fetch_range(self, start_date: str, end_date: str) -> List[LogRecord]:
+        """Logs dated start_date through end_date (ISO dates), both inclusive."""
+        # Dates with a time ("2024-05-03T21:00:00.000+02:00") sort after the
+        # bare end date, so the bound is the start of the following day.
+        day_after = datetime.date.fromisoformat(end_date[:10]) + datetime.timedelta(days=1)
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT * FROM logs WHERE date >= ? AND date < ? ORDER BY date, id",
+            (start_date, day_after.isoformat())
+        )
+        return [self._to_log(row) for row in rows]
+
+    async def query(
+        self,
+        goal_status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[LogRecord]:
+        sql = "SELECT * FROM logs"
+        params = []
+        if goal_status:
+            sql += " WHERE goal_status = ?"
+            params.append(goal_status)
+        sql += " ORDER BY date, id LIMIT ? OFFSET ?"
+        params += [limit if limit is not None else -1, offset]
+        rows = await asyncio.to_thread(self._execute, sql, params)
+        return [self._to_log(row) for row in rows]
+
+    async def all_rows(self) -> List[dict]:
+        rows = await asyncio.to_thread(self._execute, "SELECT * FROM logs")
+        return [dict(row) for row in rows]
+
+    def _locked_head(self) -> int:
+        with self._lock:
+            return self._head()
+
+    async def head(self) -> int:
+        """The latest change sequence number, 0 for an empty mirror."""
+        return await asyncio.to_thread(self._locked_head)
+
+    async def changes_since(self, seq: int, limit: int) -> List[dict]:
+        """
+        Rows inserted or edited after seq, oldest change first. A page edited
+        several times appears once, in its latest state.
+        """
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT * FROM logs WHERE seq > ? ORDER BY seq LIMIT ?",
+            (seq, limit)
+        )
+        return [dict(row) for row in rows]
+
+    def _delete(self, page_ids: List[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM logs WHERE id = ?", [(page_id,) for page_id in page_ids])
+            self._conn.commit()
+
+    async def delete(self, page_ids: List[str]):
+        if page_ids:
+            await asyncio.to_thread(self._delete, page_ids)
+
+    async def ids(self) -> Set[str]:
+        rows = await asyncio.to_thread(self._execute, "SELECT id FROM logs")
+        return {row["id"] for row in rows}
+
+    async def count(self) -> int:
+        rows = await asyncio.to_thread(self._execute, "SELECT COUNT(*) AS n FROM logs")
+        return rows[0]["n"]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class MirrorSync:
+    """
+    Background task that keeps a LogMirror up to date by pulling only the pages
+    whose last_edited_time is at or after the stored checkpoint. Every
+    reconcile_seconds it also lists every page to find the deleted ones.
+    """
+
+    def __init__(self, service, mirror: LogMirror, interval_seconds: float, reconcile_seconds: float = 0):
+        self.service = service
+        self.mirror = mirror
+        self.interval_seconds = interval_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def sync_once(self) -> int:
+        checkpoint = await self.mirror.get_checkpoint()
+        synced = 0
+        # Notion truncates last_edited_time to the minute, so the boundary is
+        # inclusive and re-reads a few pages; upserts make that harmless.
+        async for pages in self.service.iter_pages_edited_since(checkpoint):
+            rows = [self.service.to_row(page) for page in pages]
+            changed = await self.mirror.upsert(rows)
+            if changed:
+                await self.service.notify_listeners(changed)
+            if rows:
+                await self.mirror.set_checkpoint(rows[-1]["last_edited_time"])
+            synced += len(rows)
+        if not await self.mirror.is_ready():
+            await self.mirror.mark_ready()
+        logger.info("Mirror sync pulled %s pages since %s", synced, checkpoint)
+        return synced
+
+    async def reconcile_once(self) -> int:
+        """
+        Removes mirrored pages that Notion no longer returns (deleted, archived
+        or trashed) and tells the removal listeners. Returns how many went.
+        """
+        # Snapshot before listing, so a page created during the walk is not
+        # mistaken for a deleted one.
+        known = await self.mirror.ids()
+        live = set()
+        async for pages in self.service.iter_pages():
+            live.update(page["id"] for page in pages if not page.get("archived") and not page.get("in_trash"))
+        removed = sorted(known - live)
+        if removed:
+            await self.mirror.delete(removed)
+            await self.service.notify_removed(removed)
+        logger.info("Mirror reconcile found %s live pages, removed %s", len(live), len(removed))
+        return len(removed)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        # The first sync is a full pull, so the first reconcile can wait a full interval.
+        reconcile_at = loop.time() + self.reconcile_seconds
+        while True:
+            try:
+                await self.sync_once()
+                if self.reconcile_seconds and loop.time() >= reconcile_at:
+                    reconcile_at = loop.time() + self.reconcile_seconds
+                    await self.reconcile_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error syncing Notion mirror: %s", e)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -1,117 +1,526 @@
 # api/services/notion_service.py
 
-import os
-import datetime
-from typing import List, Optional
+import asyncio
+import functools
+import json
+import ssl
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
 
+import httpx
 from fastapi import HTTPException
-from notion_client import Client
+from notion_client import AsyncClient
 
-from api.models.log_models import LogEntry
+from api import config
+from api.models.log_models import Consistency, LogEntry, LogRecord
+from api.services.idempotency_store import IdempotencyStore
+from api.services.log_mirror import LogMirror
+from api.services.shared_cache import SharedCache
 from api.utils.helpers import logger
+from api.utils.metrics import NOTION_CALL_SECONDS, timed
+from api.utils.rate_limit import SharedTokenBucket, TokenBucket
+from api.utils.retry import is_retryable, is_retryable_create, retry_with_backoff
+from api.utils.singleflight import SingleFlight
+
+# Notion caps a single databases.query page at 100 results.
+PAGE_SIZE = 100
+# Marks cursors that are row offsets into the mirror; any other cursor is Notion's own.
+MIRROR_CURSOR_PREFIX = "m:"
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context() -> ssl.SSLContext:
+    # Loading the CA bundle takes ~100ms of blocking work, which adds up when a
+    # client is built per tenant on the request path.
+    return httpx.create_ssl_context()
+
+def create_notion_client(
+    token: Optional[str] = None,
+    pool_size: int = config.NOTION_POOL_SIZE,
+) -> AsyncClient:
+    """
+    Builds an async Notion client on top of a pooled keep-alive HTTP transport.
+    The returned client is meant to be shared for the lifetime of the app.
+    """
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+        ),
+        timeout=config.NOTION_TIMEOUT_SECONDS,
+        verify=_ssl_context(),
+    )
+    return AsyncClient(
+        auth=token or config.NOTION_TOKEN,
+        client=http_client,
+        timeout_ms=int(config.NOTION_TIMEOUT_SECONDS * 1000),
+        base_url=config.NOTION_BASE_URL,
+    )
+
+def create_rate_limiter(
+    rate: float,
+    shared_cache: Optional[SharedCache] = None,
+    name: str = "notion"
+) -> Union[TokenBucket, SharedTokenBucket]:
+    """
+    Builds the Notion rate limiter for one integration. With the shared cache
+    the budget is shared by every worker process, so API_WORKERS does not
+    multiply the request rate Notion sees; without it each process has its own.
+    """
+    if shared_cache is not None:
+        return SharedTokenBucket(shared_cache, name, rate, config.NOTION_RATE_LIMIT_BURST)
+    return TokenBucket(rate, config.NOTION_RATE_LIMIT_BURST)
+
+NO_DATE = 'No Date'
+NO_THOUGHTS = 'No Thoughts'
+NO_GOALS = 'No Goals'
+NO_REFLECTIONS = 'No Reflections'
+NOT_SPECIFIED = 'Not Specified'
+
+def _plain_text(prop: Optional[dict], placeholder: str) -> str:
+    rich_text = prop.get('rich_text') if prop else None
+    if rich_text:
+        return rich_text[0].get('plain_text', placeholder)
+    return placeholder
+
+def decode_page(page: dict) -> LogRecord:
+    """
+    Single-pass decoder from a Notion page to a LogRecord: the properties dict
+    is looked up once and each property is read once. Empty values decode to
+    shared placeholder strings rather than freshly formatted ones.
+    """
+    properties = page['properties']
+    get = properties.get
+    date = get('Date')
+    date = date.get('date') if date else None
+    status = get('Goal Status')
+    status = status.get('select') if status else None
+    return LogRecord(
+        date.get('start', NO_DATE) if date else NO_DATE,
+        _plain_text(get('Thoughts'), NO_THOUGHTS),
+        _plain_text(get('Goals'), NO_GOALS),
+        _plain_text(get('Reflections'), NO_REFLECTIONS),
+        status.get('name', NOT_SPECIFIED) if status else NOT_SPECIFIED
+    )
 
 class NotionService:
-    def __init__(self):
-        self.notion = Client(auth=os.getenv("NOTION_TOKEN"))
-        self.database_id = os.getenv("NOTION_DATABASE_ID")
+    def __init__(
+        self,
+        notion: AsyncClient,
+        database_id: Optional[str] = None,
+        mirror: Optional[LogMirror] = None,
+        rate_limiter: Optional[Union[TokenBucket, SharedTokenBucket]] = None,
+        idempotency_store: Optional[IdempotencyStore] = None,
+        shared_cache: Optional[SharedCache] = None,
+        tenant_id: Optional[str] = None
+    ):
+        self.notion = notion
+        # None for the database configured in the environment.
+        self.tenant_id = tenant_id
+        self.mirror = mirror
+        self.idempotency_store = idempotency_store
+        self.shared_cache = shared_cache
+        self.rate_limiter = rate_limiter or create_rate_limiter(config.NOTION_RATE_LIMIT_PER_SECOND, shared_cache)
+        # Separate groups, so coalescing stats for reads are not mixed with writes.
+        self.read_singleflight = SingleFlight("notion_read")
+        self.create_singleflight = SingleFlight("notion_create")
+        self._listeners: List[Callable[[List[dict]], Awaitable[None]]] = []
+        self._removal_listeners: List[Callable[[List[str]], Awaitable[None]]] = []
+        self.database_id = database_id or config.NOTION_DATABASE_ID
         if not self.database_id:
             logger.error("NOTION_DATABASE_ID is not set in environment variables.")
             raise ValueError("NOTION_DATABASE_ID is not configured.")
     
-    async def fetch_logs_for_date_range(self, start_date: str, end_date: str) -> List[dict]:
+    async def fetch_logs_for_date_range(
+        self,
+        start_date: str,
+        end_date: str,
+        consistency: Consistency = "eventual"
+    ) -> List[LogRecord]:
         try:
-            logger.info(f"Fetching logs from {start_date} to {end_date}")
-            response = self.notion.databases.query(
-                database_id=self.database_id,
-                filter={
-                    "and": [
-                        {
-                            "property": "Date",
-                            "date": {
-                                "on_or_after": start_date
-                            }
-                        },
-                        {
-                            "property": "Date",
-                            "date": {
-                                "on_or_before": end_date
-                            }
-                        }
-                    ]
-                }
+            logger.info("Fetching logs from %s to %s (%s)", start_date, end_date, consistency)
+            return await self.read_singleflight.do(
+                ("date_range", start_date, end_date, consistency),
+                lambda: self._fetch_logs_for_date_range(start_date, end_date, consistency)
             )
-            logs = self._process_logs(response['results'])
-            return logs
         except Exception as e:
-            logger.error(f"Error fetching logs: {e}")
+            logger.error("Error fetching logs: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
     
-    async def get_logs(self, goal_status: Optional[str] = None) -> dict:
+    async def _fetch_logs_for_date_range(
+        self,
+        start_date: str,
+        end_date: str,
+        consistency: Consistency
+    ) -> List[LogRecord]:
+        if await self._use_mirror(consistency):
+            return await self.mirror.fetch_range(start_date, end_date)
+        return await self._shared_query(
+            ("date_range", start_date, end_date),
+            consistency,
+            self._date_range_filter(start_date, end_date)
+        )
+    
+    async def get_logs(
+        self,
+        goal_status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        consistency: Consistency = "eventual"
+    ) -> dict:
         try:
-            logger.info(f"Fetching logs with goal_status: {goal_status}")
-            filter_clause = (
-                {
-                    "property": "Goal Status",
-                    "select": {
-                        "equals": goal_status
-                    }
-                } if goal_status else None
-            )
+            logger.info("Fetching logs with goal_status: %s (%s)", goal_status, consistency)
+            if await self._use_mirror(consistency):
+                return await self._get_mirrored_logs(goal_status, limit, cursor)
+            if cursor is not None and cursor.startswith(MIRROR_CURSOR_PREFIX):
+                raise HTTPException(
+                    status_code=400,
+                    detail="This cursor pages through the local mirror; restart paging without it."
+                )
     
-            query_params = {"database_id": self.database_id}
-            if filter_clause:
-                query_params["filter"] = filter_clause
+            filter_clause = self._goal_status_filter(goal_status)
+            if limit is None and cursor is None:
+                return {"logs": await self._shared_query(("logs", goal_status), consistency, filter_clause)}
     
-            response = self.notion.databases.query(**query_params)
-            logs = self._process_logs(response['results'])
-            return {"logs": logs}
+            response = await self._query(filter_clause, start_cursor=cursor, page_size=limit or PAGE_SIZE)
+            return {
+                "logs": self._process_logs(response['results']),
+                "next_cursor": response.get('next_cursor'),
+                "has_more": response.get('has_more', False)
+            }
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error fetching logs: {e}")
+            logger.error("Error fetching logs: %s", e)
             raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
-    def _process_logs(self, pages) -> List[dict]:
-        logs = []
-        for page in pages:
-            log = {
-                "date": self._extract_date(page),
-                "thoughts": self._extract_text(page, 'Thoughts'),
-                "goals": self._extract_text(page, 'Goals'),
-                "reflections": self._extract_text(page, 'Reflections'),
-                "goal_status": self._extract_goal_status(page)
-            }
-            logs.append(log)
-        logger.debug(f"Processed {len(logs)} logs")
-        return logs
+    async def stream_logs(
+        self,
+        goal_status: Optional[str] = None,
+        consistency: Consistency = "eventual"
+    ) -> AsyncIterator[LogRecord]:
+        logger.info("Streaming logs with goal_status: %s (%s)", goal_status, consistency)
+        if await self._use_mirror(consistency):
+            offset = 0
+            while True:
+                logs = await self.mirror.query(goal_status, limit=PAGE_SIZE, offset=offset)
+                for log in logs:
+                    yield log
+                if len(logs) < PAGE_SIZE:
+                    return
+                offset += PAGE_SIZE
+        async for log in self.iter_logs(self._goal_status_filter(goal_status)):
+            yield log
     
-    def _extract_date(self, page) -> str:
-        date_property = page['properties'].get('Date', {}).get('date', {})
-        return date_property.get('start', 'No Date') if date_property else 'No Date'
+    async def iter_logs(self, filter_clause: Optional[dict] = None) -> AsyncIterator[LogRecord]:
+        """
+        Lazily walks every page of a database query, following Notion's
+        has_more/next_cursor, and yields processed logs one page at a time.
+        """
+        async for pages in self.iter_pages(filter_clause):
+            for log in self._process_logs(pages):
+                yield log
     
-    def _extract_text(self, page, property_name: str) -> str:
-        property_value = page['properties'].get(property_name, {}).get('rich_text', [])
-        if property_value and len(property_value) > 0:
-            return property_value[0].get('plain_text', f'No {property_name}')
-        return f'No {property_name}'
+    async def iter_pages(
+        self,
+        filter_clause: Optional[dict] = None,
+        sorts: Optional[List[dict]] = None
+    ) -> AsyncIterator[List[dict]]:
+        cursor = None
+        while True:
+            response = await self._query(filter_clause, start_cursor=cursor, sorts=sorts)
+            yield response['results']
+            cursor = response.get('next_cursor')
+            if not response.get('has_more') or not cursor:
+                break
+    
+    def iter_pages_edited_since(self, checkpoint: Optional[str]) -> AsyncIterator[List[dict]]:
+        filter_clause = (
+            {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {
+                    "on_or_after": checkpoint
+                }
+            } if checkpoint else None
+        )
+        return self.iter_pages(
+            filter_clause,
+            sorts=[{"timestamp": "last_edited_time", "direction": "ascending"}]
+        )
     
-    def _extract_goal_status(self, page) -> str:
-        goal_status_property = page['properties'].get('Goal Status', {}).get('select', {})
-        return goal_status_property.get('name', 'Not Specified') if goal_status_property else 'Not Specified'
+    async def _query(
+        self,
+        filter_clause: Optional[dict] = None,
+        start_cursor: Optional[str] = None,
+        page_size: int = PAGE_SIZE,
+        sorts: Optional[List[dict]] = None
+    ) -> dict:
+        query_params = {"database_id": self.database_id, "page_size": page_size}
+        if filter_clause:
+            query_params["filter"] = filter_clause
+        if start_cursor:
+            query_params["start_cursor"] = start_cursor
+        if sorts:
+            query_params["sorts"] = sorts
+        return await self._call("databases.query", self.notion.databases.query, **query_params)
+    
+    async def _call(self, operation: str, method, retryable: Callable[[Exception], bool] = is_retryable, **kwargs):
+        """
+        Every Notion request goes through here: it waits for a rate-limit token
+        and retries the errors `retryable` accepts (429/5xx by default) with
+        jittered backoff. The whole call, waits included, is timed under the
+        given operation name.
+        """
+        async def attempt():
+            await self.rate_limiter.acquire()
+            return await method(**kwargs)
+        with timed(NOTION_CALL_SECONDS, operation, phase="notion"):
+            return await retry_with_backoff(attempt, retries=config.NOTION_MAX_RETRIES, retryable=retryable)
+    
+    async def _shared_query(
+        self,
+        key: tuple,
+        consistency: Consistency,
+        filter_clause: Optional[dict]
+    ) -> List[LogRecord]:
+        """
+        Reads every log matching filter_clause from Notion. Eventual reads go
+        through the cache shared by all worker processes, so one worker queries
+        Notion and the others reuse its result for NOTION_QUERY_CACHE_TTL_SECONDS.
+        """
+        if consistency == "strong" or self.shared_cache is None:
+            return [log async for log in self.iter_logs(filter_clause)]
+
+        async def fetch() -> List[list]:
+            return [
+                [log.date, log.thoughts, log.goals, log.reflections, log.goal_status]
+                async for log in self.iter_logs(filter_clause)
+            ]
+        rows = await self.shared_cache.get_or_compute(
+            self._shared_prefix() + json.dumps(key),
+            fetch,
+            config.NOTION_QUERY_CACHE_TTL_SECONDS,
+            config.SHARED_CACHE_LEASE_SECONDS
+        )
+        return [LogRecord(*row) for row in rows]
+    
+    def _shared_prefix(self) -> str:
+        return f"notion:{self.database_id}:"
+    
+    async def _use_mirror(self, consistency: Consistency) -> bool:
+        return consistency != "strong" and self.mirror is not None and await self.mirror.is_ready()
+    
+    async def _get_mirrored_logs(
+        self,
+        goal_status: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[str]
+    ) -> dict:
+        if limit is None and cursor is None:
+            return {"logs": await self.mirror.query(goal_status)}
+    
+        # Mirror cursors are row offsets into the date-ordered table.
+        offset = 0
+        if cursor is not None:
+            try:
+                if not cursor.startswith(MIRROR_CURSOR_PREFIX):
+                    raise ValueError(cursor)
+                offset = int(cursor[len(MIRROR_CURSOR_PREFIX):])
+                if offset < 0:
+                    raise ValueError(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="This cursor is not from the local mirror; restart paging without it."
+                )
+        limit = limit or PAGE_SIZE
+        logs = await self.mirror.query(goal_status, limit=limit + 1, offset=offset)
+        has_more = len(logs) > limit
+        return {
+            "logs": logs[:limit],
+            "next_cursor": f"{MIRROR_CURSOR_PREFIX}{offset + limit}" if has_more else None,
+            "has_more": has_more
+        }
+    
+    def _date_range_filter(self, start_date: str, end_date: str) -> dict:
+        return {
+            "and": [
+                {
+                    "property": "Date",
+                    "date": {
+                        "on_or_after": start_date
+                    }
+                },
+                {
+                    "property": "Date",
+                    "date": {
+                        "on_or_before": end_date
+                    }
+                }
+            ]
+        }
+    
+    def _goal_status_filter(self, goal_status: Optional[str]) -> Optional[dict]:
+        return (
+            {
+                "property": "Goal Status",
+                "select": {
+                    "equals": goal_status
+                }
+            } if goal_status else None
+        )
+    
+    def _process_logs(self, pages) -> List[LogRecord]:
+        logs = [decode_page(page) for page in pages]
+        logger.debug("Processed %s logs", len(logs))
+        return logs
+    
+    def to_row(self, page) -> dict:
+        """Flattens a Notion page into a LogMirror row."""
+        log = decode_page(page)
+        return {
+            "id": page['id'],
+            "date": log.date,
+            "thoughts": log.thoughts,
+            "goals": log.goals,
+            "reflections": log.reflections,
+            "goal_status": log.goal_status,
+            "last_edited_time": page['last_edited_time']
+        }
     
     async def create_log(self, entry: LogEntry) -> dict:
         try:
-            logger.info(f"Adding new log entry: {entry}")
-            self.notion.pages.create(
-                parent={"database_id": self.database_id},
-                properties={
-                    "Date": {"date": {"start": entry.date}},
-                    "Thoughts": {"rich_text": [{"text": {"content": entry.thoughts}}]},
-                    "Goals": {"rich_text": [{"text": {"content": entry.goals}}]},
-                    "Reflections": {"rich_text": [{"text": {"content": entry.reflections}}]},
-                    "Goal Status": {"select": {"name": entry.goal_status}}
-                }
-            )
+            logger.info("Adding new log entry: %s", entry)
+            page_id, page = await self._create_once(entry)
+            if page is None:
+                logger.info("Log entry %s was already added.", entry.idempotency_key)
+                return {"message": "Log entry already added.", "page_id": page_id}
+            await self._record_written([page])
             logger.info("Log entry added successfully.")
-            return {"message": "Log entry added successfully."}
+            return {"message": "Log entry added successfully.", "page_id": page_id}
         except Exception as e:
-            logger.error(f"Error adding log entry: {e}")
+            logger.error("Error adding log entry: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
+
+    async def create_logs(self, entries: List[LogEntry]) -> dict:
+        """
+        Writes many entries with bounded concurrency. Each write goes through the
+        shared rate limiter and retry policy; failures are reported per item
+        instead of failing the whole batch. Entries whose idempotency key was
+        already used are reported as duplicates with the earlier page id.
+        """
+        logger.info("Adding %s log entries in bulk", len(entries))
+        semaphore = asyncio.Semaphore(config.NOTION_WRITE_CONCURRENCY)
+    
+        async def create(index: int, entry: LogEntry) -> dict:
+            async with semaphore:
+                try:
+                    page_id, page = await self._create_once(entry)
+                except Exception as e:
+                    logger.error("Error adding log entry %s: %s", index, e)
+                    return {"index": index, "status": "failed", "error": str(e)}
+            # Entries repeating a key within the batch share one coalesced page.
+            if page is None or page_id in created_ids:
+                return {"index": index, "status": "duplicate", "page_id": page_id}
+            created_ids.add(page_id)
+            pages.append(page)
+            return {"index": index, "status": "created", "page_id": page_id}
+    
+        pages = []
+        created_ids = set()
+        results = await asyncio.gather(*(create(i, entry) for i, entry in enumerate(entries)))
+        await self._record_written(pages)
+        counts = {"created": 0, "duplicate": 0, "failed": 0}
+        for result in results:
+            counts[result["status"]] += 1
+        logger.info(
+            "Bulk insert finished: %s created, %s duplicate, %s failed",
+            counts["created"], counts["duplicate"], counts["failed"]
+        )
+        return {**counts, "results": results}
+    
+    async def _create_once(self, entry: LogEntry) -> Tuple[str, Optional[dict]]:
+        """
+        Creates the page unless the entry's idempotency key has been seen.
+        Returns (page_id, page); page is None when an earlier write with the
+        same key already created it. Concurrent writes sharing a key are
+        coalesced so only one of them reaches Notion.
+        """
+        key = entry.idempotency_key
+        if not key or self.idempotency_store is None:
+            page = await self._create_page(entry)
+            return page['id'], page
+        if self.tenant_id is not None:
+            # Tenants share the store, so their keys are namespaced.
+            key = f"{self.tenant_id}/{key}"
+        return await self.create_singleflight.do(key, lambda: self._create_keyed(key, entry))
+    
+    async def _create_keyed(self, key: str, entry: LogEntry) -> Tuple[str, Optional[dict]]:
+        if self.shared_cache is None:
+            return await self._create_unless_stored(key, entry)
+        # A retry can reach another worker while the first create is still in
+        # flight; the lease makes it wait and then find the stored page id.
+        async with self.shared_cache.lease("create:" + key, config.SHARED_CACHE_LEASE_SECONDS):
+            return await self._create_unless_stored(key, entry)
+
+    async def _create_unless_stored(self, key: str, entry: LogEntry) -> Tuple[str, Optional[dict]]:
+        page_id = await self.idempotency_store.get(key)
+        if page_id is not None:
+            return page_id, None
+        page = await self._create_page(entry)
+        await self.idempotency_store.put(key, page['id'])
+        return page['id'], page
+    
+    async def _create_page(self, entry: LogEntry) -> dict:
+        return await self._call(
+            "pages.create",
+            self.notion.pages.create,
+            # A retried create after a timeout or 5xx could add a second page.
+            retryable=is_retryable_create,
+            parent={"database_id": self.database_id},
+            properties={
+                "Date": {"date": {"start": entry.date}},
+                "Thoughts": {"rich_text": [{"text": {"content": entry.thoughts}}]},
+                "Goals": {"rich_text": [{"text": {"content": entry.goals}}]},
+                "Reflections": {"rich_text": [{"text": {"content": entry.reflections}}]},
+                "Goal Status": {"select": {"name": entry.goal_status}}
+            }
+        )
+    
+    def add_listener(self, listener: Callable[[List[dict]], Awaitable[None]]):
+        """
+        Registers a coroutine called with mirror-style rows (processed log plus
+        id and last_edited_time) whenever pages are created or synced.
+        """
+        self._listeners.append(listener)
+    
+    def add_removal_listener(self, listener: Callable[[List[str]], Awaitable[None]]):
+        """Registers a coroutine called with the ids of pages deleted in Notion."""
+        self._removal_listeners.append(listener)
+
+    async def notify_removed(self, page_ids: List[str]):
+        if self.shared_cache is not None:
+            await self.shared_cache.invalidate(self._shared_prefix())
+        for listener in self._removal_listeners:
+            try:
+                await listener(page_ids)
+            except Exception as e:
+                logger.error("Error in log removal listener %s: %s", listener, e)
+
+    async def notify_listeners(self, rows: List[dict]):
+        for listener in self._listeners:
+            try:
+                await listener(rows)
+            except Exception as e:
+                logger.error("Error in log listener %s: %s", listener, e)
+    
+    async def _record_written(self, pages: List[dict]):
+        if not pages:
+            return
+        rows = [self.to_row(page) for page in pages]
+        if self.mirror is not None:
+            await self.mirror.upsert(rows)
+        if self.shared_cache is not None:
+            await self.shared_cache.invalidate(self._shared_prefix())
+        await self.notify_listeners(rows)
+    
+    async def aclose(self):
+        await self.notion.aclose()
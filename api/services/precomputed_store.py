@@ -0,0 +1,81 @@
+# api/services/precomputed_store.py
+
+import asyncio
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS precomputed_feedback (
+    kind TEXT NOT NULL,
+    period TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (kind, period)
+);
+"""
+
+class PrecomputedStore:
+    """
+    Latest scheduler-generated feedback per (kind, period), e.g. ("daily", "2024-10-25").
+    Results are stored in SQLite so they survive restarts and reach other worker
+    processes; each process keeps the rows it has read in memory until another
+    process commits. Periods older than retention_days are deleted on write.
+    """
+
+    def __init__(self, path: str, retention_days: int):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        self.retention_days = retention_days
+        self._data_version = None
+        # Rows read so far, including misses (None).
+        self._results: Dict[Tuple[str, str], Optional[dict]] = {}
+
+    def _get(self, kind: str, period: str) -> Optional[dict]:
+        with self._lock:
+            # data_version changes when another connection (another worker
+            # process) commits; only then can the rows read so far be stale.
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                self._results.clear()
+            if (kind, period) in self._results:
+                return self._results[(kind, period)]
+            row = self._conn.execute(
+                "SELECT result FROM precomputed_feedback WHERE kind = ? AND period = ?", (kind, period)
+            ).fetchone()
+            result = json.loads(row[0]) if row else None
+            self._results[(kind, period)] = result
+            return result
+
+    def _put(self, kind: str, period: str, result: dict):
+        cutoff = (datetime.date.today() - datetime.timedelta(days=self.retention_days)).isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO precomputed_feedback (kind, period, result) VALUES (?, ?, ?)",
+                (kind, period, json.dumps(result))
+            )
+            self._conn.execute("DELETE FROM precomputed_feedback WHERE period < ?", (cutoff,))
+            self._conn.commit()
+            # This connection's own commits leave data_version unchanged.
+            self._results = {key: value for key, value in self._results.items() if key[1] >= cutoff}
+            if period >= cutoff:
+                self._results[(kind, period)] = result
+
+    async def get(self, kind: str, period: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, kind, period)
+
+    async def put(self, kind: str, period: str, result: dict):
+        await asyncio.to_thread(self._put, kind, period, result)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
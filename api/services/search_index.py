@@ -0,0 +1,217 @@
+# api/services/search_index.py
+
+import asyncio
+import datetime
+import os
+import re
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+from api.services.notion_service import NO_GOALS, NO_REFLECTIONS, NO_THOUGHTS
+from api.utils.prompt_packer import PLACEHOLDERS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_docs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    date TEXT NOT NULL,
+    goal_status TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_docs_date ON search_docs (date);
+CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+    thoughts, goals, reflections,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS search_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def to_match_query(q: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query: every word must match, in any field.
+    Words are quoted so user input is never parsed as FTS5 syntax; a trailing
+    "*" on a word keeps prefix matching.
+    """
+    terms = []
+    for match in re.finditer(r"(\w+)(\*?)", q, re.UNICODE):
+        word, star = match.groups()
+        terms.append(f'"{word}"{star}')
+    return " ".join(terms) or None
+
+def _clean(text: str) -> str:
+    # Placeholder values for empty properties would otherwise match e.g. "thoughts".
+    return "" if text in PLACEHOLDERS else text
+
+class SearchIndex:
+    """
+    BM25 full-text index over log thoughts, goals and reflections, kept in
+    SQLite FTS5. search_docs maps page ids to FTS rowids and holds the columns
+    used for filtering, so an edited page replaces its own row in place.
+    Scoring is linear in the number of matches, so a query matching more than
+    max_candidates logs is ranked among the most recently added ones only.
+    """
+
+    def __init__(self, path: str, max_candidates: int = 2000):
+        self.max_candidates = max_candidates
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def _apply(self, rows: List[dict]):
+        with self._lock:
+            # Worker processes share the index; lock it before checking what is indexed.
+            self._conn.execute("BEGIN IMMEDIATE")
+            with self._conn:
+                for row in rows:
+                    known = self._conn.execute(
+                        "SELECT rowid, last_edited_time FROM search_docs WHERE id = ?", (row["id"],)
+                    ).fetchone()
+                    if known is not None and known[1] == row["last_edited_time"]:
+                        continue
+                    if known is not None:
+                        self._conn.execute("DELETE FROM log_fts WHERE rowid = ?", (known[0],))
+                    cursor = self._conn.execute(
+                        "INSERT INTO search_docs (id, date, goal_status, last_edited_time) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET date = excluded.date, goal_status = excluded.goal_status, "
+                        "last_edited_time = excluded.last_edited_time "
+                        "RETURNING rowid",
+                        (row["id"], row["date"], row["goal_status"], row["last_edited_time"])
+                    )
+                    rowid = cursor.fetchone()[0]
+                    self._conn.execute(
+                        "INSERT INTO log_fts (rowid, thoughts, goals, reflections) VALUES (?, ?, ?, ?)",
+                        (rowid, _clean(row["thoughts"]), _clean(row["goals"]), _clean(row["reflections"]))
+                    )
+
+    def _search(
+        self,
+        match: str,
+        goal_status: Optional[str],
+        start_date: Optional[datetime.date],
+        end_date: Optional[datetime.date],
+        limit: int
+    ) -> Tuple[List[dict], bool]:
+        filters = ""
+        params = [match]
+        if goal_status:
+            filters += " AND d.goal_status = ?"
+            params.append(goal_status)
+        if start_date:
+            filters += " AND d.date >= ?"
+            params.append(start_date.isoformat())
+        if end_date:
+            # Dates may carry a time part, so compare against the start of the next day.
+            filters += " AND d.date < ?"
+            params.append((end_date + datetime.timedelta(days=1)).isoformat())
+        # Finding the max_candidates-th newest match walks rowids without
+        # scoring; ranking is then limited to the rows from there on.
+        threshold_sql = (
+            "SELECT f.rowid FROM log_fts f JOIN search_docs d ON d.rowid = f.rowid"
+            f" WHERE log_fts MATCH ?{filters} ORDER BY f.rowid DESC LIMIT 1 OFFSET ?"
+        )
+        with self._lock:
+            threshold = self._conn.execute(threshold_sql, params + [self.max_candidates - 1]).fetchone()
+        capped = threshold is not None
+        if capped:
+            filters += " AND f.rowid >= ?"
+            params.append(threshold[0])
+        params += [limit, match]
+        # Rank first and build snippets only for the rows that made the cut.
+        sql = (
+            "WITH top AS ("
+            "  SELECT f.rowid AS rowid, f.rank AS score FROM log_fts f JOIN search_docs d ON d.rowid = f.rowid"
+            f" WHERE log_fts MATCH ?{filters} ORDER BY f.rank LIMIT ?"
+            ") "
+            "SELECT d.id, d.date, d.goal_status, f.thoughts, f.goals, f.reflections, "
+            "snippet(log_fts, -1, '[', ']', '...', 12), top.score "
+            "FROM top JOIN log_fts f ON f.rowid = top.rowid JOIN search_docs d ON d.rowid = top.rowid "
+            "WHERE log_fts MATCH ? ORDER BY top.score"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        results = [
+            {
+                "id": id,
+                "date": date,
+                "thoughts": thoughts or NO_THOUGHTS,
+                "goals": goals or NO_GOALS,
+                "reflections": reflections or NO_REFLECTIONS,
+                "goal_status": status,
+                "snippet": snippet,
+                # FTS5 ranks are negated BM25 scores; report them so higher is better.
+                "score": round(-score, 4)
+            }
+            for id, date, status, thoughts, goals, reflections, snippet, score in rows
+        ]
+        return results, capped
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM search_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO search_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+            self._conn.commit()
+
+    def _remove(self, page_ids: List[str]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            with self._conn:
+                for page_id in page_ids:
+                    known = self._conn.execute("SELECT rowid FROM search_docs WHERE id = ?", (page_id,)).fetchone()
+                    if known is None:
+                        continue
+                    self._conn.execute("DELETE FROM log_fts WHERE rowid = ?", (known[0],))
+                    self._conn.execute("DELETE FROM search_docs WHERE rowid = ?", (known[0],))
+
+    async def remove(self, page_ids: List[str]):
+        """NotionService removal listener: drops deleted logs from the index."""
+        if page_ids:
+            await asyncio.to_thread(self._remove, page_ids)
+
+    async def apply(self, rows: List[dict]):
+        """NotionService listener: indexes new logs and re-indexes edited ones."""
+        if rows:
+            await asyncio.to_thread(self._apply, rows)
+
+    async def search(
+        self,
+        q: str,
+        goal_status: Optional[str] = None,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
+        limit: int = 20
+    ) -> Tuple[List[dict], bool]:
+        """
+        Returns the best matches and whether ranking was capped, i.e. only the
+        max_candidates most recently added matches were considered.
+        """
+        match = to_match_query(q)
+        if match is None:
+            return [], False
+        return await asyncio.to_thread(self._search, match, goal_status, start_date, end_date, limit)
+
+    async def is_seeded(self) -> bool:
+        return await asyncio.to_thread(self._get_meta, "seeded") == "1"
+
+    async def mark_seeded(self):
+        await asyncio.to_thread(self._set_meta, "seeded", "1")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,188 @@
+# api/services/shared_cache.py
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# How often a process waiting on another's lease checks whether it is released.
+LEASE_POLL_SECONDS = 0.05
+# Expired entries are swept at most this often, on the write path.
+PRUNE_INTERVAL_SECONDS = 60
+
+class SharedCache:
+    """
+    SQLite-backed cache shared by every worker process on the machine, with
+    short-lived leases that extend SingleFlight across processes: the worker
+    holding a key's lease computes the value while the others wait for it to
+    appear. A lease expires on its own, so a crashed holder cannot block others.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.owner = uuid.uuid4().hex
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.lease_waits = 0
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM shared_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl_seconds)
+            )
+            if now - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                self._conn.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (now,))
+                self._conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+                self._last_prune = now
+            self._conn.commit()
+
+    def _invalidate(self, prefix: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM shared_cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+            self._conn.commit()
+
+    def _try_lease(self, key: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at <= ?",
+                (key, self.owner, now + ttl_seconds, now)
+            )
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def _release(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+            self._conn.commit()
+
+    def _take(self, name: str, rate: float, capacity: float, tokens: float) -> float:
+        with self._lock:
+            # Write-locks the file so two processes cannot take the same tokens.
+            self._conn.execute("BEGIN IMMEDIATE")
+            with self._conn:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM rate_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                available = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                # The balance may go negative: the caller is given a slot in
+                # the future and sleeps until then, so waiters queue in order.
+                available -= tokens
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (name, available, now)
+                )
+        return max(0.0, -available / rate)
+
+    async def take(self, name: str, rate: float, capacity: float, tokens: float = 1) -> float:
+        """
+        Takes tokens from the named bucket shared by every process and returns
+        how many seconds the caller must wait before using them.
+        """
+        return await asyncio.to_thread(self._take, name, rate, capacity, tokens)
+
+    async def get(self, key: str) -> Any:
+        value = await asyncio.to_thread(self._get, key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        await asyncio.to_thread(self._set, key, json.dumps(value), ttl_seconds)
+
+    async def invalidate(self, prefix: str):
+        """Drops every entry whose key starts with prefix, in all processes."""
+        await asyncio.to_thread(self._invalidate, prefix)
+
+    @asynccontextmanager
+    async def lease(self, key: str, ttl_seconds: float):
+        """
+        Holds key's lease for the body, waiting while another process holds it.
+        Yields once the lease is taken, or once the previous holder's lease is
+        released or has expired, whichever comes first.
+        """
+        waited = False
+        while not await asyncio.to_thread(self._try_lease, key, ttl_seconds):
+            if not waited:
+                self.lease_waits += 1
+                waited = True
+            await asyncio.sleep(LEASE_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(self._release, key)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl_seconds: float,
+        lease_seconds: float
+    ) -> Any:
+        """
+        Returns the cached value for key, or computes and stores it. Only one
+        process computes at a time; the others pick up its result.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        async with self.lease(key, lease_seconds):
+            value = await self.get(key)
+            if value is None:
+                value = await compute()
+                await self.set(key, value, ttl_seconds)
+        return value
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "lease_waits": self.lease_waits}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
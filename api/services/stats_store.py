@@ -0,0 +1,255 @@
+# api/services/stats_store.py
+
+import asyncio
+import datetime
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stat_pages (
+    id TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    goal_status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stat_counts (
+    granularity TEXT NOT NULL,
+    period TEXT NOT NULL,
+    goal_status TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (granularity, period, goal_status)
+);
+CREATE TABLE IF NOT EXISTS streaks (
+    start TEXT PRIMARY KEY,
+    end TEXT NOT NULL UNIQUE,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_streaks_length ON streaks (length);
+CREATE TABLE IF NOT EXISTS stat_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+GRANULARITIES = ("day", "week", "month")
+# How many periods /stats returns when no start date is given.
+DEFAULT_PERIODS = {"day": 30, "week": 12, "month": 12}
+
+def period_of(granularity: str, day: datetime.date) -> str:
+    if granularity == "day":
+        return day.isoformat()
+    if granularity == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{day.year}-{day.month:02d}"
+
+def _default_start(granularity: str, end: datetime.date) -> datetime.date:
+    periods = DEFAULT_PERIODS[granularity]
+    if granularity == "day":
+        return end - datetime.timedelta(days=periods - 1)
+    if granularity == "week":
+        return end - datetime.timedelta(weeks=periods - 1)
+    month = end.year * 12 + end.month - 1 - (periods - 1)
+    return datetime.date(month // 12, month % 12 + 1, 1)
+
+def _parse_day(date: str) -> Optional[datetime.date]:
+    try:
+        return datetime.date.fromisoformat(date[:10])
+    except ValueError:
+        return None
+
+class StatsStore:
+    """
+    Goal-status rollups per day, ISO week and month, plus runs of consecutive
+    completed days. Every written or synced log adjusts the counters by its
+    difference from the last version seen, so reads never scan the logs.
+    """
+
+    def __init__(self, path: str, completed_status: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.completed_status = completed_status
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def _apply(self, rows: List[dict]):
+        with self._lock:
+            # Held from the first read, so a worker applying the same page
+            # concurrently cannot make both count it.
+            self._conn.execute("BEGIN IMMEDIATE")
+            # Commits on success; rolls back on error so the write lock is released.
+            with self._conn:
+                for row in rows:
+                    new = (row["date"][:10], row["goal_status"])
+                    old = self._conn.execute(
+                        "SELECT day, goal_status FROM stat_pages WHERE id = ?", (row["id"],)
+                    ).fetchone()
+                    if old == new:
+                        continue
+                    if old is not None:
+                        self._adjust(*old, -1)
+                    self._adjust(*new, 1)
+                    self._conn.execute(
+                        "INSERT INTO stat_pages (id, day, goal_status) VALUES (?, ?, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET day = excluded.day, goal_status = excluded.goal_status",
+                        (row["id"], *new)
+                    )
+
+    def _adjust(self, day: str, goal_status: str, delta: int):
+        date = _parse_day(day)
+        if date is None:
+            return
+        for granularity in GRANULARITIES:
+            key = (granularity, period_of(granularity, date), goal_status)
+            self._conn.execute(
+                "INSERT INTO stat_counts (granularity, period, goal_status, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (granularity, period, goal_status) DO UPDATE SET count = count + excluded.count",
+                (*key, delta)
+            )
+            if delta < 0:
+                self._conn.execute(
+                    "DELETE FROM stat_counts WHERE granularity = ? AND period = ? AND goal_status = ? AND count <= 0",
+                    key
+                )
+        if goal_status != self.completed_status:
+            return
+        completed = self._conn.execute(
+            "SELECT count FROM stat_counts WHERE granularity = 'day' AND period = ? AND goal_status = ?",
+            (date.isoformat(), goal_status)
+        ).fetchone()
+        # Only a day gaining its first completed log, or losing its last, changes the streaks.
+        if delta > 0 and completed[0] == delta:
+            self._add_streak_day(date)
+        elif delta < 0 and completed is None:
+            self._remove_streak_day(date)
+
+    def _add_streak_day(self, date: datetime.date):
+        start = end = date
+        before = self._conn.execute(
+            "SELECT start FROM streaks WHERE end = ?", ((date - datetime.timedelta(days=1)).isoformat(),)
+        ).fetchone()
+        after = self._conn.execute(
+            "SELECT end FROM streaks WHERE start = ?", ((date + datetime.timedelta(days=1)).isoformat(),)
+        ).fetchone()
+        if before is not None:
+            start = datetime.date.fromisoformat(before[0])
+            self._conn.execute("DELETE FROM streaks WHERE start = ?", (before[0],))
+        if after is not None:
+            end = datetime.date.fromisoformat(after[0])
+            self._conn.execute("DELETE FROM streaks WHERE start = ?", ((date + datetime.timedelta(days=1)).isoformat(),))
+        self._insert_streak(start, end)
+
+    def _remove_streak_day(self, date: datetime.date):
+        row = self._conn.execute(
+            "SELECT start, end FROM streaks WHERE start <= ? ORDER BY start DESC LIMIT 1", (date.isoformat(),)
+        ).fetchone()
+        if row is None or row[1] < date.isoformat():
+            return
+        self._conn.execute("DELETE FROM streaks WHERE start = ?", (row[0],))
+        start, end = datetime.date.fromisoformat(row[0]), datetime.date.fromisoformat(row[1])
+        if start < date:
+            self._insert_streak(start, date - datetime.timedelta(days=1))
+        if date < end:
+            self._insert_streak(date + datetime.timedelta(days=1), end)
+
+    def _insert_streak(self, start: datetime.date, end: datetime.date):
+        self._conn.execute(
+            "INSERT INTO streaks (start, end, length) VALUES (?, ?, ?)",
+            (start.isoformat(), end.isoformat(), (end - start).days + 1)
+        )
+
+    def _query(self, granularity: str, start: datetime.date, end: datetime.date, today: datetime.date) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT period, goal_status, count FROM stat_counts "
+                "WHERE granularity = ? AND period >= ? AND period <= ? ORDER BY period",
+                (granularity, period_of(granularity, start), period_of(granularity, end))
+            ).fetchall()
+            # A streak is current if it reaches today, or yesterday while today is still open.
+            current = self._conn.execute(
+                "SELECT start, end, length FROM streaks WHERE end >= ? ORDER BY end DESC LIMIT 1",
+                ((today - datetime.timedelta(days=1)).isoformat(),)
+            ).fetchone()
+            longest = self._conn.execute(
+                "SELECT start, end, length FROM streaks ORDER BY length DESC, end DESC LIMIT 1"
+            ).fetchone()
+
+        periods = {}
+        for period, goal_status, count in rows:
+            entry = periods.setdefault(period, {"period": period, "entries": 0, "by_status": {}})
+            entry["entries"] += count
+            entry["by_status"][goal_status] = count
+        return {
+            "granularity": granularity,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "periods": list(periods.values()),
+            "streaks": {"current": self._streak(current), "longest": self._streak(longest)}
+        }
+
+    @staticmethod
+    def _streak(row: Optional[Tuple[str, str, int]]) -> Optional[dict]:
+        return {"start": row[0], "end": row[1], "days": row[2]} if row else None
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM stat_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO stat_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+            self._conn.commit()
+
+    def _remove(self, page_ids: List[str]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            with self._conn:
+                for page_id in page_ids:
+                    old = self._conn.execute(
+                        "SELECT day, goal_status FROM stat_pages WHERE id = ?", (page_id,)
+                    ).fetchone()
+                    if old is None:
+                        continue
+                    self._adjust(*old, -1)
+                    self._conn.execute("DELETE FROM stat_pages WHERE id = ?", (page_id,))
+
+    async def remove(self, page_ids: List[str]):
+        """NotionService removal listener: takes deleted logs out of the rollups."""
+        if page_ids:
+            await asyncio.to_thread(self._remove, page_ids)
+
+    async def apply(self, rows: List[dict]):
+        """NotionService listener: folds new and edited logs into the rollups."""
+        if rows:
+            await asyncio.to_thread(self._apply, rows)
+
+    async def get_stats(
+        self,
+        granularity: str,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None
+    ) -> dict:
+        today = datetime.date.today()
+        end = end or today
+        start = start or _default_start(granularity, end)
+        return await asyncio.to_thread(self._query, granularity, start, end, today)
+
+    async def is_seeded(self) -> bool:
+        return await asyncio.to_thread(self._get_meta, "seeded") == "1"
+
+    async def mark_seeded(self):
+        await asyncio.to_thread(self._set_meta, "seeded", "1")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,154 @@
+# api/services/summary_service.py
+
+import asyncio
+import datetime
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+
+from api import config
+from api.models.log_models import Consistency, LogRecord
+from api.services.feedback_service import CHAIN_NAMES, FeedbackService
+from api.services.notion_service import NotionService
+from api.services.summary_store import SummaryStore
+from api.utils.helpers import logger
+
+DAY_SUMMARY_TEMPLATE = (
+    "Here are my logs for {period}:\n{logs}\n"
+    "Summarize this day in a few sentences: what I worked on, which goals moved forward or stalled, "
+    "and anything notable about my mindset. Keep concrete details; skip filler."
+)
+
+ROLLUP_SUMMARY_TEMPLATE = (
+    "Here are summaries of my {children} for {period}:\n{summaries}\n"
+    "Combine them into one summary of {period}. Keep recurring patterns, progress on goals, "
+    "setbacks and notable changes in mindset. Drop details that only mattered on a single day."
+)
+
+RANGE_FEEDBACK_TEMPLATE = (
+    "Here are summaries of my logs from {start} to {end}:\n{summaries}\n"
+    "Based on these summaries, review how this period went. Identify recurring patterns, highlight "
+    "what worked well, and point out where I struggled. Then give me a concrete, step-by-step plan "
+    "for the next period, and explain why these steps will maximize my progress."
+)
+
+CHAIN_NAMES.update({
+    DAY_SUMMARY_TEMPLATE: "day_summary",
+    ROLLUP_SUMMARY_TEMPLATE: "rollup_summary",
+    RANGE_FEEDBACK_TEMPLATE: "range_feedback"
+})
+
+# Node = (period label, input hash, summary text)
+Node = Tuple[str, str, str]
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class SummaryService:
+    """
+    Map-reduce feedback for arbitrary date ranges. Each day is summarized once,
+    days roll up into weeks and weeks into months, and the final feedback is
+    generated from the highest level that fits the range. Every node is stored
+    under the hash of its inputs, so a changed day only recomputes the path from
+    that day up to the root.
+    """
+
+    def __init__(self, notion_service: NotionService, feedback_service: FeedbackService, store: SummaryStore):
+        self.notion_service = notion_service
+        self.feedback_service = feedback_service
+        self.store = store
+        self._semaphore = asyncio.Semaphore(config.SUMMARY_CONCURRENCY)
+        self.generated = 0
+
+    async def generate_range_feedback(
+        self,
+        start: datetime.date,
+        end: datetime.date,
+        consistency: Consistency = "eventual"
+    ) -> dict:
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must be on or before end.")
+        logs = await self.notion_service.fetch_logs_for_date_range(start.isoformat(), end.isoformat(), consistency)
+        try:
+            logger.info("Generating range feedback from %s to %s", start, end)
+            if not logs:
+                return {"feedback": f"No logs found from {start} to {end}.", "cached": False}
+
+            generated_before = self.generated
+            days = await self._summarize_days(logs)
+            weeks = await self._roll_up("week", days, self._week_of)
+            months = await self._roll_up("month", weeks, lambda label: label.split("/")[0])
+
+            span = (end - start).days + 1
+            if span <= config.SUMMARY_DAY_LEVEL_MAX_DAYS:
+                nodes = days
+            elif span <= config.SUMMARY_WEEK_LEVEL_MAX_DAYS:
+                nodes = weeks
+            else:
+                nodes = months
+
+            result = await self.feedback_service.run_chain(RANGE_FEEDBACK_TEMPLATE, {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "summaries": "\n".join(f"{label}: {summary}" for label, _, summary in nodes)
+            })
+            result["levels"] = {"days": len(days), "weeks": len(weeks), "months": len(months)}
+            result["summaries_generated"] = self.generated - generated_before
+            return result
+        except Exception as e:
+            logger.error("Error generating range feedback: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def _summarize_days(self, logs: List[LogRecord]) -> List[Node]:
+        by_day: Dict[str, List[LogRecord]] = OrderedDict()
+        for log in sorted(logs, key=lambda log: log.date):
+            by_day.setdefault(log.date[:10], []).append(log)
+
+        async def summarize(day: str, day_logs: List[LogRecord]) -> Node:
+            formatted_logs = self.feedback_service.format_logs_for_prompt(day_logs)
+            input_hash = _hash(formatted_logs)
+            summary = await self._summarize("day", day, input_hash, DAY_SUMMARY_TEMPLATE, {
+                "period": day,
+                "logs": formatted_logs
+            })
+            return day, input_hash, summary
+
+        return list(await asyncio.gather(*(summarize(day, day_logs) for day, day_logs in by_day.items())))
+
+    async def _roll_up(self, level: str, children: List[Node], parent_of) -> List[Node]:
+        groups: Dict[str, List[Node]] = OrderedDict()
+        for node in children:
+            groups.setdefault(parent_of(node[0]), []).append(node)
+
+        async def roll_up(period: str, nodes: List[Node]) -> Node:
+            input_hash = _hash(*(f"{label}:{child_hash}" for label, child_hash, _ in nodes))
+            if len(nodes) == 1:
+                # A single child already is the summary of its parent.
+                return period, input_hash, nodes[0][2]
+            summary = await self._summarize(level, period, input_hash, ROLLUP_SUMMARY_TEMPLATE, {
+                "children": "days" if level == "week" else "weeks",
+                "period": period,
+                "summaries": "\n".join(f"{label}: {summary}" for label, _, summary in nodes)
+            })
+            return period, input_hash, summary
+
+        return list(await asyncio.gather(*(roll_up(period, nodes) for period, nodes in groups.items())))
+
+    async def _summarize(self, level: str, period: str, input_hash: str, template: str, inputs: dict) -> str:
+        summary = await self.store.get(level, period, input_hash)
+        if summary is not None:
+            return summary
+        async with self._semaphore:
+            summary = await self.feedback_service.complete(template, inputs)
+        await self.store.put(level, period, input_hash, summary)
+        self.generated += 1
+        logger.info("Summarized %s %s", level, period)
+        return summary
+
+    @staticmethod
+    def _week_of(day: str) -> str:
+        # Weeks are split at month boundaries so each week has exactly one parent month.
+        date = datetime.date.fromisoformat(day)
+        return f"{date.year}-{date.month:02d}/W{date.isocalendar()[1]:02d}"
@@ -0,0 +1,62 @@
+# api/services/summary_store.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    level TEXT NOT NULL,
+    period TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (level, period, input_hash)
+);
+"""
+
+class SummaryStore:
+    """
+    Persists day/week/month summaries keyed by the hash of their inputs, so a
+    node is only re-summarized when something underneath it changed.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def _get(self, level: str, period: str, input_hash: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE level = ? AND period = ? AND input_hash = ?",
+                (level, period, input_hash)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _put(self, level: str, period: str, input_hash: str, summary: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (level, period, input_hash, summary, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (level, period, input_hash, summary, time.time())
+            )
+            self._conn.commit()
+
+    async def get(self, level: str, period: str, input_hash: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, level, period, input_hash)
+
+    async def put(self, level: str, period: str, input_hash: str, summary: str):
+        await asyncio.to_thread(self._put, level, period, input_hash, summary)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,119 @@
+# api/services/tenant_registry.py
+
+import json
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException
+
+from api import config
+from api.services.idempotency_store import IdempotencyStore
+from api.services.notion_service import NotionService, create_notion_client, create_rate_limiter
+from api.services.shared_cache import SharedCache
+from api.utils.helpers import logger
+
+def load_tenants(path: str) -> Dict[str, dict]:
+    """
+    Reads the tenants file: {"tenant_id": {"token": ..., "database_id": ...,
+    "rate_limit_per_second": optional}, ...}.
+    """
+    with open(path) as f:
+        tenants = json.load(f)
+    for tenant_id, settings in tenants.items():
+        if not settings.get("token") or not settings.get("database_id"):
+            raise ValueError(f"Tenant {tenant_id!r} needs a token and a database_id.")
+    return tenants
+
+@dataclass
+class Tenant:
+    tenant_id: str
+    notion_service: NotionService
+    # Built on the tenant's first range feedback request.
+    summary_service: Any = None
+    in_use: int = 0
+
+class TenantRegistry:
+    """
+    Keeps one NotionService per active tenant, each with its own pooled Notion
+    client and token-bucket rate limiter, so one busy tenant cannot use up the
+    others' Notion quota. At most max_active tenants are kept; the least
+    recently used idle one is evicted and its client closed.
+    """
+
+    def __init__(
+        self,
+        tenants: Dict[str, dict],
+        max_active: int,
+        pool_size: int,
+        idempotency_store: Optional[IdempotencyStore] = None,
+        shared_cache: Optional[SharedCache] = None
+    ):
+        self.tenants = tenants
+        self.max_active = max_active
+        self.pool_size = pool_size
+        self.idempotency_store = idempotency_store
+        self.shared_cache = shared_cache
+        self._active: "OrderedDict[str, Tenant]" = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+
+    def _create(self, tenant_id: str) -> Tenant:
+        settings = self.tenants[tenant_id]
+        rate = float(settings.get("rate_limit_per_second", config.NOTION_RATE_LIMIT_PER_SECOND))
+        service = NotionService(
+            create_notion_client(settings["token"], pool_size=self.pool_size),
+            database_id=settings["database_id"],
+            rate_limiter=create_rate_limiter(rate, self.shared_cache, f"notion:{tenant_id}"),
+            idempotency_store=self.idempotency_store,
+            shared_cache=self.shared_cache,
+            tenant_id=tenant_id
+        )
+        self.created += 1
+        return Tenant(tenant_id, service)
+
+    @asynccontextmanager
+    async def lease(self, tenant_id: str) -> AsyncIterator[Tenant]:
+        """Yields the tenant's services for the duration of one request."""
+        if tenant_id not in self.tenants:
+            raise HTTPException(status_code=404, detail=f"Unknown tenant {tenant_id!r}.")
+        tenant = self._active.get(tenant_id)
+        if tenant is None:
+            tenant = self._active[tenant_id] = self._create(tenant_id)
+        self._active.move_to_end(tenant_id)
+        tenant.in_use += 1
+        try:
+            await self._evict_idle()
+            yield tenant
+        finally:
+            tenant.in_use -= 1
+            # Eviction skipped busy tenants; catch up once one goes idle.
+            await self._evict_idle()
+
+    async def _evict_idle(self):
+        # Only idle tenants are evicted, so a tenant never has two clients and
+        # rate limiters at once. While every tenant is busy the registry may
+        # hold more than max_active of them.
+        excess = len(self._active) - self.max_active
+        if excess <= 0:
+            return
+        idle = [tenant_id for tenant_id, tenant in self._active.items() if tenant.in_use == 0][:excess]
+        for tenant_id in idle:
+            tenant = self._active.pop(tenant_id)
+            self.evicted += 1
+            logger.debug("Evicted tenant %s.", tenant_id)
+            await tenant.notion_service.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "configured": len(self.tenants),
+            "active": len(self._active),
+            "created": self.created,
+            "evicted": self.evicted
+        }
+
+    async def aclose(self):
+        for tenant in self._active.values():
+            await tenant.notion_service.aclose()
+        self._active.clear()
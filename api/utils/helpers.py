@@ -1,7 +1,20 @@
 # api/utils/helpers.py
 
+import hashlib
+import json
 import logging
 
+from fastapi.encoders import jsonable_encoder
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from api.utils.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is the fallback
+    orjson = None
+
 def setup_logging():
     logging.basicConfig(
         level=logging.INFO,
@@ -14,4 +27,52 @@ def setup_logging():
 logger = logging.getLogger(__name__)
 
 # Initialize logging when the module is imported
-setup_logging()
\ No newline at end of file
+setup_logging()
+
+def format_sse(data: dict, event: str = None, event_id: str = None) -> str:
+    """
+    Formats one Server-Sent Events message with a JSON payload. A client that
+    reconnects sends the last event_id it saw back as Last-Event-ID.
+    """
+    message = f"id: {event_id}\n" if event_id is not None else ""
+    message += f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+def dumps_json(content) -> bytes:
+    """
+    Serializes content (including LogRecord dataclasses) to JSON, using orjson
+    when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(jsonable_encoder(content)).encode("utf-8")
+
+def json_response(content) -> Response:
+    """
+    Builds a JSON response directly, skipping FastAPI's per-field
+    jsonable_encoder pass when orjson can serialize the content natively.
+    """
+    with timed(None, phase="format"):
+        if orjson is not None:
+            return Response(orjson.dumps(content), media_type="application/json")
+        return JSONResponse(jsonable_encoder(content))
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so a W/ prefix on either side is ignored.
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def etag_json_response(request: Request, content) -> Response:
+    """
+    JSON response with a strong ETag computed from the serialized body. When
+    the client's If-None-Match already names that ETag, answers 304 with no body.
+    """
+    with timed(None, phase="format"):
+        body = dumps_json(content)
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    # no-cache: clients may store the response but must revalidate before reuse.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
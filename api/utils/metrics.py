@@ -0,0 +1,305 @@
+# api/utils/metrics.py
+
+import contextvars
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from api import config
+
+ENABLED = config.METRICS_ENABLED
+TRACING = config.TRACING_ENABLED
+# Timers skip the clock entirely when neither metrics nor tracing is on.
+_ACTIVE = ENABLED or TRACING
+
+# Seconds; spans fast mirror reads up to slow model calls.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    # Every sample names the worker process it came from; see render().
+    pairs = [f'worker="{os.getpid()}"']
+    pairs += [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        if ENABLED:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in self._values.items()]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        if ENABLED:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in self._values.items()]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        if not ENABLED:
+            return
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        state[-2] += value
+        state[-1] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+def snapshot() -> Dict[str, List[str]]:
+    """This process's samples, by metric name."""
+    return {metric.name: metric._samples() for metric in _registry}
+
+def render(snapshots: Sequence[Dict[str, List[str]]] = ()) -> str:
+    """
+    All registered metrics in the Prometheus text exposition format, for this
+    process and any snapshots of other worker processes. Samples carry a
+    worker label, so series from different workers never collide.
+    """
+    snapshots = [snapshot(), *snapshots]
+    lines = []
+    for metric in _registry:
+        lines += metric.header()
+        for samples in snapshots:
+            lines += samples.get(metric.name, ())
+    return "\n".join(lines) + "\n"
+
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"{pid}.json")
+
+def write_snapshot(directory: str):
+    os.makedirs(directory, exist_ok=True)
+    path = _snapshot_path(directory, os.getpid())
+    with open(path + ".tmp", "w") as f:
+        json.dump(snapshot(), f)
+    # Readers see the old snapshot or the new one, never half of one.
+    os.replace(path + ".tmp", path)
+
+def remove_snapshot(directory: str):
+    try:
+        os.remove(_snapshot_path(directory, os.getpid()))
+    except FileNotFoundError:
+        pass
+
+def read_snapshots(directory: str, max_age_seconds: float) -> List[Dict[str, List[str]]]:
+    """
+    The snapshots other worker processes wrote. One not updated for
+    max_age_seconds belongs to a worker that died; it is deleted.
+    """
+    snapshots = []
+    own = os.path.basename(_snapshot_path(directory, os.getpid()))
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return snapshots
+    now = time.time()
+    for name in names:
+        if not name.endswith(".json") or name == own:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if now - os.path.getmtime(path) > max_age_seconds:
+                os.remove(path)
+                continue
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            # Removed by its worker, or by another reader, while listing.
+            continue
+    return snapshots
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "lifecoach_http_request_duration_seconds",
+    "Time from request start until the response body is fully sent.",
+    ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = Gauge("lifecoach_http_requests_in_flight", "Requests currently being served.")
+NOTION_CALL_SECONDS = Histogram(
+    "lifecoach_notion_call_duration_seconds",
+    "Notion API calls, including rate-limit waits and retries.",
+    ("operation", "outcome")
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "lifecoach_singleflight_calls_total",
+    "Calls through a coalescing group, by whether they started the upstream call or joined one in flight.",
+    ("flight", "role")
+)
+LLM_CALL_SECONDS = Histogram(
+    "lifecoach_llm_call_duration_seconds",
+    "Model calls per prompt chain and answering model, from request until the last token.",
+    ("chain", "model", "mode", "outcome")
+)
+LLM_FIRST_TOKEN_SECONDS = Histogram(
+    "lifecoach_llm_time_to_first_token_seconds",
+    "Model calls, from request until the first token, including any hedge.",
+    ("chain", "model")
+)
+LLM_HEDGES = Counter(
+    "lifecoach_llm_hedges_total",
+    "Calls whose model missed the first-token budget, by which model answered (primary or fallback).",
+    ("chain", "winner")
+)
+LLM_TOKENS = Counter(
+    "lifecoach_llm_tokens_total",
+    "Tokens reported by the model, by prompt chain, model and kind (prompt or completion).",
+    ("chain", "model", "kind")
+)
+
+# Per-request phase durations, set by MetricsMiddleware when tracing is on.
+_trace: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("trace", default=None)
+
+class timed:
+    """
+    Times a block into a histogram whose last label is "outcome" ("ok" or
+    "error"), and adds the elapsed time to the current request's trace phase.
+
+        with timed(NOTION_CALL_SECONDS, "databases.query", phase="notion"):
+            ...
+    """
+    __slots__ = ("histogram", "labels", "phase", "started")
+
+    def __init__(self, histogram: Optional[Histogram], *labels: str, phase: Optional[str] = None):
+        self.histogram = histogram
+        self.labels = labels
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter() if _ACTIVE else 0.0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not _ACTIVE:
+            return False
+        elapsed = time.perf_counter() - self.started
+        if self.histogram is not None:
+            self.histogram.observe(elapsed, *self.labels, "error" if exc_type else "ok")
+        if self.phase is not None:
+            add_to_trace(self.phase, elapsed)
+        return False
+
+def add_to_trace(phase: str, seconds: float):
+    trace = _trace.get()
+    if trace is not None:
+        trace[phase] = trace.get(phase, 0.0) + seconds
+
+def _server_timing(trace: Dict[str, float], total: float) -> bytes:
+    parts = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in trace.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1")
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency and the in-flight gauge. With
+    tracing on it also collects per-phase time (notion, format, llm) for each
+    request and returns it in a Server-Timing header. Phases that run after the
+    headers are sent, such as a streamed model response, are not included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        trace = {} if TRACING else None
+        token = _trace.set(trace) if TRACING else None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(trace, time.perf_counter() - started)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status)
+            )
+            if token is not None:
+                _trace.reset(token)
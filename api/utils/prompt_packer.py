@@ -0,0 +1,112 @@
+# api/utils/prompt_packer.py
+
+import functools
+from dataclasses import dataclass
+from typing import List
+
+from api.models.log_models import LogRecord
+
+# Values the Notion decoder uses when a property is empty; they carry no signal.
+PLACEHOLDERS = frozenset({"", "No Thoughts", "No Goals", "No Reflections", "Not Specified", "No Date"})
+
+LEGEND = "Each line: date [goal status] T: thoughts | G: goals | R: reflections"
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding():
+    # Loaded on first use: the encoding tables take a while to read and stay resident.
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # tiktoken is optional; fall back to a character heuristic
+        return None
+
+def estimate_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # Roughly four characters per token for English text.
+    return (len(text) + 3) // 4
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cuts text down to at most `tokens` tokens, ending with "..." when cut."""
+    if tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= tokens:
+        return text
+    encoding = _get_encoding()
+    # One token is kept back for the ellipsis.
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max(tokens - 1, 0)]) + "..."
+    return text[:max(tokens - 1, 0) * 4] + "..."
+
+@dataclass
+class PackedPrompt:
+    text: str
+    tokens: int
+    entries: int
+    dropped: int
+
+class PromptPacker:
+    """
+    Formats logs into a compact prompt block under a token budget. Empty fields
+    are omitted, a goal repeated from an earlier day is replaced by a short
+    back-reference, and when the logs do not fit the most recent entries win.
+    """
+
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+
+    def pack(self, logs: List[LogRecord]) -> PackedPrompt:
+        budget = self.token_budget - estimate_tokens(LEGEND)
+        selected = []
+        selected_goals = set()
+        # Newest first, so older entries are the ones dropped when over budget.
+        # A goal already kept from a newer day costs one full copy plus short
+        # references however the references end up arranged.
+        for log in sorted(logs, key=lambda log: log.date, reverse=True):
+            reference = log.date if log.goals in selected_goals else None
+            line = self._format(log, reference)
+            cost = estimate_tokens(line) + 1
+            if cost > budget:
+                if not selected:
+                    # The newest entry alone is over budget: send as much of it
+                    # as fits rather than an empty prompt.
+                    text = LEGEND + "\n" + truncate_to_tokens(line, budget - 1)
+                    return PackedPrompt(text=text, tokens=estimate_tokens(text), entries=1, dropped=len(logs) - 1)
+                break
+            budget -= cost
+            selected.append(log)
+            selected_goals.add(log.goals)
+        selected.reverse()
+
+        lines = [LEGEND]
+        seen_goals = {}
+        for log in selected:
+            goals = log.goals
+            reference = seen_goals.get(goals)
+            if reference is None and goals not in PLACEHOLDERS:
+                seen_goals[goals] = log.date
+            lines.append(self._format(log, reference))
+        text = "\n".join(lines) if selected else ""
+        return PackedPrompt(
+            text=text,
+            tokens=estimate_tokens(text),
+            entries=len(selected),
+            dropped=len(logs) - len(selected)
+        )
+
+    @staticmethod
+    def _format(log: LogRecord, goals_reference) -> str:
+        parts = [log.date]
+        if log.goal_status not in PLACEHOLDERS:
+            parts.append(f"[{log.goal_status}]")
+        fields = []
+        if log.thoughts not in PLACEHOLDERS:
+            fields.append(f"T: {log.thoughts}")
+        if goals_reference is not None and len(log.goals) > len(f"same as {goals_reference}"):
+            fields.append(f"G: same as {goals_reference}")
+        elif log.goals not in PLACEHOLDERS:
+            fields.append(f"G: {log.goals}")
+        if log.reflections not in PLACEHOLDERS:
+            fields.append(f"R: {log.reflections}")
+        return " ".join(parts) + (" " + " | ".join(fields) if fields else "")
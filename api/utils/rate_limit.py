@@ -0,0 +1,48 @@
+# api/utils/rate_limit.py
+
+import asyncio
+import time
+
+class TokenBucket:
+    """
+    Async token-bucket limiter: refills at `rate` tokens per second up to
+    `capacity`, and acquire() waits until enough tokens are available.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        # Holding the lock while sleeping keeps waiters first-come, first-served.
+        async with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+class SharedTokenBucket:
+    """
+    TokenBucket whose balance lives in the SharedCache, so every worker
+    process draws on one budget instead of each getting the full rate.
+    """
+
+    def __init__(self, shared_cache, name: str, rate: float, capacity: float):
+        self.shared_cache = shared_cache
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+
+    async def acquire(self, tokens: float = 1):
+        wait = await self.shared_cache.take(self.name, self.rate, self.capacity, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,63 @@
+# api/utils/retry.py
+
+import asyncio
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from api.utils.helpers import logger
+
+T = TypeVar("T")
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, HTTPResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (RequestTimeoutError, httpx.TransportError))
+
+def is_retryable_create(error: Exception) -> bool:
+    """
+    For requests that are not idempotent, such as pages.create: only retry when
+    Notion cannot have acted on the request, i.e. it was rate limited or never
+    left this process. A read timeout or 5xx may follow a create that went through.
+    """
+    if isinstance(error, HTTPResponseError):
+        return error.status == 429
+    if isinstance(error, RequestTimeoutError):
+        # notion_client raises this from inside its httpx.TimeoutException handler.
+        error = error.__context__
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    headers = getattr(error, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+async def retry_with_backoff(
+    call: Callable[[], Awaitable[T]],
+    retries: int = 5,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    retryable: Callable[[Exception], bool] = is_retryable
+) -> T:
+    """
+    Runs `call`, retrying errors `retryable` accepts (by default rate-limit
+    (429), server (5xx) and transport errors) with full-jitter exponential
+    backoff. Retry-After is honoured when present.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= retries or not retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            delay = max(delay, retry_after_seconds(e) or 0)
+            attempt += 1
+            logger.warning("Retrying Notion call in %.2fs (attempt %s/%s): %s", delay, attempt, retries, e)
+            await asyncio.sleep(delay)
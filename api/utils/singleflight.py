@@ -0,0 +1,50 @@
+# api/utils/singleflight.py
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from api.utils.metrics import SINGLEFLIGHT_CALLS
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the
+    upstream call and everyone arriving while it is in flight awaits the same
+    result (or exception). The call runs as its own task, so a caller that
+    disconnects does not cancel it for the others. name labels its calls in
+    the lifecoach_singleflight_calls_total metric.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            SINGLEFLIGHT_CALLS.inc(self.name, "started")
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            SINGLEFLIGHT_CALLS.inc(self.name, "coalesced")
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Every caller may have stopped waiting (disconnected or timed out);
+        # retrieve the exception so it is not reported as unhandled.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
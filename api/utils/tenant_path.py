@@ -0,0 +1,25 @@
+# api/utils/tenant_path.py
+
+PREFIX = "/tenants/"
+
+class TenantPathMiddleware:
+    """
+    ASGI middleware that lets a path select the tenant: /tenants/{tenant_id}/logs
+    is served as /logs with the tenant header set to tenant_id, so every route
+    is available under a tenant prefix without being declared twice.
+    """
+
+    def __init__(self, app, header: str):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(PREFIX):
+            tenant_id, _, rest = scope["path"][len(PREFIX):].partition("/")
+            if tenant_id:
+                path = "/" + rest
+                headers = [(name, value) for name, value in scope["headers"] if name != self.header]
+                # Header values are latin-1; other ids cannot match a tenant and get a 404.
+                headers.append((self.header, tenant_id.encode("latin-1", "replace")))
+                scope = {**scope, "path": path, "raw_path": path.encode("utf-8"), "headers": headers}
+        await self.app(scope, receive, send)
@@ -7,6 +7,10 @@ from .commands import (
     add_log,
     get_daily_feedback,
     get_weekly_feedback,
+    show_sync_status,
+    start_sync,
+    stop_sync,
+    watch_logs,
 )
 
 __all__ = [
@@ -16,4 +20,8 @@ __all__ = [
     "add_log",
     "get_daily_feedback",
     "get_weekly_feedback",
+    "show_sync_status",
+    "start_sync",
+    "stop_sync",
+    "watch_logs",
 ]
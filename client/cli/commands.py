@@ -2,15 +2,41 @@
 
 import requests
 import datetime
+import json
+import time
+
+from utils import Journal, JournalFlusher, cached_get_json, create_session, session
 
 API_URL = "http://localhost:8000"
+# How long a background batch upload may take before it is retried later.
+SYNC_TIMEOUT_SECONDS = 30
+# Wait before reconnecting a dropped change stream.
+RECONNECT_SECONDS = 2
+
+journal = Journal()
+# The flusher thread gets its own connection so it never shares one with the menu.
+sync_session = create_session(pool_size=1)
+
+def send_batch(batch):
+    """
+    Posts journaled entries to /logs/batch, each with its idempotency key, and
+    returns the keys the server created or already had.
+    """
+    entries = [{**entry, "idempotency_key": key} for key, entry in batch]
+    response = sync_session.post(f"{API_URL}/logs/batch", json={"entries": entries}, timeout=SYNC_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return [
+        batch[result["index"]][0]
+        for result in response.json()["results"]
+        if result["status"] in ("created", "duplicate")
+    ]
+
+flusher = JournalFlusher(journal, send_batch)
 
 def fetch_logs(goal_status=None):
     params = {"goal_status": goal_status} if goal_status else {}
     try:
-        response = requests.get(f"{API_URL}/logs", params=params)
-        response.raise_for_status()
-        logs = response.json().get('logs', [])
+        logs = cached_get_json(f"{API_URL}/logs", params).get('logs', [])
         if not logs:
             print("No logs found.")
             return
@@ -23,9 +49,7 @@ def fetch_logs(goal_status=None):
 
 def fetch_daily_logs():
     try:
-        response = requests.get(f"{API_URL}/daily_logs")
-        response.raise_for_status()
-        logs = response.json().get('logs', [])
+        logs = cached_get_json(f"{API_URL}/daily_logs").get('logs', [])
         if not logs:
             print("No daily logs found.")
             return
@@ -38,9 +62,7 @@ def fetch_daily_logs():
 
 def fetch_weekly_logs():
     try:
-        response = requests.get(f"{API_URL}/weekly_logs")
-        response.raise_for_status()
-        logs = response.json().get('logs', [])
+        logs = cached_get_json(f"{API_URL}/weekly_logs").get('logs', [])
         if not logs:
             print("No weekly logs found.")
             return
@@ -66,27 +88,90 @@ def add_log():
         "goal_status": goal_status
     }
 
-    try:
-        response = requests.post(f"{API_URL}/logs", json=data)
+    journal.add(data)
+    flusher.wake()
+    print("Log entry saved; it will be sent to Notion in the background.")
+
+def start_sync():
+    flusher.start()
+
+def stop_sync():
+    remaining = flusher.stop()
+    if remaining:
+        print(f"{remaining} log entries are still queued and will be sent next time.")
+
+def show_sync_status():
+    status = flusher.status()
+    print(f"Queued log entries: {status['queued']}")
+    if status['last_flush']:
+        print(f"Last sync: {datetime.datetime.fromtimestamp(status['last_flush']):%Y-%m-%d %H:%M:%S}")
+    if status['last_error']:
+        print(f"Last sync error: {status['last_error']}")
+
+def stream_feedback(path, label):
+    """
+    Requests feedback as Server-Sent Events and prints tokens as they arrive.
+    """
+    with session.post(f"{API_URL}{path}", params={"stream": "true"}, stream=True) as response:
         response.raise_for_status()
-        print("Log entry added successfully.")
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to add log entry: {e}")
+        print(f"\nAI {label} Feedback: ", end="", flush=True)
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])
+                if event == "error":
+                    print(f"\nFailed to get {label.lower()} feedback: {data.get('detail')}")
+                elif event is None:
+                    print(data.get('token', ''), end="", flush=True)
+            elif not line:
+                event = None
+        print()
+
+def watch_logs():
+    """
+    Prints logs as they are created or edited, from the /logs/changes event
+    stream, until interrupted with Ctrl+C. Reconnects after dropped connections
+    and resumes from the last change seen.
+    """
+    print("Watching for log changes (Ctrl+C to stop)...")
+    last_event_id = None
+    try:
+        while True:
+            headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+            try:
+                with session.get(f"{API_URL}/logs/changes", headers=headers, stream=True) as response:
+                    response.raise_for_status()
+                    event = None
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line.startswith("id:"):
+                            last_event_id = line[len("id:"):].strip()
+                        elif line.startswith("event:"):
+                            event = line[len("event:"):].strip()
+                        elif line.startswith("data:") and event in ("created", "updated"):
+                            log = json.loads(line[len("data:"):])
+                            print(f"[{event}] Date: {log['date']}, Thoughts: {log['thoughts']}, "
+                                  f"Goals: {log['goals']} (Status: {log['goal_status']}), "
+                                  f"Reflections: {log['reflections']}")
+                        elif not line:
+                            event = None
+            except requests.exceptions.HTTPError as e:
+                print(f"Failed to watch logs: {e}")
+                return
+            except requests.exceptions.RequestException:
+                time.sleep(RECONNECT_SECONDS)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
 
 def get_daily_feedback():
     try:
-        response = requests.post(f"{API_URL}/daily_feedback")
-        response.raise_for_status()
-        feedback = response.json().get('feedback', '')
-        print(f"\nAI Daily Feedback: {feedback}")
+        stream_feedback("/daily_feedback", "Daily")
     except requests.exceptions.RequestException as e:
         print(f"Failed to get daily feedback: {e}")
 
 def get_weekly_feedback():
     try:
-        response = requests.post(f"{API_URL}/weekly_feedback")
-        response.raise_for_status()
-        feedback = response.json().get('feedback', '')
-        print(f"\nAI Weekly Feedback: {feedback}")
+        stream_feedback("/weekly_feedback", "Weekly")
     except requests.exceptions.RequestException as e:
         print(f"Failed to get weekly feedback: {e}")
@@ -6,7 +6,11 @@ from cli import (
     fetch_weekly_logs,
     add_log,
     get_daily_feedback,
-    get_weekly_feedback
+    get_weekly_feedback,
+    show_sync_status,
+    start_sync,
+    stop_sync,
+    watch_logs
 )
 from utils import clear_screen
 
@@ -18,9 +22,12 @@ def display_menu():
     print("4. Add Log")
     print("5. Get Daily Feedback")
     print("6. Get Weekly Feedback")
-    print("7. Exit")
+    print("7. Sync Status")
+    print("8. Watch Logs")
+    print("9. Exit")
 
 def main():
+    start_sync()
     while True:
         display_menu()
         choice = input("Select an option: ").strip()
@@ -39,6 +46,11 @@ def main():
         elif choice == '6':
             get_weekly_feedback()
         elif choice == '7':
+            show_sync_status()
+        elif choice == '8':
+            watch_logs()
+        elif choice == '9':
+            stop_sync()
             print("Exiting the client. Goodbye!")
             break
         else:
@@ -1,5 +1,7 @@
 # client/utils/__init__.py
 
 from .helpers import clear_screen
+from .http import cached_get_json, create_session, session
+from .journal import Journal, JournalFlusher
 
-__all__ = ["clear_screen"]
\ No newline at end of file
+__all__ = ["clear_screen", "cached_get_json", "create_session", "session", "Journal", "JournalFlusher"]
\ No newline at end of file
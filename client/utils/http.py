@@ -0,0 +1,63 @@
+# client/utils/http.py
+
+import hashlib
+import json
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = os.getenv(
+    "LIFECOACH_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai-life-coach", "http")
+)
+
+def create_session(pool_size=4):
+    """
+    One keep-alive session for the whole client, so repeat calls reuse the
+    same TCP connection instead of opening a new one each time.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+session = create_session()
+
+def _cache_path(url, params):
+    key = json.dumps([url, sorted((params or {}).items())])
+    return os.path.join(CACHE_DIR, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+def _read_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_cache(path, etag, body):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"etag": etag, "body": body}, f)
+    os.replace(temp_path, path)
+
+def cached_get_json(url, params=None):
+    """
+    GET that keeps the last response body and its ETag on disk. Repeat calls
+    send If-None-Match; on 304 the stored body is returned, so an unchanged
+    result costs one small round trip.
+    """
+    path = _cache_path(url, params)
+    cached = _read_cache(path)
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+    response = session.get(url, params=params, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached["body"]
+    response.raise_for_status()
+    body = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        _write_cache(path, etag, body)
+    return body
@@ -0,0 +1,209 @@
+# client/utils/journal.py
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so only one client should run at a time there.
+    fcntl = None
+
+JOURNAL_PATH = os.getenv(
+    "LIFECOACH_JOURNAL_PATH",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "ai-life-coach", "journal.jsonl")
+)
+
+class Journal:
+    """
+    Append-only JSONL file of log entries waiting to be sent. Each new entry
+    is written with a fresh idempotency key and fsynced before add returns,
+    so it survives a crash or a closed terminal; sent entries are recorded
+    with an ack line. The file is rewritten once nothing is pending.
+    Several clients may share the file: every read and write holds an flock
+    on a sidecar lock file, and a rewrite keeps entries other clients added.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._load()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # A sidecar, because _rewrite replaces the journal file itself.
+            with open(self.path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read(self):
+        """The pending entries recorded in the file, oldest first."""
+        pending = OrderedDict()
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return pending
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write; the entry never returned.
+                continue
+            if record["op"] == "add":
+                pending[record["key"]] = record["entry"]
+            elif record["op"] == "ack":
+                for key in record["keys"]:
+                    pending.pop(key, None)
+        return pending
+
+    def _load(self):
+        with self._locked():
+            self._pending = self._read()
+            self._rewrite(self._pending)
+
+    def _append(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite(self, pending):
+        """Replaces the file with one add line per pending entry."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            for key, entry in pending.items():
+                f.write(json.dumps({"op": "add", "key": key, "entry": entry}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def add(self, entry):
+        key = uuid.uuid4().hex
+        with self._locked():
+            self._append({"op": "add", "key": key, "entry": entry})
+            self._pending[key] = entry
+        return key
+
+    def pending(self, limit=None):
+        """Oldest-first list of (key, entry) pairs not yet acknowledged."""
+        with self._lock:
+            items = list(self._pending.items())
+        return items[:limit] if limit else items
+
+    def ack(self, keys):
+        if not keys:
+            return
+        with self._locked():
+            for key in keys:
+                self._pending.pop(key, None)
+            # Re-read under the lock: another client may have added entries
+            # since this one loaded, and a rewrite must not drop them.
+            on_disk = self._read()
+            for key in keys:
+                on_disk.pop(key, None)
+            if on_disk:
+                self._append({"op": "ack", "keys": list(keys)})
+            else:
+                self._rewrite(on_disk)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+class JournalFlusher:
+    """
+    Background thread that drains a Journal in batches through send_batch.
+    send_batch takes a list of (key, entry) pairs and returns the keys the
+    server has accepted; anything else stays queued and is retried after an
+    exponentially growing delay. wake() starts a flush right away.
+    """
+
+    def __init__(self, journal, send_batch, batch_size=50, interval=5.0, max_backoff=60.0):
+        self.journal = journal
+        self.send_batch = send_batch
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.last_flush = None
+        self.last_error = None
+        self._backoff = interval
+        self._wake = threading.Event()
+        self._stopping = False
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="journal-flusher", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping:
+            delay = self.interval if self.flush() else self._backoff
+            self._wake.wait(timeout=delay)
+            self._wake.clear()
+
+    def flush(self):
+        """Sends pending entries until the journal is empty or a batch fails."""
+        with self._flush_lock:
+            while True:
+                batch = self.journal.pending(self.batch_size)
+                if not batch:
+                    return True
+                try:
+                    accepted = self.send_batch(batch)
+                except Exception as e:
+                    accepted, error = [], str(e)
+                else:
+                    error = None if len(accepted) == len(batch) else (
+                        f"{len(batch) - len(accepted)} of {len(batch)} entries were not accepted"
+                    )
+                self.journal.ack(accepted)
+                if error:
+                    self.last_error = error
+                    self._backoff = min(self._backoff * 2, self.max_backoff)
+                    return False
+                self.last_flush = time.time()
+                self.last_error = None
+                self._backoff = self.interval
+
+    def stop(self, timeout=5.0):
+        """
+        Stops the thread, then makes one last attempt to send what is queued
+        unless a flush is still running after timeout seconds. Returns the
+        number of entries still pending, which are kept on disk.
+        """
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return len(self.journal)
+        if len(self.journal):
+            self.flush()
+        return len(self.journal)
+
+    def status(self):
+        return {
+            "queued": len(self.journal),
+            "last_flush": self.last_flush,
+            "last_error": self.last_error
+        }
@@ -1,5 +1,7 @@
-import requests
+import argparse
 import datetime
+import json
+import requests
 
 API_URL = "http://localhost:8000/logs"
 
@@ -52,19 +54,62 @@ sample_data = [
     }
 ]
 
-# Adding logs for each day
-for i in range(7):
-    log_date = start_date - datetime.timedelta(days=i)
-    data = {
-        "date": log_date.isoformat(),
-        "thoughts": sample_data[i]["thoughts"],
-        "goals": sample_data[i]["goals"],
-        "reflections": sample_data[i]["reflections"],
-        "goal_status": sample_data[i]["goal_status"]
-    }
+def add_sample_logs():
+    # Adding logs for each day
+    for i in range(7):
+        log_date = start_date - datetime.timedelta(days=i)
+        data = {
+            "date": log_date.isoformat(),
+            "thoughts": sample_data[i]["thoughts"],
+            "goals": sample_data[i]["goals"],
+            "reflections": sample_data[i]["reflections"],
+            "goal_status": sample_data[i]["goal_status"]
+        }
+
+        response = requests.post(API_URL, json=data)
+        if response.status_code == 200:
+            print(f"Log for {log_date} added successfully.")
+        else:
+            print(f"Failed to add log for {log_date}. Status code: {response.status_code}")
+
+def read_chunks(path, chunk_size):
+    # Reads the JSONL file lazily so large backfills never sit in memory at once.
+    chunk = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                chunk.append(json.loads(line))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def bulk_upload(path, chunk_size):
+    created = failed = 0
+    with requests.Session() as session:
+        for number, chunk in enumerate(read_chunks(path, chunk_size), start=1):
+            response = session.post(f"{API_URL}/batch", json={"entries": chunk})
+            if response.status_code != 200:
+                print(f"Chunk {number} rejected. Status code: {response.status_code}")
+                failed += len(chunk)
+                continue
+            report = response.json()
+            created += report["created"]
+            failed += report["failed"]
+            for result in report["results"]:
+                if result["status"] == "failed":
+                    print(f"Chunk {number}, entry {result['index']} failed: {result['error']}")
+            print(f"Chunk {number}: {report['created']} created, {report['failed']} failed.")
+    print(f"Done: {created} created, {failed} failed.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add logs to the AI Life Coach API.")
+    parser.add_argument("--bulk", metavar="FILE", help="JSONL file with one log entry per line")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
 
-    response = requests.post(API_URL, json=data)
-    if response.status_code == 200:
-        print(f"Log for {log_date} added successfully.")
+    if args.bulk:
+        bulk_upload(args.bulk, args.chunk_size)
     else:
-        print(f"Failed to add log for {log_date}. Status code: {response.status_code}")
+        add_sample_logs()
@@ -0,0 +1,118 @@
+# scripts/bench/batch.py
+#
+# Compares generating feedback for many requests with a sequential loop over
+# POST /feedback against one POST /feedback/batch, using the local Notion and
+# OpenAI stand-ins. The feedback cache is off and every request is distinct, so
+# both sides make the same number of model calls.
+#
+#   python -m scripts.bench.batch --items 40 --batch-concurrency 8
+#   python -m scripts.bench.batch --items 40 --tokens-per-minute 20000
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import httpx
+
+from scripts.bench.run import _start, _wait_until_up
+
+def _items(count: int, tag: str) -> list:
+    return [
+        {
+            "thoughts": f"Batch benchmark {tag} thought {i} about finishing the week strong",
+            "goals": "Ship the release and exercise three times",
+            "reflections": "Planning in the evening helped."
+        }
+        for i in range(count)
+    ]
+
+def run_sequential(client: httpx.Client, items: list) -> float:
+    started = time.perf_counter()
+    for item in items:
+        client.post("/feedback", json=item).raise_for_status()
+    return time.perf_counter() - started
+
+def run_batch(client: httpx.Client, items: list) -> tuple:
+    started = time.perf_counter()
+    first = None
+    summary = {}
+    with client.stream("POST", "/feedback/batch", json={"items": items}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            result = json.loads(line)
+            if first is None:
+                first = time.perf_counter() - started
+            if result.get("done"):
+                summary = result
+    return time.perf_counter() - started, first, summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential POST /feedback versus POST /feedback/batch.")
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--batch-concurrency", type=int, default=8)
+    parser.add_argument("--tokens-per-minute", type=float, default=0, help="batch token budget; 0 disables")
+    parser.add_argument("--api-port", type=int, default=18080)
+    parser.add_argument("--notion-port", type=int, default=18081)
+    parser.add_argument("--openai-port", type=int, default=18082)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--api-log", default=os.devnull, help="file that receives the API server's output")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="lifecoach-batch-")
+    env = {
+        **os.environ,
+        "NOTION_TOKEN": "bench-token",
+        "NOTION_DATABASE_ID": "bench-database",
+        "NOTION_BASE_URL": f"http://127.0.0.1:{args.notion_port}",
+        "OPENAI_API_KEY": "bench-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.openai_port}/v1",
+        "LANGCHAIN_TRACING_V2": "false",
+        "DATA_DIR": data_dir,
+        "FEEDBACK_CACHE_ENABLED": "false",
+        "FEEDBACK_SCHEDULER_ENABLED": "false",
+        "FEEDBACK_BATCH_CONCURRENCY": str(args.batch_concurrency),
+        "FEEDBACK_BATCH_TOKENS_PER_MINUTE": str(args.tokens_per_minute),
+    }
+
+    processes = []
+    api_log = open(args.api_log, "w")
+    try:
+        notion = _start(["scripts.bench.fake_notion_server", "--port", str(args.notion_port), "--seed-pages", "50"])
+        processes.append(notion)
+        openai = _start([
+            "scripts.bench.fake_openai_server",
+            "--port", str(args.openai_port),
+            "--ttft-ms", str(args.ttft_ms),
+            "--token-ms", str(args.token_ms),
+        ])
+        processes.append(openai)
+        _wait_until_up(f"http://127.0.0.1:{args.notion_port}/_bench/stats", notion)
+        _wait_until_up(f"http://127.0.0.1:{args.openai_port}/_bench/stats", openai)
+        api = _start(["uvicorn", "api.main:app", "--port", str(args.api_port), "--log-level", "warning"], env, api_log)
+        processes.append(api)
+        _wait_until_up(f"http://127.0.0.1:{args.api_port}/ops/stats", api)
+
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.api_port}", timeout=600) as client:
+            # Loads the LLM stack so neither side pays for it.
+            client.post("/feedback", json=_items(1, "warmup")[0]).raise_for_status()
+            sequential = run_sequential(client, _items(args.items, "sequential"))
+            batch, first, summary = run_batch(client, _items(args.items, "batch"))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            process.wait()
+        api_log.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{'mode':<28}{'items':>6}{'wall s':>9}{'items/s':>9}{'first s':>9}")
+    print(f"{'sequential POST /feedback':<28}{args.items:>6}{sequential:>9.2f}{args.items / sequential:>9.2f}{sequential / args.items:>9.2f}")
+    print(f"{'POST /feedback/batch':<28}{args.items:>6}{batch:>9.2f}{args.items / batch:>9.2f}{first:>9.2f}")
+    print(f"\nSpeedup: {sequential / batch:.1f}x at concurrency {args.batch_concurrency}; batch summary: {summary}")
+
+if __name__ == "__main__":
+    main()
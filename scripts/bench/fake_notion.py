@@ -0,0 +1,162 @@
+# scripts/bench/fake_notion.py
+
+import asyncio
+import datetime
+import itertools
+from typing import List, Optional
+
+class FakeNotionClient:
+    """
+    In-memory stand-in for notion_client.AsyncClient covering the calls this
+    project makes: databases.query (filters, sorts, cursors) and pages.create/update.
+    Pass it to NotionService in place of a real client, in benchmarks and tests.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.store: List[dict] = []
+        self.query_count = 0
+        self._ids = itertools.count(1)
+        self._clock = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self.databases = _Databases(self)
+        self.pages = _Pages(self)
+
+    def _tick(self) -> str:
+        self._clock += datetime.timedelta(seconds=1)
+        return self._clock.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def add_page(
+        self,
+        date: str,
+        thoughts: str = "",
+        goals: str = "",
+        reflections: str = "",
+        goal_status: str = "pending"
+    ) -> dict:
+        properties = {
+            "Date": {"date": {"start": date}},
+            "Thoughts": {"rich_text": [{"text": {"content": thoughts}}]},
+            "Goals": {"rich_text": [{"text": {"content": goals}}]},
+            "Reflections": {"rich_text": [{"text": {"content": reflections}}]},
+            "Goal Status": {"select": {"name": goal_status}}
+        }
+        return self._create(properties)
+
+    def _create(self, properties: dict) -> dict:
+        page = {
+            "object": "page",
+            "id": f"page-{next(self._ids)}",
+            "last_edited_time": self._tick(),
+            "properties": _normalize(properties)
+        }
+        self.store.append(page)
+        return page
+
+    def _update(self, page_id: str, properties: dict) -> dict:
+        page = next(page for page in self.store if page["id"] == page_id)
+        page["properties"].update(_normalize(properties))
+        page["last_edited_time"] = self._tick()
+        return page
+
+    def delete_page(self, page_id: str):
+        """Drops a page, as deleting or archiving it in Notion hides it from queries."""
+        self.store = [page for page in self.store if page["id"] != page_id]
+
+    async def _sleep(self):
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+    async def aclose(self):
+        pass
+
+class _Databases:
+    def __init__(self, client: FakeNotionClient):
+        self._client = client
+
+    async def query(
+        self,
+        database_id: str,
+        filter: Optional[dict] = None,
+        sorts: Optional[List[dict]] = None,
+        start_cursor: Optional[str] = None,
+        page_size: int = 100
+    ) -> dict:
+        await self._client._sleep()
+        self._client.query_count += 1
+        results = [page for page in self._client.store if _matches(page, filter)]
+        for sort in reversed(sorts or []):
+            results.sort(key=lambda page: _sort_key(page, sort), reverse=sort.get("direction") == "descending")
+        start = int(start_cursor or 0)
+        end = start + min(page_size, 100)
+        has_more = end < len(results)
+        return {
+            "object": "list",
+            "results": results[start:end],
+            "has_more": has_more,
+            "next_cursor": str(end) if has_more else None
+        }
+
+class _Pages:
+    def __init__(self, client: FakeNotionClient):
+        self._client = client
+
+    async def create(self, parent: dict, properties: dict) -> dict:
+        await self._client._sleep()
+        return self._client._create(properties)
+
+    async def update(self, page_id: str, properties: dict) -> dict:
+        await self._client._sleep()
+        return self._client._update(page_id, properties)
+
+def _normalize(properties: dict) -> dict:
+    # Notion echoes rich_text back with a plain_text field alongside the content.
+    normalized = {}
+    for name, value in properties.items():
+        if "rich_text" in value:
+            value = {"rich_text": [
+                {"text": item["text"], "plain_text": item["text"]["content"]}
+                for item in value["rich_text"]
+            ]}
+        normalized[name] = value
+    return normalized
+
+def _property_value(page: dict, name: str) -> Optional[str]:
+    value = page["properties"].get(name, {})
+    if "date" in value:
+        return (value["date"] or {}).get("start")
+    if "select" in value:
+        return (value["select"] or {}).get("name")
+    return None
+
+def _sort_key(page: dict, sort: dict) -> str:
+    if "timestamp" in sort:
+        return page[sort["timestamp"]]
+    return _property_value(page, sort["property"]) or ""
+
+def _matches(page: dict, filter: Optional[dict]) -> bool:
+    if not filter:
+        return True
+    if "and" in filter:
+        return all(_matches(page, clause) for clause in filter["and"])
+    if "or" in filter:
+        return any(_matches(page, clause) for clause in filter["or"])
+    if "timestamp" in filter:
+        value = page[filter["timestamp"]]
+        condition = filter[filter["timestamp"]]
+    else:
+        value = _property_value(page, filter["property"])
+        condition = filter.get("date") or filter.get("select") or {}
+    for operator, expected in condition.items():
+        if value is None:
+            return False
+        if operator == "equals" and value != expected:
+            return False
+        if operator == "on_or_after" and value[:len(expected)] < expected:
+            return False
+        if operator == "after" and value <= expected:
+            return False
+        if operator == "on_or_before" and value[:len(expected)] > expected:
+            return False
+        if operator == "before" and value >= expected:
+            return False
+    return True
@@ -0,0 +1,140 @@
+# scripts/bench/fake_notion_server.py
+#
+# Local stand-in for the Notion REST API, backed by FakeNotionClient. Serves
+# databases.query (filters, sorts, cursor pagination) and pages.create/update
+# with configurable latency. Requests beyond the per-token rate limit, plus a
+# random fraction of the rest, are answered with 429 and a Retry-After header.
+#
+#   python -m scripts.bench.fake_notion_server --port 18081 --seed-pages 500
+
+import argparse
+import asyncio
+import datetime
+import random
+import time
+from typing import Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from scripts.bench.fake_notion import FakeNotionClient
+
+STATUSES = ["completed", "pending", "in progress"]
+
+def seed(client: FakeNotionClient, pages: int, days: int):
+    today = datetime.date.today()
+    for i in range(pages):
+        day = today - datetime.timedelta(days=i % days)
+        client.add_page(
+            day.isoformat(),
+            thoughts=f"Bench thought {i}: shipped a small piece of the project and took notes.",
+            goals=f"Goal {i % 7}: keep the streak going",
+            reflections="Felt focused in the morning, slower after lunch." if i % 3 else "",
+            goal_status=STATUSES[i % len(STATUSES)]
+        )
+
+class _Throttle:
+    """Per-token request budget, refilled continuously like Notion's average rate."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, list] = {}
+
+    def allow(self, token: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(token, [self.burst, now])
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+def create_app(
+    latency_ms: float = 0,
+    error_rate: float = 0.0,
+    rate_limit: float = 0.0,
+    burst: float = 10,
+    seed_pages: int = 0,
+    seed_days: int = 30
+) -> FastAPI:
+    client = FakeNotionClient()
+    seed(client, seed_pages, seed_days)
+    throttle = _Throttle(rate_limit, burst)
+    app = FastAPI()
+    app.state.counts = {"requests": 0, "rate_limited": 0}
+    app.state.tokens = set()
+
+    async def gate(request: Request):
+        app.state.counts["requests"] += 1
+        token = request.headers.get("authorization", "")
+        app.state.tokens.add(token)
+        if not throttle.allow(token) or random.random() < error_rate:
+            app.state.counts["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": "1"},
+                content={
+                    "object": "error",
+                    "status": 429,
+                    "code": "rate_limited",
+                    "message": "You have been rate limited. Please try again in a few minutes."
+                }
+            )
+        if latency_ms:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+        return None
+
+    @app.post("/v1/databases/{database_id}/query")
+    async def query_database(database_id: str, request: Request):
+        if (limited := await gate(request)) is not None:
+            return limited
+        body = await request.json()
+        return await client.databases.query(
+            database_id=database_id,
+            filter=body.get("filter"),
+            sorts=body.get("sorts"),
+            start_cursor=body.get("start_cursor"),
+            page_size=body.get("page_size", 100)
+        )
+
+    @app.post("/v1/pages")
+    async def create_page(request: Request):
+        if (limited := await gate(request)) is not None:
+            return limited
+        body = await request.json()
+        return client._create(body["properties"])
+
+    @app.patch("/v1/pages/{page_id}")
+    async def update_page(page_id: str, request: Request):
+        if (limited := await gate(request)) is not None:
+            return limited
+        body = await request.json()
+        return client._update(page_id, body.get("properties", {}))
+
+    @app.get("/_bench/stats")
+    async def stats():
+        return {**app.state.counts, "pages": len(client.store), "tokens": len(app.state.tokens)}
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Notion API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18081)
+    parser.add_argument("--latency-ms", type=float, default=50, help="mean per-request latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/second per token; 0 disables")
+    parser.add_argument("--burst", type=float, default=10)
+    parser.add_argument("--seed-pages", type=int, default=500)
+    parser.add_argument("--seed-days", type=int, default=30)
+    args = parser.parse_args()
+    app = create_app(args.latency_ms, args.error_rate, args.rate_limit, args.burst, args.seed_pages, args.seed_days)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
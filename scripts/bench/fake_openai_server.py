@@ -0,0 +1,131 @@
+# scripts/bench/fake_openai_server.py
+#
+# Local stand-in for the OpenAI chat completions API. Answers with canned
+# coaching text after a configurable time-to-first-token, then either returns
+# the whole message or streams it as SSE chunks with a per-token delay.
+# Individual models can be given their own time-to-first-token, e.g. to make
+# the large tier slow enough that requests hedge to the fast one.
+#
+#   python -m scripts.bench.fake_openai_server --port 18082 --ttft-ms 300 --token-ms 15
+#   python -m scripts.bench.fake_openai_server --model-ttft-ms gpt-4o=8000
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY_WORDS = (
+    "You kept a steady rhythm this period and the goals you repeated most are the ones that moved. "
+    "Mornings were your most focused time, so protect them for the hardest task of the day. "
+    "Step one: pick a single goal each evening for tomorrow. Step two: start it before checking messages. "
+    "Step three: write one line of reflection before bed so patterns stay visible."
+).split(" ")
+
+def _completion_id() -> str:
+    return f"chatcmpl-bench{random.getrandbits(48):012x}"
+
+def _prompt_tokens(body: dict) -> int:
+    return sum(len(str(message.get("content", ""))) for message in body.get("messages", [])) // 4
+
+def create_app(
+    ttft_ms: float = 300,
+    token_ms: float = 15,
+    reply_tokens: int = 60,
+    model_ttft_ms: Optional[Dict[str, float]] = None
+) -> FastAPI:
+    app = FastAPI()
+    app.state.counts = {"requests": 0, "streamed": 0, "models": {}}
+    model_ttft_ms = model_ttft_ms or {}
+    tokens = [word + " " for word in (REPLY_WORDS * (reply_tokens // len(REPLY_WORDS) + 1))[:reply_tokens]]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.counts["requests"] += 1
+        model = body.get("model", "gpt-4o")
+        app.state.counts["models"][model] = app.state.counts["models"].get(model, 0) + 1
+        created = int(time.time())
+        completion_id = _completion_id()
+        usage = {
+            "prompt_tokens": _prompt_tokens(body),
+            "completion_tokens": len(tokens),
+            "total_tokens": _prompt_tokens(body) + len(tokens)
+        }
+        await asyncio.sleep(random.uniform(0.5, 1.5) * model_ttft_ms.get(model, ttft_ms) / 1000)
+
+        if not body.get("stream"):
+            await asyncio.sleep(len(tokens) * token_ms / 1000)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+
+        app.state.counts["streamed"] += 1
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: dict, finish_reason=None, choices=True) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if choices else []
+            }
+            if not choices:
+                payload["usage"] = usage
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                yield chunk({"content": token})
+                if token_ms:
+                    await asyncio.sleep(token_ms / 1000)
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk({}, choices=False)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/_bench/stats")
+    async def stats():
+        return app.state.counts
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18082)
+    parser.add_argument("--ttft-ms", type=float, default=300, help="mean time to first token")
+    parser.add_argument("--token-ms", type=float, default=15, help="delay between streamed tokens")
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument(
+        "--model-ttft-ms",
+        action="append",
+        default=[],
+        metavar="MODEL=MS",
+        help="time to first token for one model; repeatable"
+    )
+    args = parser.parse_args()
+    model_ttft_ms = {model: float(ms) for model, ms in (item.split("=", 1) for item in args.model_ttft_ms)}
+    app = create_app(args.ttft_ms, args.token_ms, args.reply_tokens, model_ttft_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
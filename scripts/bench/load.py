@@ -0,0 +1,223 @@
+# scripts/bench/load.py
+#
+# Drives the log, search, stats and feedback routes at a fixed concurrency and
+# reports throughput plus p50/p95/p99 latency per scenario. Streaming scenarios
+# also report time to first byte. The change feed never ends, so its latency is
+# the time to the first event, replayed from since=0. Run it against any API
+# instance, or use scripts/bench/run.py to start the API against the local
+# stand-ins first.
+#
+#   python -m scripts.bench.load --url http://127.0.0.1:18080 --requests 50 --concurrency 10
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import httpx
+
+_unique = itertools.count()
+
+def _log_entry() -> dict:
+    n = next(_unique)
+    return {
+        "date": datetime.date.today().isoformat(),
+        "thoughts": f"Benchmark entry {n}",
+        "goals": "Keep the benchmark honest",
+        "reflections": "Nothing to report.",
+        "goal_status": "pending"
+    }
+
+def _feedback_request() -> dict:
+    # Unique thoughts so every call reaches the model instead of the feedback cache.
+    return {
+        "thoughts": f"Benchmark thought {next(_unique)} about finishing the week strong",
+        "goals": "Ship the release and exercise three times",
+        "reflections": "Planning in the evening helped."
+    }
+
+def _range_params() -> dict:
+    today = datetime.date.today()
+    return {"start": (today - datetime.timedelta(days=29)).isoformat(), "end": today.isoformat()}
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    params: Callable[[], dict] = dict
+    body: Optional[Callable[[], dict]] = None
+    streaming: bool = False
+    # Server-Sent Events: the request ends at the first event.
+    sse: bool = False
+
+SCENARIOS: List[Scenario] = [
+    Scenario("GET /daily_logs", "GET", "/daily_logs"),
+    Scenario("GET /weekly_logs", "GET", "/weekly_logs"),
+    Scenario("GET /weekly_logs strong", "GET", "/weekly_logs", lambda: {"consistency": "strong"}),
+    Scenario("GET /logs", "GET", "/logs"),
+    Scenario("GET /logs page", "GET", "/logs", lambda: {"limit": 50}),
+    Scenario("GET /logs status", "GET", "/logs", lambda: {"goal_status": "completed"}),
+    Scenario("GET /logs stream", "GET", "/logs", lambda: {"stream": "true"}, streaming=True),
+    Scenario("GET /logs/search", "GET", "/logs/search", lambda: {"q": "project"}),
+    Scenario("GET /logs/search filtered", "GET", "/logs/search", lambda: {"q": "project notes", "goal_status": "completed"}),
+    Scenario("GET /stats", "GET", "/stats"),
+    Scenario("GET /stats week", "GET", "/stats", lambda: {"granularity": "week"}),
+    Scenario("GET /logs/changes first event", "GET", "/logs/changes", lambda: {"since": 0}, streaming=True, sse=True),
+    Scenario("POST /feedback", "POST", "/feedback", body=_feedback_request),
+    Scenario("POST /feedback stream", "POST", "/feedback", lambda: {"stream": "true"}, _feedback_request, True),
+    Scenario("POST /daily_feedback", "POST", "/daily_feedback"),
+    Scenario("POST /daily_feedback stream", "POST", "/daily_feedback", lambda: {"stream": "true"}, streaming=True),
+    Scenario("POST /weekly_feedback", "POST", "/weekly_feedback"),
+    Scenario("POST /weekly_feedback stream", "POST", "/weekly_feedback", lambda: {"stream": "true"}, streaming=True),
+    Scenario("POST /feedback/range", "POST", "/feedback/range", _range_params),
+    Scenario(
+        "POST /feedback/batch", "POST", "/feedback/batch",
+        body=lambda: {"items": [_feedback_request() for _ in range(5)]}, streaming=True
+    ),
+    # Writes last, so they do not change what the read scenarios see.
+    Scenario("POST /logs", "POST", "/logs", body=_log_entry),
+    Scenario("POST /logs/batch", "POST", "/logs/batch", body=lambda: {"entries": [_log_entry() for _ in range(10)]}),
+]
+
+@dataclass
+class Sample:
+    latency: float
+    first_byte: float
+    status: int
+
+@dataclass
+class Result:
+    scenario: str
+    samples: List[Sample] = field(default_factory=list)
+    wall: float = 0.0
+
+    def summary(self) -> dict:
+        ok = sorted(sample.latency for sample in self.samples if sample.status < 400)
+        first_bytes = sorted(sample.first_byte for sample in self.samples if sample.status < 400)
+        return {
+            "requests": len(self.samples),
+            "errors": sum(1 for sample in self.samples if sample.status >= 400),
+            "throughput_rps": round(len(ok) / self.wall, 2) if self.wall else 0.0,
+            "p50_ms": percentile(ok, 50),
+            "p95_ms": percentile(ok, 95),
+            "p99_ms": percentile(ok, 99),
+            "ttfb_p50_ms": percentile(first_bytes, 50)
+        }
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, in milliseconds."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return round(sorted_values[rank - 1] * 1000, 1)
+
+async def _request(client: httpx.AsyncClient, scenario: Scenario) -> Sample:
+    started = time.perf_counter()
+    first_byte = None
+    try:
+        async with client.stream(
+            scenario.method,
+            scenario.path,
+            params=scenario.params(),
+            json=scenario.body() if scenario.body else None
+        ) as response:
+            status = response.status_code
+            if scenario.sse and status < 400:
+                async for line in response.aiter_lines():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+                    if line.startswith("event:"):
+                        break
+            else:
+                async for _ in response.aiter_raw():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+    except httpx.HTTPError:
+        status = 599
+    latency = time.perf_counter() - started
+    return Sample(latency, first_byte if first_byte is not None else latency, status)
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> Result:
+    result = Result(scenario.name)
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            result.samples.append(await _request(client, scenario))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.wall = time.perf_counter() - started
+    return result
+
+async def run(base_url: str, requests: int, concurrency: int, warmup: int, only: Optional[str] = None) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        for scenario in SCENARIOS:
+            if only and only not in scenario.name:
+                continue
+            for _ in range(warmup):
+                await _request(client, scenario)
+            result = await run_scenario(client, scenario, requests, concurrency)
+            results[scenario.name] = result.summary()
+            print(format_row(scenario.name, results[scenario.name]), flush=True)
+    return results
+
+HEADER = f"{'scenario':<32}{'req':>6}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'ttfb50':>9}"
+
+def format_row(name: str, summary: dict) -> str:
+    def ms(value):
+        return f"{value:.1f}" if value is not None else "-"
+    return (
+        f"{name:<32}{summary['requests']:>6}{summary['errors']:>5}{summary['throughput_rps']:>9.2f}"
+        f"{ms(summary['p50_ms']):>9}{ms(summary['p95_ms']):>9}{ms(summary['p99_ms']):>9}{ms(summary['ttfb_p50_ms']):>9}"
+    )
+
+def compare(results: dict, baseline: dict):
+    """Prints per-scenario changes against a previous report; negative latency deltas are improvements."""
+    def delta(new, old):
+        if new is None or not old:
+            return "-"
+        return f"{(new - old) / old * 100:+.0f}%"
+
+    print(f"\n{'vs baseline':<32}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, summary in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:<32}{'(new)':>9}")
+            continue
+        print(
+            f"{name:<32}{delta(summary['throughput_rps'], old['throughput_rps']):>9}"
+            f"{delta(summary['p50_ms'], old['p50_ms']):>9}{delta(summary['p95_ms'], old['p95_ms']):>9}"
+            f"{delta(summary['p99_ms'], old['p99_ms']):>9}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-route load generator for the AI Life Coach API.")
+    parser.add_argument("--url", default="http://127.0.0.1:18080")
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests per scenario")
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="compare against a previous JSON report")
+    args = parser.parse_args()
+
+    print(HEADER)
+    results = asyncio.run(run(args.url, args.requests, args.concurrency, args.warmup, args.only))
+    report = {"requests": args.requests, "concurrency": args.concurrency, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
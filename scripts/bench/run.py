@@ -0,0 +1,141 @@
+# scripts/bench/run.py
+#
+# One-command offline benchmark: starts the Notion and OpenAI stand-ins, starts
+# the API against them with a throwaway DATA_DIR, runs the load generator over
+# every route and optionally compares the report with a saved baseline.
+# Nothing leaves the machine.
+#
+#   python -m scripts.bench.run --output bench.json
+#   python -m scripts.bench.run --baseline bench.json
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from scripts.bench import load
+
+def _start(args, env=None, log=None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", *args], env=env, stdout=log, stderr=subprocess.STDOUT)
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before becoming ready")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the AI Life Coach API.")
+    parser.add_argument("--api-port", type=int, default=18080)
+    parser.add_argument("--notion-port", type=int, default=18081)
+    parser.add_argument("--openai-port", type=int, default=18082)
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--seed-pages", type=int, default=500)
+    parser.add_argument("--notion-latency-ms", type=float, default=50)
+    parser.add_argument("--notion-error-rate", type=float, default=0.01, help="fraction of Notion calls answered with 429")
+    parser.add_argument("--notion-rate-limit", type=float, default=0.0,
+                        help="Notion stand-in requests/second per token; 0 disables")
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--model-ttft-ms", action="append", default=[], metavar="MODEL=MS",
+                        help="time to first token for one model, e.g. gpt-4o=8000 to exercise hedging; repeatable")
+    parser.add_argument("--feedback-cache", action="store_true",
+                        help="keep the feedback cache on (off by default so every call reaches the model)")
+    parser.add_argument("--api-log", default=os.devnull, help="file that receives the API server's output")
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="compare against a previous JSON report")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="lifecoach-bench-")
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    env = {
+        **os.environ,
+        "NOTION_TOKEN": "bench-token",
+        "NOTION_DATABASE_ID": "bench-database",
+        "NOTION_BASE_URL": f"http://127.0.0.1:{args.notion_port}",
+        "OPENAI_API_KEY": "bench-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.openai_port}/v1",
+        "LANGCHAIN_TRACING_V2": "false",
+        "DATA_DIR": data_dir,
+        "MIRROR_PATH": os.path.join(data_dir, "notion_mirror.db"),
+        "FEEDBACK_CACHE_PATH": os.path.join(data_dir, "feedback_cache.db"),
+        "SUMMARY_STORE_PATH": os.path.join(data_dir, "summaries.db"),
+        "PRECOMPUTED_FEEDBACK_PATH": os.path.join(data_dir, "precomputed_feedback.db"),
+        "FEEDBACK_CACHE_ENABLED": "true" if args.feedback_cache else "false",
+        # Precomputed results would short-circuit the feedback routes under test.
+        "FEEDBACK_SCHEDULER_ENABLED": "false",
+    }
+
+    processes = []
+    api_log = open(args.api_log, "w")
+    try:
+        notion = _start([
+            "scripts.bench.fake_notion_server",
+            "--port", str(args.notion_port),
+            "--seed-pages", str(args.seed_pages),
+            "--latency-ms", str(args.notion_latency_ms),
+            "--error-rate", str(args.notion_error_rate),
+            "--rate-limit", str(args.notion_rate_limit),
+        ])
+        processes.append(notion)
+        openai = _start([
+            "scripts.bench.fake_openai_server",
+            "--port", str(args.openai_port),
+            "--ttft-ms", str(args.ttft_ms),
+            "--token-ms", str(args.token_ms),
+            *(option for item in args.model_ttft_ms for option in ("--model-ttft-ms", item)),
+        ])
+        processes.append(openai)
+        _wait_until_up(f"http://127.0.0.1:{args.notion_port}/_bench/stats", notion)
+        _wait_until_up(f"http://127.0.0.1:{args.openai_port}/_bench/stats", openai)
+
+        api = _start(["uvicorn", "api.main:app", "--port", str(args.api_port), "--log-level", "warning"], env, api_log)
+        processes.append(api)
+        _wait_until_up(f"{api_url}/ops/stats", api)
+
+        print(load.HEADER)
+        results = asyncio.run(load.run(api_url, args.requests, args.concurrency, args.warmup, args.only))
+        notion_stats = httpx.get(f"http://127.0.0.1:{args.notion_port}/_bench/stats").json()
+        openai_stats = httpx.get(f"http://127.0.0.1:{args.openai_port}/_bench/stats").json()
+        print(f"\nNotion stand-in: {notion_stats}")
+        print(f"OpenAI stand-in: {openai_stats}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            process.wait()
+        api_log.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "api_log")},
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            load.compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
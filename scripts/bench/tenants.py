@@ -0,0 +1,157 @@
+# scripts/bench/tenants.py
+#
+# Simulates many tenants sharing one API instance against the local Notion
+# stand-in, which rate-limits per integration token like Notion does. One heavy
+# tenant pages through GET /logs as fast as it can while light tenants, picked
+# at random from the rest, read GET /daily_logs. Reports the light tenants'
+# latency, the heavy tenant's throughput and how often the registry evicted an
+# idle tenant. --shared-limiter sends all traffic to the default database
+# instead, so every request shares one client and one rate limiter.
+#
+#   python -m scripts.bench.tenants --tenants 300 --max-active 100
+#   python -m scripts.bench.tenants --shared-limiter
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import List, Optional
+
+import httpx
+
+from scripts.bench.run import _start, _wait_until_up
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _headers(tenant: Optional[str]) -> dict:
+    return {"X-Tenant-ID": tenant} if tenant else {}
+
+async def heavy(client: httpx.AsyncClient, tenant: Optional[str], concurrency: int, stop: float, counts: dict):
+    async def worker():
+        while time.monotonic() < stop:
+            # A different page size per request keeps them from being coalesced.
+            response = await client.get("/logs", params={"limit": random.randint(1, 100)}, headers=_headers(tenant))
+            counts["ok" if response.status_code == 200 else "errors"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+async def light(client: httpx.AsyncClient, tenants: List[Optional[str]], rps: float, stop: float, latencies: List[float], counts: dict):
+    async def one(tenant: Optional[str]):
+        started = time.perf_counter()
+        response = await client.get("/daily_logs", headers=_headers(tenant))
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            counts["errors"] += 1
+
+    tasks = []
+    while time.monotonic() < stop:
+        tasks.append(asyncio.create_task(one(random.choice(tenants))))
+        await asyncio.sleep(1 / rps)
+    await asyncio.gather(*tasks)
+
+async def drive(url: str, tenants: List[Optional[str]], heavy_tenant: Optional[str], args) -> dict:
+    heavy_counts = {"ok": 0, "errors": 0}
+    light_counts = {"errors": 0}
+    latencies: List[float] = []
+    limits = httpx.Limits(max_connections=args.heavy_concurrency + 200)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        stop = time.monotonic() + args.seconds
+        await asyncio.gather(
+            heavy(client, heavy_tenant, args.heavy_concurrency, stop, heavy_counts),
+            light(client, tenants, args.light_rps, stop, latencies, light_counts)
+        )
+        ops = (await client.get("/ops/stats")).json()
+    return {
+        "light_p50": _percentile(latencies, 0.5),
+        "light_p95": _percentile(latencies, 0.95),
+        "light_ok": len(latencies),
+        "light_errors": light_counts["errors"],
+        "heavy_rps": heavy_counts["ok"] / args.seconds,
+        "heavy_errors": heavy_counts["errors"],
+        "registry": ops.get("tenants")
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-tenant Notion clients and rate limiters under a noisy neighbour.")
+    parser.add_argument("--tenants", type=int, default=300)
+    parser.add_argument("--max-active", type=int, default=100, help="TENANT_MAX_ACTIVE for the API")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--heavy-concurrency", type=int, default=20)
+    parser.add_argument("--light-rps", type=float, default=20, help="light requests/second across all light tenants")
+    parser.add_argument("--notion-rate-limit", type=float, default=3, help="fake Notion requests/second per token")
+    parser.add_argument("--shared-limiter", action="store_true", help="send everything to the default database")
+    parser.add_argument("--api-port", type=int, default=18080)
+    parser.add_argument("--notion-port", type=int, default=18081)
+    parser.add_argument("--api-log", default=os.devnull, help="file that receives the API server's output")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="lifecoach-tenants-")
+    tenants_path = os.path.join(data_dir, "tenants.json")
+    with open(tenants_path, "w") as f:
+        json.dump({f"tenant-{i}": {"token": f"tenant-token-{i}", "database_id": f"db-{i}"} for i in range(args.tenants)}, f)
+    env = {
+        **os.environ,
+        "NOTION_TOKEN": "bench-token",
+        "NOTION_DATABASE_ID": "bench-database",
+        "NOTION_BASE_URL": f"http://127.0.0.1:{args.notion_port}",
+        "OPENAI_API_KEY": "bench-key",
+        "LANGCHAIN_TRACING_V2": "false",
+        "DATA_DIR": data_dir,
+        "API_PROFILE": "logs",
+        "MIRROR_ENABLED": "false",
+        "SHARED_CACHE_ENABLED": "false",
+        "FEEDBACK_SCHEDULER_ENABLED": "false",
+        "NOTION_RATE_LIMIT_PER_SECOND": str(args.notion_rate_limit),
+        "TENANTS_PATH": tenants_path,
+        "TENANT_MAX_ACTIVE": str(args.max_active),
+    }
+    if args.shared_limiter:
+        tenants, heavy_tenant = [None], None
+    else:
+        tenants, heavy_tenant = [f"tenant-{i}" for i in range(1, args.tenants)], "tenant-0"
+
+    processes = []
+    api_log = open(args.api_log, "w")
+    try:
+        notion = _start([
+            "scripts.bench.fake_notion_server",
+            "--port", str(args.notion_port),
+            "--seed-pages", "60",
+            "--latency-ms", "50",
+            "--rate-limit", str(args.notion_rate_limit),
+        ])
+        processes.append(notion)
+        _wait_until_up(f"http://127.0.0.1:{args.notion_port}/_bench/stats", notion)
+        api = _start(["uvicorn", "api.main:app", "--port", str(args.api_port), "--log-level", "warning"], env, api_log)
+        processes.append(api)
+        _wait_until_up(f"http://127.0.0.1:{args.api_port}/ops/stats", api)
+        result = asyncio.run(drive(f"http://127.0.0.1:{args.api_port}", tenants, heavy_tenant, args))
+        notion_stats = httpx.get(f"http://127.0.0.1:{args.notion_port}/_bench/stats").json()
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            process.wait()
+        api_log.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    mode = "shared limiter" if args.shared_limiter else f"{args.tenants} tenants, {args.max_active} active"
+    print(f"{mode}: {args.heavy_concurrency} heavy workers, {args.light_rps:g} light req/s for {args.seconds:g}s")
+    print(f"  light  p50 {result['light_p50'] * 1000:8.0f} ms   p95 {result['light_p95'] * 1000:8.0f} ms"
+          f"   ok {result['light_ok']}   errors {result['light_errors']}")
+    print(f"  heavy  {result['heavy_rps']:8.1f} req/s   errors {result['heavy_errors']}")
+    print(f"  notion {notion_stats['requests']} requests, {notion_stats['rate_limited']} rate limited, "
+          f"{notion_stats['tokens']} tokens")
+    print(f"  registry {result['registry']}")
+
+if __name__ == "__main__":
+    main()
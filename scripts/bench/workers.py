@@ -0,0 +1,152 @@
+# scripts/bench/workers.py
+#
+# Worker scaling benchmark: starts the Notion and OpenAI stand-ins once, then
+# for each worker count starts python -m api.serve with a fresh DATA_DIR, drives
+# the chosen scenarios and reports throughput next to the number of calls that
+# reached the stand-ins. With the shared cache, upstream calls should stay flat
+# as workers are added; compare with --no-shared-cache.
+#
+#   python -m scripts.bench.workers --workers 1 2 4
+#   python -m scripts.bench.workers --workers 1 4 --no-mirror --no-shared-cache
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+import httpx
+
+from scripts.bench import load
+from scripts.bench.run import _start, _wait_until_up
+
+DEFAULT_SCENARIOS = ["GET /weekly_logs", "GET /logs", "POST /feedback", "POST /daily_feedback"]
+
+async def run_scenarios(api_url: str, names, requests: int, concurrency: int, warmup: int) -> dict:
+    scenarios = [scenario for scenario in load.SCENARIOS if scenario.name in names]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=300) as client:
+        for scenario in scenarios:
+            for _ in range(warmup):
+                await load._request(client, scenario)
+            result = await load.run_scenario(client, scenario, requests, concurrency)
+            results[scenario.name] = result.summary()
+    return results
+
+def upstream_calls(notion_url: str, openai_url: str) -> dict:
+    return {
+        "notion": httpx.get(f"{notion_url}/_bench/stats").json()["requests"],
+        "openai": httpx.get(f"{openai_url}/_bench/stats").json()["requests"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of python -m api.serve as worker processes are added.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--api-port", type=int, default=18080)
+    parser.add_argument("--notion-port", type=int, default=18081)
+    parser.add_argument("--openai-port", type=int, default=18082)
+    parser.add_argument("--scenario", action="append", help=f"scenario name, repeatable (default: {DEFAULT_SCENARIOS})")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--seed-pages", type=int, default=500)
+    parser.add_argument("--notion-latency-ms", type=float, default=50)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--no-mirror", action="store_true", help="read logs from Notion instead of the local mirror")
+    parser.add_argument("--no-shared-cache", action="store_true", help="turn off the cross-worker cache")
+    parser.add_argument("--api-log", default=os.devnull, help="file that receives the API servers' output")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    names = args.scenario or DEFAULT_SCENARIOS
+    notion_url = f"http://127.0.0.1:{args.notion_port}"
+    openai_url = f"http://127.0.0.1:{args.openai_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    stand_ins = []
+    api_log = open(args.api_log, "w")
+    rows = []
+    try:
+        notion = _start([
+            "scripts.bench.fake_notion_server",
+            "--port", str(args.notion_port),
+            "--seed-pages", str(args.seed_pages),
+            "--latency-ms", str(args.notion_latency_ms),
+        ])
+        stand_ins.append(notion)
+        openai = _start([
+            "scripts.bench.fake_openai_server",
+            "--port", str(args.openai_port),
+            "--ttft-ms", str(args.ttft_ms),
+            "--token-ms", str(args.token_ms),
+        ])
+        stand_ins.append(openai)
+        _wait_until_up(f"{notion_url}/_bench/stats", notion)
+        _wait_until_up(f"{openai_url}/_bench/stats", openai)
+
+        print(f"{'workers':>7}  {'scenario':<24}{'rps':>9}{'p50':>9}{'p95':>9}{'err':>5}{'notion':>8}{'openai':>8}")
+        for workers in args.workers:
+            data_dir = tempfile.mkdtemp(prefix="lifecoach-workers-")
+            env = {
+                **os.environ,
+                "API_WORKERS": str(workers),
+                "API_HOST": "127.0.0.1",
+                "API_PORT": str(args.api_port),
+                "NOTION_TOKEN": "bench-token",
+                "NOTION_DATABASE_ID": "bench-database",
+                "NOTION_BASE_URL": notion_url,
+                "OPENAI_API_KEY": "bench-key",
+                "OPENAI_BASE_URL": f"{openai_url}/v1",
+                "LANGCHAIN_TRACING_V2": "false",
+                "DATA_DIR": data_dir,
+                "MIRROR_ENABLED": "false" if args.no_mirror else "true",
+                "SHARED_CACHE_ENABLED": "false" if args.no_shared_cache else "true",
+                # Precomputed results would short-circuit the feedback routes under test.
+                "FEEDBACK_SCHEDULER_ENABLED": "false",
+                # The stand-in does not rate limit; let the workers' own limiters through.
+                "NOTION_RATE_LIMIT_PER_SECOND": "1000",
+                "NOTION_RATE_LIMIT_BURST": "1000",
+            }
+            api = _start(["api.serve"], env, api_log)
+            try:
+                _wait_until_up(f"{api_url}/ops/stats", api)
+                before = upstream_calls(notion_url, openai_url)
+                for name in names:
+                    result = asyncio.run(run_scenarios(api_url, [name], args.requests, args.concurrency, args.warmup))
+                    after = upstream_calls(notion_url, openai_url)
+                    for summary in result.values():
+                        calls = {key: after[key] - before[key] for key in after}
+                        rows.append({"workers": workers, "scenario": name, **summary, **calls})
+                        print(
+                            f"{workers:>7}  {name:<24}{summary['throughput_rps']:>9.1f}"
+                            f"{summary['p50_ms'] or 0:>9.1f}{summary['p95_ms'] or 0:>9.1f}{summary['errors']:>5}"
+                            f"{calls['notion']:>8}{calls['openai']:>8}",
+                            flush=True
+                        )
+                    before = after
+            finally:
+                api.terminate()
+                try:
+                    api.wait(timeout=60)
+                except subprocess.TimeoutExpired:
+                    api.kill()
+                    api.wait()
+                shutil.rmtree(data_dir, ignore_errors=True)
+    finally:
+        for process in stand_ins:
+            process.terminate()
+        for process in stand_ins:
+            process.wait()
+        api_log.close()
+
+    print(f"\nCPUs: {os.cpu_count()}. Upstream columns count calls that reached the stand-ins during each scenario.")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "cpus": os.cpu_count(), "results": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
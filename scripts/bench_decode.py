@@ -0,0 +1,108 @@
+# scripts/bench_decode.py
+#
+# Micro-benchmark for turning Notion pages into API output: the original
+# dict-per-page decoder plus FastAPI's default JSON path, against decode_page
+# (LogRecord) plus dumps_json. Reports throughput and peak memory.
+#
+#   python -m scripts.bench_decode --pages 100000
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+
+from api.services.notion_service import decode_page
+from api.utils.helpers import dumps_json, orjson
+
+def synthetic_pages(count):
+    pages = []
+    for i in range(count):
+        properties = {
+            "Date": {"id": "d", "type": "date", "date": {"start": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}},
+            "Goals": {"id": "g", "type": "rich_text", "rich_text": [
+                {"type": "text", "plain_text": f"Goal number {i % 50}", "text": {"content": f"Goal number {i % 50}"}}
+            ]},
+            "Reflections": {"id": "r", "type": "rich_text", "rich_text": [] if i % 3 == 0 else [
+                {"type": "text", "plain_text": "Felt focused today.", "text": {"content": "Felt focused today."}}
+            ]},
+            "Goal Status": {"id": "s", "type": "select", "select": {"name": "completed"} if i % 2 else None},
+        }
+        if i % 5:
+            properties["Thoughts"] = {"id": "t", "type": "rich_text", "rich_text": [
+                {"type": "text", "plain_text": f"Thought {i}", "text": {"content": f"Thought {i}"}}
+            ]}
+        pages.append({"object": "page", "id": f"page-{i}", "last_edited_time": "2024-01-01T00:00:00.000Z",
+                      "properties": properties})
+    return pages
+
+# The decoder as it was before LogRecord, kept here as the baseline.
+def legacy_extract_date(page):
+    date_property = page['properties'].get('Date', {}).get('date', {})
+    return date_property.get('start', 'No Date') if date_property else 'No Date'
+
+def legacy_extract_text(page, property_name):
+    property_value = page['properties'].get(property_name, {}).get('rich_text', [])
+    if property_value and len(property_value) > 0:
+        return property_value[0].get('plain_text', f'No {property_name}')
+    return f'No {property_name}'
+
+def legacy_extract_goal_status(page):
+    goal_status_property = page['properties'].get('Goal Status', {}).get('select', {})
+    return goal_status_property.get('name', 'Not Specified') if goal_status_property else 'Not Specified'
+
+def legacy_process_logs(pages):
+    logs = []
+    for page in pages:
+        logs.append({
+            "date": legacy_extract_date(page),
+            "thoughts": legacy_extract_text(page, 'Thoughts'),
+            "goals": legacy_extract_text(page, 'Goals'),
+            "reflections": legacy_extract_text(page, 'Reflections'),
+            "goal_status": legacy_extract_goal_status(page)
+        })
+    return logs
+
+def legacy_serialize(logs):
+    return json.dumps(jsonable_encoder({"logs": logs})).encode("utf-8")
+
+def record_process_logs(pages):
+    return [decode_page(page) for page in pages]
+
+def record_serialize(logs):
+    return dumps_json({"logs": logs})
+
+def measure(decode, serialize, pages):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    logs = decode(pages)
+    decode_seconds = time.perf_counter() - started
+    _, decode_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    body = serialize(logs)
+    serialize_seconds = time.perf_counter() - started
+    return decode_seconds, decode_peak, serialize_seconds, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Notion page decoding and JSON output.")
+    parser.add_argument("--pages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.pages)
+    print(f"{args.pages} pages, orjson {'installed' if orjson is not None else 'not installed'}")
+    print(f"{'variant':<18} {'decode pages/s':>15} {'decode peak MiB':>16} {'serialize pages/s':>18} {'bytes':>11}")
+    for name, decode, serialize in (
+        ("dict + default", legacy_process_logs, legacy_serialize),
+        ("LogRecord + fast", record_process_logs, record_serialize),
+    ):
+        decode_s, peak, serialize_s, size = measure(decode, serialize, pages)
+        print(f"{name:<18} {args.pages / decode_s:>15,.0f} {peak / 2 ** 20:>16.1f} "
+              f"{args.pages / serialize_s:>18,.0f} {size:>11,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# scripts/bench_prompt_packing.py
+#
+# Compares the original "+=" log formatting with PromptPacker on synthetic
+# logs: formatting time and prompt tokens for 7, 30 and 365 entries.
+#
+#   python -m scripts.bench_prompt_packing
+
+import datetime
+import random
+import timeit
+
+from api.models.log_models import LogRecord
+from api.utils.prompt_packer import PromptPacker, estimate_tokens
+
+GOALS = [
+    "Complete a 15-minute meditation, write in journal, and review current progress on long-term goals.",
+    "Block out specific times for major tasks and stick to the schedule for the entire day.",
+    "Plan and prepare meals for the next three days with balanced nutrients.",
+]
+STATUSES = ["pending", "in progress", "completed"]
+
+def synthetic_logs(count, seed=0):
+    rng = random.Random(seed)
+    start = datetime.date(2024, 1, 1)
+    logs = []
+    for i in range(count):
+        logs.append(LogRecord(
+            date=(start + datetime.timedelta(days=i)).isoformat(),
+            thoughts="Worked on focus and energy; " * rng.randint(1, 4) if rng.random() > 0.2 else "No Thoughts",
+            goals=rng.choice(GOALS),
+            reflections="Went better than expected, need more consistency. " * rng.randint(1, 3)
+            if rng.random() > 0.3 else "No Reflections",
+            goal_status=rng.choice(STATUSES),
+        ))
+    return logs
+
+def legacy_format(logs):
+    formatted_logs = ""
+    for log in logs:
+        formatted_logs += (
+            f"Date: {log.date}, "
+            f"Thoughts: {log.thoughts}, "
+            f"Goals: {log.goals} (Status: {log.goal_status}), "
+            f"Reflections: {log.reflections}\n"
+        )
+    return formatted_logs
+
+def main():
+    unbounded = PromptPacker(token_budget=10 ** 9)
+    budgeted = PromptPacker(token_budget=6000)
+    print(f"{'entries':>7} | {'legacy ms':>9} {'tokens':>7} | {'packed ms':>9} {'tokens':>7} | "
+          f"{'budget 6000 ms':>14} {'tokens':>7} {'kept':>5}")
+    for count in (7, 30, 365):
+        logs = synthetic_logs(count)
+        runs = 200 if count < 100 else 20
+        legacy_ms = timeit.timeit(lambda: legacy_format(logs), number=runs) / runs * 1000
+        packed_ms = timeit.timeit(lambda: unbounded.pack(logs), number=runs) / runs * 1000
+        budget_ms = timeit.timeit(lambda: budgeted.pack(logs), number=runs) / runs * 1000
+        packed = unbounded.pack(logs)
+        limited = budgeted.pack(logs)
+        print(f"{count:>7} | {legacy_ms:>9.3f} {estimate_tokens(legacy_format(logs)):>7} | "
+              f"{packed_ms:>9.3f} {packed.tokens:>7} | {budget_ms:>14.3f} {limited.tokens:>7} {limited.entries:>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# scripts/bench_search.py
+#
+# Builds a SearchIndex over synthetic logs whose words follow a Zipf-like
+# distribution, as natural text does, then times /logs/search-style queries
+# for rare, topic-like and stopword-like terms, with and without filters.
+# "capped" marks queries with more than --max-candidates matches, which are
+# ranked among the most recent matches only; "full p50" is the same query
+# ranked over every match, for comparison.
+#
+#   python -m scripts.bench_search --entries 300000
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from api.services.search_index import SearchIndex
+
+START = datetime.date(2000, 1, 1)
+ENTRIES_PER_DAY = 30
+TOPICS = ["meditation", "gym", "deadline", "family", "reading", "sleep", "coffee", "journal", "project", "walk"]
+
+def vocabulary(size):
+    # Topic words sit at Zipf ranks 50-59, so each appears in a few percent of
+    # entries; the top ranks behave like stopwords and appear in nearly all.
+    words = [f"word{i}" for i in range(size - len(TOPICS))]
+    return words[:50] + TOPICS + words[50:]
+
+def synthetic_rows(count, vocab, rng):
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    for i in range(count):
+        yield {
+            "id": f"page-{i}",
+            "date": (START + datetime.timedelta(days=i // ENTRIES_PER_DAY)).isoformat(),
+            "thoughts": " ".join(rng.choices(vocab, cum_weights=cum_weights, k=25)),
+            "goals": " ".join(rng.choices(vocab, cum_weights=cum_weights, k=6)),
+            "reflections": " ".join(rng.choices(vocab, cum_weights=cum_weights, k=12)) if i % 3 else "No Reflections",
+            "goal_status": rng.choice(["completed", "pending", "in progress"]),
+            "last_edited_time": "2024-01-01T00:00:00.000Z"
+        }
+
+async def timed_search(index, query, repeats, **filters):
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        results, capped = await index.search(query, **filters)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return len(results), capped, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1]
+
+async def run(entries, vocab_size, repeats, max_candidates):
+    rng = random.Random(0)
+    vocab = vocabulary(vocab_size)
+    with tempfile.TemporaryDirectory() as directory:
+        index = SearchIndex(os.path.join(directory, "search.db"), max_candidates)
+        uncapped = SearchIndex(os.path.join(directory, "search.db"), entries + 1)
+        started = time.perf_counter()
+        batch = []
+        for row in synthetic_rows(entries, vocab, rng):
+            batch.append(row)
+            if len(batch) == 5000:
+                await index.apply(batch)
+                batch = []
+        await index.apply(batch)
+        elapsed = time.perf_counter() - started
+        print(f"indexed {entries} entries in {elapsed:.1f}s ({entries / elapsed:,.0f} entries/s)")
+
+        # Completed entries from the newer half of the history.
+        recent = {
+            "start_date": START + datetime.timedelta(days=entries // ENTRIES_PER_DAY // 2),
+            "goal_status": "completed"
+        }
+        queries = [
+            ("rare", vocab[-1]),
+            ("mid-frequency", vocab[len(vocab) // 50]),
+            ("topic", "meditation"),
+            ("two topics", "meditation coffee"),
+            ("prefix", "medit*"),
+            ("stopword-like", vocab[0]),
+        ]
+        print(f"max candidates {max_candidates}")
+        print(f"{'query':<16}{'terms':<22}{'filters':<10}{'hits':>6}{'capped':>8}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'full p50':>10}")
+        for label, query in queries:
+            for filtered in (False, True):
+                filters = recent if filtered else {}
+                hits, capped, p50, p95 = await timed_search(index, query, repeats, **filters)
+                _, _, full_p50, _ = await timed_search(uncapped, query, repeats, **filters)
+                print(f"{label:<16}{query:<22}{'yes' if filtered else 'no':<10}{hits:>6}{'yes' if capped else 'no':>8}"
+                      f"{p50:>10.1f}{p95:>10.1f}{full_p50:>10.1f}")
+        uncapped.close()
+        index.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the full-text log search index.")
+    parser.add_argument("--entries", type=int, default=300000)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--max-candidates", type=int, default=2000, help="SEARCH_MAX_CANDIDATES for the API")
+    args = parser.parse_args()
+    asyncio.run(run(args.entries, args.vocabulary, args.repeats, args.max_candidates))
+
+if __name__ == "__main__":
+    main()
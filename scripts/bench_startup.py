@@ -0,0 +1,87 @@
+# scripts/bench_startup.py
+#
+# Measures what a cold API process pays before serving: the time to import
+# api.main and the resident memory afterwards, for each API_PROFILE, and what
+# loading the LLM stack adds on first feedback use. Every trial runs in a
+# fresh interpreter so nothing is already imported.
+#
+#   python -m scripts.bench_startup --trials 5
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+LLM_MODULES = ["langchain", "langchain_core", "langchain_openai", "openai", "tiktoken"]
+
+CHILD = """
+import json, sys, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+started = time.perf_counter()
+import api.main
+result = {
+    "import_seconds": time.perf_counter() - started,
+    "rss_mb": rss_mb(),
+    "modules": len(sys.modules),
+    "llm_modules": sorted(name for name in %(llm_modules)r if name in sys.modules)
+}
+if %(load_llm)r:
+    from api.services.feedback_service import FeedbackService
+    from api.utils.prompt_packer import estimate_tokens
+    started = time.perf_counter()
+    FeedbackService()
+    estimate_tokens("")
+    result["llm_load_seconds"] = time.perf_counter() - started
+    result["llm_rss_mb"] = rss_mb()
+print(json.dumps(result))
+"""
+
+def run_trial(profile, load_llm):
+    env = {
+        **os.environ,
+        "API_PROFILE": profile,
+        "NOTION_DATABASE_ID": os.environ.get("NOTION_DATABASE_ID", "bench"),
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench")
+    }
+    code = CHILD % {"llm_modules": LLM_MODULES, "load_llm": load_llm}
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API import time and memory per profile.")
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'import s':>10}{'RSS MB':>9}{'modules':>9}  {'LLM stack':<24}{'+load s':>9}{'RSS MB':>9}")
+    for profile in ("logs", "full"):
+        load_llm = profile == "full"
+        trials = [run_trial(profile, load_llm) for _ in range(args.trials)]
+        median = lambda key: statistics.median(trial[key] for trial in trials)
+        llm_modules = ", ".join(trials[-1]["llm_modules"]) or "not loaded"
+        line = f"{profile:<10}{median('import_seconds'):>10.2f}{median('rss_mb'):>9.1f}{median('modules'):>9.0f}  {llm_modules:<24}"
+        if load_llm:
+            line += f"{median('llm_load_seconds'):>9.2f}{median('llm_rss_mb'):>9.1f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# scripts/load_test.py
+#
+# Fires concurrent requests at one endpoint and reports whether they overlapped.
+# With a blocking Notion layer the overlap factor stays close to 1.0; with the
+# async client it approaches the concurrency level.
+#
+#   python -m scripts.load_test --path /weekly_logs --concurrency 20
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+API_URL = "http://localhost:8000"
+
+async def timed_request(client, method, path):
+    started = time.perf_counter()
+    response = await client.request(method, path)
+    finished = time.perf_counter()
+    return started, finished, response.status_code
+
+async def run(base_url, method, path, concurrency, rounds):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        results = []
+        wall_started = time.perf_counter()
+        for _ in range(rounds):
+            results += await asyncio.gather(
+                *(timed_request(client, method, path) for _ in range(concurrency))
+            )
+        wall = time.perf_counter() - wall_started
+
+    latencies = sorted(finished - started for started, finished, _ in results)
+    errors = sum(1 for _, _, status in results if status >= 400)
+    print(f"{method} {path}: {len(results)} requests, concurrency {concurrency}, {errors} errors")
+    print(f"  wall time:      {wall:.3f}s")
+    print(f"  mean latency:   {sum(latencies) / len(latencies):.3f}s")
+    print(f"  max latency:    {latencies[-1]:.3f}s")
+    print(f"  overlap factor: {sum(latencies) / wall:.2f} (1.0 means fully serialized)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the AI Life Coach API.")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--path", default="/weekly_logs")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.method.upper(), args.path, args.concurrency, args.rounds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# tests/test_log_mirror.py
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api.services.log_mirror import LogMirror, MirrorSync
+from api.services.notion_service import NotionService
+from api.utils.rate_limit import TokenBucket
+from scripts.bench.fake_notion import FakeNotionClient
+
+def make_service(fake: FakeNotionClient, mirror: LogMirror = None) -> NotionService:
+    return NotionService(fake, database_id="db", mirror=mirror, rate_limiter=TokenBucket(1000, 1000))
+
+def seeded(pages: int) -> FakeNotionClient:
+    fake = FakeNotionClient()
+    for i in range(pages):
+        fake.add_page(f"2024-01-{i + 1:02d}", thoughts=f"thought {i}", goal_status="pending")
+    return fake
+
+def test_sync_pulls_only_pages_edited_since_the_checkpoint():
+    async def run():
+        fake = seeded(3)
+        mirror = LogMirror(":memory:")
+        service = make_service(fake, mirror)
+        changed = []
+
+        async def listener(rows):
+            changed.extend(row["id"] for row in rows)
+
+        service.add_listener(listener)
+        sync = MirrorSync(service, mirror, interval_seconds=60)
+        assert await sync.sync_once() == 3
+        assert await mirror.is_ready()
+        assert sorted(changed) == ["page-1", "page-2", "page-3"]
+
+        changed.clear()
+        fake._update("page-2", {"Goal Status": {"select": {"name": "completed"}}})
+        fake.add_page("2024-01-04", thoughts="thought 3")
+        # The inclusive checkpoint re-reads the last page seen, but only edits reach listeners.
+        assert await sync.sync_once() <= 3
+        assert sorted(changed) == ["page-2", "page-4"]
+        assert await mirror.count() == 4
+        assert [log.goal_status for log in await mirror.query(goal_status="completed")] == ["completed"]
+        mirror.close()
+
+    asyncio.run(run())
+
+def test_reconcile_removes_deleted_pages():
+    async def run():
+        fake = seeded(3)
+        mirror = LogMirror(":memory:")
+        service = make_service(fake, mirror)
+        removed = []
+
+        async def listener(page_ids):
+            removed.extend(page_ids)
+
+        service.add_removal_listener(listener)
+        sync = MirrorSync(service, mirror, interval_seconds=60, reconcile_seconds=3600)
+        await sync.sync_once()
+        fake.delete_page("page-2")
+        assert await sync.reconcile_once() == 1
+        assert removed == ["page-2"]
+        assert await mirror.ids() == {"page-1", "page-3"}
+        # Nothing else to remove on the next pass.
+        assert await sync.reconcile_once() == 0
+        mirror.close()
+
+    asyncio.run(run())
+
+def test_change_seqs_are_not_reused_after_a_delete():
+    async def run():
+        fake = seeded(3)
+        mirror = LogMirror(":memory:")
+        sync = MirrorSync(make_service(fake, mirror), mirror, interval_seconds=60)
+        await sync.sync_once()
+        head = await mirror.head()
+        # Deleted upstream too, as a reconcile would find it.
+        fake.delete_page("page-3")
+        await mirror.delete(["page-3"])
+        fake.add_page("2024-01-04")
+        await sync.sync_once()
+        assert [row["seq"] for row in await mirror.changes_since(head, 10)] == [head + 1]
+        mirror.close()
+
+    asyncio.run(run())
+
+def test_mirror_date_range_includes_timed_entries_on_the_end_day():
+    async def run():
+        fake = FakeNotionClient()
+        fake.add_page("2024-05-03")
+        fake.add_page("2024-05-03T21:00:00.000+02:00")
+        fake.add_page("2024-05-04")
+        mirror = LogMirror(":memory:")
+        await MirrorSync(make_service(fake, mirror), mirror, interval_seconds=60).sync_once()
+        logs = await mirror.fetch_range("2024-05-03", "2024-05-03")
+        assert [log.date for log in logs] == ["2024-05-03", "2024-05-03T21:00:00.000+02:00"]
+        mirror.close()
+
+    asyncio.run(run())
+
+def test_mirror_rejects_notion_cursors_and_notion_rejects_mirror_cursors():
+    async def run():
+        fake = seeded(5)
+        mirror = LogMirror(":memory:")
+        service = make_service(fake, mirror)
+        await MirrorSync(service, mirror, interval_seconds=60).sync_once()
+
+        page = await service.get_logs(limit=2)
+        assert page["next_cursor"] == "m:2"
+        assert len((await service.get_logs(limit=2, cursor=page["next_cursor"]))["logs"]) == 2
+
+        notion_page = await service.get_logs(limit=2, consistency="strong")
+        with pytest.raises(HTTPException) as error:
+            await service.get_logs(limit=2, cursor=notion_page["next_cursor"])
+        assert error.value.status_code == 400
+
+        with pytest.raises(HTTPException) as error:
+            await service.get_logs(limit=2, cursor=page["next_cursor"], consistency="strong")
+        assert error.value.status_code == 400
+        mirror.close()
+
+    asyncio.run(run())